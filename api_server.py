@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Bill Generator HTTP API
+ASGI service that queues bill generation jobs from an uploaded workbook or a JSON
+bill payload, runs them on a bounded in-process worker pool, and streams each
+result back as a ZIP of HTML, PDF, merged PDF and DOCX documents.
+
+Run with any ASGI server, e.g. `uvicorn api_server:app`, or `python api_server.py`.
+
+Endpoints:
+    POST /jobs              workbook bytes (any non-JSON content type) or a JSON bill;
+                            202 with the job id, 429 when the queue is full
+    GET  /jobs/{id}         job status
+    GET  /jobs/{id}/result  the ZIP, streamed, once the job is done
+    DELETE /jobs/{id}       forget a job and its result
+    GET  /health            queue depth and job counts
+"""
+
+import concurrent.futures
+import io
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+logger = logging.getLogger(__name__)
+
+# Concurrent jobs; the PDF step of each job still fans out per document
+API_WORKERS = int(os.environ.get('BILLGEN_API_WORKERS', '0')) or max(1, min(4, os.cpu_count() or 1))
+# Jobs allowed to wait for a worker before submissions are refused with 429
+API_QUEUE_SIZE = int(os.environ.get('BILLGEN_API_QUEUE_SIZE', '16'))
+# Default and maximum job timeout, counted from submission so queued time is included
+API_JOB_TIMEOUT = float(os.environ.get('BILLGEN_API_JOB_TIMEOUT', '120'))
+API_MAX_JOB_TIMEOUT = float(os.environ.get('BILLGEN_API_MAX_JOB_TIMEOUT', '600'))
+API_MAX_UPLOAD_BYTES = int(os.environ.get('BILLGEN_API_MAX_UPLOAD_MB', '20')) * 1024 * 1024
+# Finished jobs are kept this long (and at most this many) for their results to be fetched
+API_RESULT_TTL = float(os.environ.get('BILLGEN_API_RESULT_TTL', '600'))
+API_MAX_RETAINED_JOBS = int(os.environ.get('BILLGEN_API_MAX_RETAINED_JOBS', '256'))
+STREAM_CHUNK_SIZE = 64 * 1024
+
+JOB_STATUSES = ('queued', 'running', 'done', 'failed', 'timeout')
+FINISHED_STATUSES = ('done', 'failed', 'timeout')
+BILL_FRAMES = ('work_order_data', 'bill_quantity_data', 'extra_items_data')
+
+
+class QueueFull(Exception):
+    """Raised when the job queue has no room; surfaced as 429"""
+
+
+class JobTimeout(Exception):
+    """Raised inside a job once its deadline has passed"""
+
+
+class Job:
+    """One bill generation request and its outcome"""
+
+    def __init__(self, kind: str, payload: Any, timeout: float):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.payload = payload
+        self.status = 'queued'
+        self.error: Optional[str] = None
+        self.result: Optional[bytes] = None
+        self.stage: Optional[str] = None
+        self.submitted_at = time.time()
+        self.deadline = self.submitted_at + timeout
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def check_deadline(self, stage: str):
+        """Record the stage about to run; give up if the deadline has passed"""
+        if time.time() > self.deadline:
+            raise JobTimeout(f"Timed out before {stage}")
+        self.stage = stage
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'stage': self.stage,
+            'error': self.error,
+            'submitted_at': self.submitted_at,
+            'queued_seconds': round((self.started_at or time.time()) - self.submitted_at, 3),
+            'run_seconds': round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None,
+            'result_bytes': len(self.result) if self.result is not None else None,
+        }
+
+
+def _bill_from_json(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Bill data in the ExcelProcessor result format from a JSON payload of row lists"""
+    import pandas as pd
+
+    if not isinstance(payload, dict) or not isinstance(payload.get('title_data', {}), dict):
+        raise ValueError("Bill payload must be an object with title_data and row lists")
+    data = {'title_data': payload.get('title_data', {})}
+    for key in BILL_FRAMES:
+        rows = payload.get(key) or []
+        if not isinstance(rows, list):
+            raise ValueError(f"{key} must be a list of rows")
+        data[key] = pd.DataFrame(rows)
+    return data
+
+
+def generate_bill_package(job: Job) -> bytes:
+    """Run the whole pipeline for one job and return the ZIP bytes"""
+    from enhanced_document_generator_fixed import EnhancedDocumentGenerator
+    from utils.excel_processor import ExcelProcessor
+    from utils.zip_packager import ZipPackager
+
+    job.check_deadline('ingest')
+    if job.kind == 'workbook':
+        data = ExcelProcessor(io.BytesIO(job.payload)).process_excel(allow_missing_bill_quantity=True)
+    else:
+        data = _bill_from_json(job.payload)
+    generator = EnhancedDocumentGenerator(data)
+
+    job.check_deadline('render')
+    html_documents = generator.generate_all_documents()
+    job.check_deadline('pdf')
+    pdf_documents = generator.create_pdf_documents(html_documents)
+    job.check_deadline('merge')
+    merged_pdf = generator.merge_pdf_documents(pdf_documents)
+    job.check_deadline('zip')
+    return ZipPackager().create_package(html_documents, pdf_documents, merged_pdf).getvalue()
+
+
+class JobManager:
+    """
+    Bounded in-process job queue.
+
+    At most ``workers`` jobs run at once and ``queue_size`` more may wait; further
+    submissions raise QueueFull. Timeouts are checked between pipeline stages, so a
+    job that overruns stops at the next stage boundary.
+    """
+
+    def __init__(self, workers: int = API_WORKERS, queue_size: int = API_QUEUE_SIZE,
+                 runner=generate_bill_package):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.runner = runner
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers,
+                                                               thread_name_prefix='billgen-job')
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, payload: Any, timeout: Optional[float] = None) -> Job:
+        if not self._slots.acquire(blocking=False):
+            raise QueueFull(f"Job queue is full ({self.workers} running, {self.queue_size} queued)")
+        timeout = min(timeout or API_JOB_TIMEOUT, API_MAX_JOB_TIMEOUT)
+        job = Job(kind, payload, timeout)
+        with self._lock:
+            self._evict_finished()
+            self._jobs[job.id] = job
+        try:
+            self._executor.submit(self._run, job)
+        except RuntimeError:
+            # Executor already shut down
+            self._slots.release()
+            with self._lock:
+                del self._jobs[job.id]
+            raise QueueFull("Job queue is shutting down")
+        return job
+
+    def _run(self, job: Job):
+        job.started_at = time.time()
+        job.status = 'running'
+        status, error, result = 'done', None, None
+        try:
+            result = self.runner(job)
+            if time.time() > job.deadline:
+                # Finished, but too late for the caller's timeout
+                status, error, result = 'timeout', f"Timed out during {job.stage}", None
+        except JobTimeout as e:
+            status, error = 'timeout', str(e)
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {str(e)}")
+            status, error = 'failed', str(e)
+        finally:
+            job.payload = None
+            job.result, job.error, job.finished_at = result, error, time.time()
+            # Set last: a finished status means result and finished_at are in place
+            job.status = status
+            self._slots.release()
+
+    def _evict_finished(self):
+        """Drop finished jobs past the result TTL, and the oldest beyond the retention cap"""
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.status in FINISHED_STATUSES]
+        excess = len(self._jobs) - API_MAX_RETAINED_JOBS
+        for job in finished:
+            if now - job.finished_at > API_RESULT_TTL or excess > 0:
+                del self._jobs[job.id]
+                excess -= 1
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def remove(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status not in FINISHED_STATUSES:
+                return False
+            del self._jobs[job_id]
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {status: 0 for status in JOB_STATUSES}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return {'workers': self.workers, 'queue_size': self.queue_size, 'jobs': counts,
+                'accepting': counts['queued'] + counts['running'] < self.workers + self.queue_size}
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+async def _send_json(send, status: int, body: Dict[str, Any], headers=()):
+    payload = json.dumps(body).encode('utf-8')
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'application/json'),
+                            (b'content-length', str(len(payload)).encode())] + list(headers)})
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+async def _read_body(receive, limit: int) -> Optional[bytes]:
+    """Read the request body; None if it exceeds ``limit`` bytes"""
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+class BillGeneratorAPI:
+    """ASGI application over a JobManager"""
+
+    def __init__(self, manager: Optional[JobManager] = None):
+        self._manager = manager
+
+    @property
+    def manager(self) -> JobManager:
+        if self._manager is None:
+            self._manager = JobManager()
+        return self._manager
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        method = scope['method']
+        parts = [part for part in scope['path'].split('/') if part]
+        if parts == ['health'] and method == 'GET':
+            await _send_json(send, 200, self.manager.stats())
+        elif parts == ['jobs'] and method == 'POST':
+            await self._create_job(scope, receive, send)
+        elif len(parts) == 2 and parts[0] == 'jobs' and method == 'GET':
+            await self._job_status(parts[1], send)
+        elif len(parts) == 2 and parts[0] == 'jobs' and method == 'DELETE':
+            removed = self.manager.remove(parts[1])
+            await _send_json(send, 200 if removed else 404, {'job_id': parts[1], 'removed': removed})
+        elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'result' and method == 'GET':
+            await self._job_result(parts[1], send)
+        else:
+            await _send_json(send, 404, {'error': f"No route for {method} {scope['path']}"})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.manager.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _create_job(self, scope, receive, send):
+        headers = {key.decode('latin-1').lower(): value.decode('latin-1') for key, value in scope['headers']}
+        declared = headers.get('content-length')
+        if declared and declared.isdigit() and int(declared) > API_MAX_UPLOAD_BYTES:
+            await _send_json(send, 413, {'error': f"Upload exceeds {API_MAX_UPLOAD_BYTES} bytes"})
+            return
+        body = await _read_body(receive, API_MAX_UPLOAD_BYTES)
+        if body is None:
+            await _send_json(send, 413, {'error': f"Upload exceeds {API_MAX_UPLOAD_BYTES} bytes"})
+            return
+        if not body:
+            await _send_json(send, 400, {'error': "Empty request body"})
+            return
+
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        try:
+            timeout = float(query['timeout'][0]) if 'timeout' in query else None
+        except ValueError:
+            await _send_json(send, 400, {'error': "timeout must be a number of seconds"})
+            return
+
+        if headers.get('content-type', '').split(';')[0].strip() == 'application/json':
+            try:
+                kind, payload = 'json', json.loads(body)
+            except ValueError as e:
+                await _send_json(send, 400, {'error': f"Invalid JSON: {str(e)}"})
+                return
+        else:
+            kind, payload = 'workbook', body
+
+        try:
+            job = self.manager.submit(kind, payload, timeout)
+        except QueueFull as e:
+            await _send_json(send, 429, {'error': str(e)}, headers=[(b'retry-after', b'5')])
+            return
+        await _send_json(send, 202, job.to_dict(), headers=[(b'location', f"/jobs/{job.id}".encode())])
+
+    async def _job_status(self, job_id: str, send):
+        job = self.manager.get(job_id)
+        if job is None:
+            await _send_json(send, 404, {'error': f"Unknown job {job_id}"})
+            return
+        await _send_json(send, 200, job.to_dict())
+
+    async def _job_result(self, job_id: str, send):
+        job = self.manager.get(job_id)
+        if job is None:
+            await _send_json(send, 404, {'error': f"Unknown job {job_id}"})
+            return
+        if job.status != 'done':
+            await _send_json(send, 409, job.to_dict())
+            return
+
+        result = job.result
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b'content-type', b'application/zip'),
+                                (b'content-length', str(len(result)).encode()),
+                                (b'content-disposition',
+                                 f'attachment; filename="bill_{job_id}.zip"'.encode())]})
+        view = memoryview(result)
+        for offset in range(0, max(len(result), 1), STREAM_CHUNK_SIZE):
+            await send({'type': 'http.response.body', 'body': bytes(view[offset:offset + STREAM_CHUNK_SIZE]),
+                        'more_body': offset + STREAM_CHUNK_SIZE < len(result)})
+
+
+app = BillGeneratorAPI()
+
+
+if __name__ == "__main__":
+    try:
+        import uvicorn
+    except ImportError:
+        print("❌ uvicorn is not installed; run api_server:app with any ASGI server")
+        sys.exit(1)
+    uvicorn.run(app, host=os.environ.get('BILLGEN_API_HOST', '127.0.0.1'),
+                port=int(os.environ.get('BILLGEN_API_PORT', '8000')))
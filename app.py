@@ -9,7 +9,6 @@ import os
 import sys
 import traceback
 import json
-import tempfile
 from typing import Dict, List, Any, Optional, Union
 import logging
 import streamlit.components.v1 as components
@@ -19,12 +18,12 @@ utils_path = Path(__file__).parent / "utils"
 if str(utils_path) not in sys.path:
     sys.path.append(str(utils_path))
 
-from utils.excel_processor import ExcelProcessor
-from utils.document_generator import DocumentGenerator
-from enhanced_document_generator_fixed import EnhancedDocumentGenerator
-from utils.pdf_merger import PDFMerger
-from batch_processor import HighPerformanceBatchProcessor, StreamlitBatchInterface
-from optimized_pdf_converter import OptimizedPDFConverter
+from utils.lazy_imports import lazy_import
+
+# The pipeline loads on first use, so the landing page paints without it
+excel_processor = lazy_import('utils.excel_processor')
+enhanced_document_generator = lazy_import('enhanced_document_generator_fixed')
+batch_processor = lazy_import('batch_processor')
 
 # Safe import for DataFrameSafetyUtils
 try:
@@ -620,7 +619,7 @@ def show_excel_mode():
         try:
             with st.spinner("Processing Excel file..."):
                 # Process Excel file using existing ExcelProcessor
-                processor = ExcelProcessor(uploaded_file)
+                processor = excel_processor.ExcelProcessor(uploaded_file)
 
                 # Process the Excel file directly (allow missing Bill Quantity for newer inputs)
                 result = processor.process_excel(allow_missing_bill_quantity=True)
@@ -781,13 +780,16 @@ def generate_documents_excel_mode(data: Dict):
                 st.info("📝 Using your modified title information for document generation")
             
             # Initialize EnhancedDocumentGenerator for robust HTML→PDF
-            doc_generator = EnhancedDocumentGenerator(data)
+            doc_generator = enhanced_document_generator.EnhancedDocumentGenerator(data)
 
             # Generate HTML documents
             html_documents = doc_generator.generate_all_documents()
             
             if html_documents:
                 st.success(f"✅ Generated {len(html_documents)} HTML documents!")
+                reused = doc_generator.render_summary['reused']
+                if reused:
+                    st.info(f"♻️ Reused {len(reused)} unchanged documents: {', '.join(reused)}")
                 
                 # Convert HTML to PDF
                 with st.spinner("Converting to PDF..."):
@@ -796,34 +798,19 @@ def generate_documents_excel_mode(data: Dict):
                 if pdf_documents:
                     st.success(f"✅ Successfully created {len(pdf_documents)} PDF documents!")
                     
-                    # Save PDF files to temporary directory and collect file paths
-                    generated_files = []
-                    temp_dir = tempfile.mkdtemp()
-                    
-                    for filename, pdf_bytes in pdf_documents.items():
-                        file_path = os.path.join(temp_dir, filename)
-                        with open(file_path, 'wb') as f:
-                            f.write(pdf_bytes)
-                        generated_files.append(file_path)
-                    
-                    # Show individual download links
+                    # Downloads are served straight from the in-memory PDF buffers
                     st.markdown("### 📥 Individual Downloads")
-                    for i, file_path in enumerate(generated_files):
-                        file_name = Path(file_path).name
-                        provide_download_link(file_path, file_name, f"download_{i}")
+                    for i, (file_name, pdf_bytes) in enumerate(pdf_documents.items()):
+                        provide_download_link(pdf_bytes, file_name, f"download_{i}")
                     
                     # Merge PDFs if multiple files
-                    if len(generated_files) > 1:
+                    if len(pdf_documents) > 1:
                         try:
-                            merger = PDFMerger()
-                            merged_pdf_bytes = merger.merge_pdfs(pdf_documents)
+                            # Reuses the merged output when no document changed since the last run
+                            merged_pdf_bytes = doc_generator.merge_pdf_documents(pdf_documents)
                             if merged_pdf_bytes:
-                                # Save merged PDF to temporary file
-                                merged_file_path = os.path.join(temp_dir, "Merged_Bill_Documents.pdf")
-                                with open(merged_file_path, 'wb') as f:
-                                    f.write(merged_pdf_bytes)
                                 st.success("📄 Documents merged successfully!")
-                                provide_download_link(merged_file_path, "Merged_Bill_Documents.pdf", "merged_download")
+                                provide_download_link(merged_pdf_bytes, "Merged_Bill_Documents.pdf", "merged_download")
                         except Exception as e:
                             st.warning(f"Could not merge PDFs: {str(e)}")
                             st.info("Individual downloads are still available above.")
@@ -858,7 +845,7 @@ def show_batch_mode():
     
     # Initialize batch interface
     if 'batch_interface' not in st.session_state:
-        st.session_state.batch_interface = StreamlitBatchInterface()
+        st.session_state.batch_interface = batch_processor.StreamlitBatchInterface()
     
     # Show batch processing interface
     st.session_state.batch_interface.show_batch_interface()
@@ -889,7 +876,7 @@ def show_work_order_upload():
         if uploaded_file is not None:
             try:
                 with st.spinner("Processing work order..."):
-                    processor = ExcelProcessor(uploaded_file)
+                    processor = excel_processor.ExcelProcessor(uploaded_file)
 
                     # Process only title and work order sheets
                     result = processor.process_excel()
@@ -1751,13 +1738,16 @@ def generate_documents_online_mode():
             # st.write(f"- Extra items: {len(extra_items_df)}")
             
             # Initialize EnhancedDocumentGenerator for robust HTML→PDF
-            doc_generator = EnhancedDocumentGenerator(online_data)
+            doc_generator = enhanced_document_generator.EnhancedDocumentGenerator(online_data)
 
             # Generate HTML documents
             html_documents = doc_generator.generate_all_documents()
             
             if html_documents:
                 st.success(f"✅ Generated {len(html_documents)} HTML documents!")
+                reused = doc_generator.render_summary['reused']
+                if reused:
+                    st.info(f"♻️ Reused {len(reused)} unchanged documents: {', '.join(reused)}")
                 
                 # Show a preview of one document
                 # first_doc_name = list(html_documents.keys())[0]
@@ -1773,43 +1763,29 @@ def generate_documents_online_mode():
                         if pdf_documents:
                             st.success(f"✅ Successfully created {len(pdf_documents)} PDF documents!")
                             
-                            # Save PDF files to temporary directory and collect file paths
-                            generated_files = []
-                            temp_dir = tempfile.mkdtemp()
-                            
-                            for filename, pdf_bytes in pdf_documents.items():
-                                file_path = os.path.join(temp_dir, filename)
-                                with open(file_path, 'wb') as f:
-                                    f.write(pdf_bytes)
-                                generated_files.append(file_path)
-                            
-                            # Store generated files
+                            # Store generated file names; downloads are served from the in-memory buffers
+                            generated_files = list(pdf_documents)
                             st.session_state.generated_documents = generated_files
 
                             # Show individual download links
                             st.markdown("### 📥 Individual Downloads")
-                            for i, file_path in enumerate(generated_files):
-                                file_name = Path(file_path).name
-                                provide_download_link(file_path, file_name, f"online_download_{i}")
+                            for i, (file_name, pdf_bytes) in enumerate(pdf_documents.items()):
+                                provide_download_link(pdf_bytes, file_name, f"online_download_{i}")
                             
                             # Merge PDFs if multiple files
-                            if len(generated_files) > 1:
+                            if len(pdf_documents) > 1:
                                 try:
-                                    merger = PDFMerger()
-                                    merged_pdf_bytes = merger.merge_pdfs(pdf_documents)
+                                    # Reuses the merged output when no document changed since the last run
+                                    merged_pdf_bytes = doc_generator.merge_pdf_documents(pdf_documents)
                                     if merged_pdf_bytes:
-                                        # Save merged PDF to temporary file
-                                        merged_file_path = os.path.join(temp_dir, "Merged_Bill_Documents.pdf")
-                                        with open(merged_file_path, 'wb') as f:
-                                            f.write(merged_pdf_bytes)
                                         st.success("📄 Documents merged successfully!")
-                                        provide_download_link(merged_file_path, "Merged_Bill_Documents.pdf", "online_merged")
+                                        provide_download_link(merged_pdf_bytes, "Merged_Bill_Documents.pdf", "online_merged")
                                 except Exception as e:
                                     st.warning(f"Could not merge PDFs: {str(e)}")
                                     st.info("Individual downloads are still available above.")
                             else:
-                                if generated_files:
-                                    provide_download_link(generated_files[0], "Bill_Document.pdf", "online_single")
+                                if pdf_documents:
+                                    provide_download_link(next(iter(pdf_documents.values())), "Bill_Document.pdf", "online_single")
 
                             # Success message with summary
                             # FIXED to prevent 'str' object has no attribute 'get' error
@@ -1859,13 +1835,10 @@ def generate_documents_online_mode():
         logger.error(f"Online document generation error: {traceback.format_exc()}")
 
 
-def provide_download_link(file_path: str, file_name: str, key: str = ""):
-    """Provide download link for generated file"""
+def provide_download_link(file_data: bytes, file_name: str, key: str = ""):
+    """Provide download link for a generated file held in memory"""
     try:
-        if os.path.exists(file_path):
-            with open(file_path, "rb") as file:
-                file_data = file.read()
-
+        if file_data:
             st.download_button(
                 label=f"📥 Download {file_name}",
                 data=file_data,
@@ -1874,7 +1847,7 @@ def provide_download_link(file_path: str, file_name: str, key: str = ""):
                 key=key
             )
         else:
-            st.error(f"File not found: {file_name}")
+            st.error(f"No data available for: {file_name}")
 
     except Exception as e:
         st.error(f"Error providing download for {file_name}: {str(e)}")
@@ -10,10 +10,10 @@ import time
 import gc
 import asyncio
 import concurrent.futures
+import contextlib
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 import pandas as pd
-import streamlit as st
 from datetime import datetime
 import tempfile
 import shutil
@@ -27,24 +27,92 @@ if str(utils_path) not in sys.path:
 from utils.excel_processor import ExcelProcessor
 from enhanced_document_generator_fixed import EnhancedDocumentGenerator
 from utils.pdf_merger import PDFMerger
+from utils.batch_manifest import BatchManifest, MANIFEST_FILE_NAME
+from utils.cache_utils import stream_digest
+from utils.template_registry import compute_template_version, precompile_templates
+from utils.tracing import traced
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Per-worker memory budget used to bound process pool concurrency
+DEFAULT_WORKER_MEMORY_MB = 512
+# Files are the unit of parallelism in parallel batches, so each file's documents are
+# converted serially and batch workers never start conversion pools of their own
+PARALLEL_BATCH_PDF_EXECUTOR = 'serial'
+
+# Batch processor owned by each pool worker process (set by _init_batch_worker)
+_worker_processor = None
+
+
+def _available_memory_bytes() -> Optional[int]:
+    """Return available system memory in bytes, or None if it cannot be determined"""
+    try:
+        import psutil
+        return int(psutil.virtual_memory().available)
+    except ImportError:
+        pass
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_AVPHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def default_worker_count(worker_memory_mb: int = DEFAULT_WORKER_MEMORY_MB) -> int:
+    """Default pool size: one worker per core, bounded by the per-worker memory budget"""
+    workers = os.cpu_count() or 1
+    available = _available_memory_bytes()
+    if available is not None and worker_memory_mb > 0:
+        workers = min(workers, available // (worker_memory_mb * 1024 * 1024))
+    return max(1, int(workers))
+
+
+def _init_batch_worker(input_directory: str, output_directory: str):
+    """
+    Process pool initializer: pre-import the heavy libraries and warm the
+    template environment once per worker instead of once per file
+    """
+    global _worker_processor
+    import jinja2  # noqa: F401
+    try:
+        import reportlab.platypus  # noqa: F401
+    except ImportError:
+        pass
+
+    generator = EnhancedDocumentGenerator({})
+    # Both usually resolve to the same shared environment; the second pass is then a cache hit
+    for env in (generator.jinja_env, generator.template_renderer.jinja_env):
+        precompile_templates(env)
+
+    _worker_processor = HighPerformanceBatchProcessor(input_directory, output_directory)
+
+
+def _process_file_in_worker(file_path: str) -> Dict[str, Any]:
+    """Process one file inside a pool worker; outputs are written by the worker and only stats are returned"""
+    return _worker_processor.process_single_file(Path(file_path), pdf_executor=PARALLEL_BATCH_PDF_EXECUTOR)
+
+
 class HighPerformanceBatchProcessor:
     """High-performance batch processor for multiple Excel files"""
     
-    def __init__(self, input_directory: str, output_directory: Optional[str] = None):
+    def __init__(self, input_directory: str, output_directory: Optional[str] = None,
+                 manifest_path: Optional[str] = None):
         self.input_directory = Path(input_directory)
         self.output_directory = Path(output_directory) if output_directory else Path("batch_output")
         self.output_directory.mkdir(exist_ok=True)
         
+        # Durable per-file manifest so interrupted batches can resume
+        self.manifest = BatchManifest(Path(manifest_path) if manifest_path
+                                      else self.output_directory / MANIFEST_FILE_NAME)
+        self.template_version = compute_template_version()
+        
         # Performance tracking
         self.processing_stats = {
             'total_files': 0,
             'processed_files': 0,
             'failed_files': 0,
+            'skipped_files': 0,
             'total_time': 0,
             'file_times': [],
             'output_sizes': []
@@ -53,7 +121,8 @@ class HighPerformanceBatchProcessor:
         # Memory management
         self.max_memory_usage = 0
         self.gc_threshold = 5  # Run garbage collection every 5 files (reduced from 10)
-        self.max_concurrent_files = 3  # Limit concurrent processing to prevent memory issues
+        self.max_concurrent_files = 3  # Limit concurrent threads to prevent memory issues
+        self.worker_memory_mb = DEFAULT_WORKER_MEMORY_MB  # Memory budget per pool worker process
         
     def discover_input_files(self) -> List[Path]:
         """Discover all Excel files in input directory"""
@@ -68,8 +137,15 @@ class HighPerformanceBatchProcessor:
         logger.info(f"Discovered {len(excel_files)} Excel files for processing")
         return excel_files
     
-    def process_single_file(self, file_path: Path, progress_callback=None) -> Dict[str, Any]:
-        """Process a single Excel file with optimized performance"""
+    @traced('batch.process_file')
+    def process_single_file(self, file_path: Path, progress_callback=None,
+                            pdf_executor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Process a single Excel file with optimized performance
+        
+        ``pdf_executor`` selects how the file's documents are converted to PDF (see
+        utils.parallel_conversion); by default BILLGEN_PDF_EXECUTOR decides.
+        """
         start_time = time.time()
         file_stats = {
             'file_name': file_path.name,
@@ -99,7 +175,8 @@ class HighPerformanceBatchProcessor:
                 raise Exception("No HTML documents generated")
             
             # Convert to PDF with memory optimization
-            pdf_documents = self._convert_to_pdf_optimized(html_documents, file_path.stem)
+            pdf_documents = self._convert_to_pdf_optimized(html_documents, file_path.stem, doc_generator,
+                                                           pdf_executor)
             
             if not pdf_documents:
                 raise Exception("No PDF documents generated")
@@ -124,33 +201,19 @@ class HighPerformanceBatchProcessor:
                 if file_size < 10240:  # 10KB
                     logger.warning(f"Small PDF file detected: {pdf_name} ({file_size} bytes)")
             
-            # Create merged PDF if multiple documents
+            # Create merged PDF if multiple documents, written to disk without an in-memory copy
             if len(pdf_documents) > 1:
+                merged_path = file_output_dir / f"{file_path.stem}_Merged.pdf"
                 try:
                     merger = PDFMerger()
-                    merged_pdf_bytes = merger.merge_pdfs(pdf_documents)
-                    if merged_pdf_bytes:
-                        merged_path = file_output_dir / f"{file_path.stem}_Merged.pdf"
-                        with open(merged_path, 'wb') as f:
-                            f.write(merged_pdf_bytes)
-                        generated_files.append(str(merged_path))
-                        total_size += len(merged_pdf_bytes)
+                    with open(merged_path, 'wb') as f:
+                        merger.merge_stream(pdf_documents.items(), f)
+                        merged_size = f.tell()
+                    generated_files.append(str(merged_path))
+                    total_size += merged_size
                 except Exception as e:
-                    # Normalize PyPDF2 3.x deprecation messages and retry-safe path
-                    if 'getNumPages' in str(e) or 'deprecated' in str(e).lower():
-                        logger.info("Retrying merge with modern API handling (PyPDF2 >=3)")
-                        try:
-                            merged_pdf_bytes = merger.merge_pdfs(pdf_documents)
-                            if merged_pdf_bytes:
-                                merged_path = file_output_dir / f"{file_path.stem}_Merged.pdf"
-                                with open(merged_path, 'wb') as f:
-                                    f.write(merged_pdf_bytes)
-                                generated_files.append(str(merged_path))
-                                total_size += len(merged_pdf_bytes)
-                        except Exception as e2:
-                            logger.warning(f"Could not merge PDFs (modern API): {str(e2)}")
-                    else:
-                        logger.warning(f"Could not merge PDFs for {file_path.name}: {str(e)}")
+                    logger.warning(f"Could not merge PDFs for {file_path.name}: {str(e)}")
+                    merged_path.unlink(missing_ok=True)
             
             file_stats.update({
                 'success': True,
@@ -181,14 +244,73 @@ class HighPerformanceBatchProcessor:
         
         return file_stats
     
-    def _convert_to_pdf_optimized(self, html_documents: Dict[str, str], base_name: str) -> Dict[str, bytes]:
-        """Optimized PDF conversion with memory management"""
+    def _input_digest(self, file_path: Path) -> Optional[str]:
+        """Content digest of an input file, or None if it cannot be read"""
+        try:
+            return stream_digest(str(file_path))
+        except OSError as e:
+            logger.warning(f"Could not hash {file_path.name}: {str(e)}")
+            return None
+    
+    def _plan_files(self, excel_files: List[Path], resume: bool,
+                    progress_callback=None) -> Tuple[List[Tuple[Path, Optional[str]]], List[Dict[str, Any]]]:
+        """
+        Split files into those to process and those already up to date in the manifest
+        
+        Returns:
+            (list of (file_path, input_digest) to process, stats of skipped files)
+        """
+        pending = []
+        skipped = []
+        for file_path in excel_files:
+            digest = self._input_digest(file_path)
+            if resume and self.manifest.is_up_to_date(file_path.name, digest, self.template_version):
+                entry = self.manifest.entries[file_path.name]
+                skipped.append({
+                    'file_name': file_path.name,
+                    'success': True,
+                    'skipped': True,
+                    'processing_time': 0,
+                    'output_size': entry.get('output_size', 0),
+                    'error': None,
+                    'generated_files': entry.get('output_files', [])
+                })
+                self.processing_stats['skipped_files'] += 1
+                if progress_callback:
+                    progress_callback(f"⏭️ Skipped {file_path.name} (unchanged since last run)")
+            else:
+                pending.append((file_path, digest))
+        
+        if skipped:
+            logger.info(f"Resuming batch: {len(skipped)} unchanged files skipped")
+        return pending, skipped
+    
+    def _batch_message(self) -> str:
+        """Summary message for a finished batch"""
+        stats = self.processing_stats
+        completed = stats['processed_files'] + stats['skipped_files']
+        success_rate = (completed / max(stats['total_files'], 1)) * 100
+        message = f'Processed {stats["processed_files"]} of {stats["total_files"]} files ({success_rate:.1f}% success rate)'
+        if stats['skipped_files']:
+            message += f', {stats["skipped_files"]} unchanged files skipped'
+        return message
+    
+    def _convert_to_pdf_optimized(self, html_documents: Dict[str, str], base_name: str,
+                                  doc_generator: Optional[EnhancedDocumentGenerator] = None,
+                                  pdf_executor: Optional[str] = None) -> Dict[str, bytes]:
+        """
+        Optimized PDF conversion with memory management
+        
+        ``doc_generator`` should be the generator that rendered ``html_documents``: the
+        tabular documents are built from its bill data. Without it only the HTML is converted.
+        """
         pdf_documents = {}
         
         try:
             # Use the enhanced document generator's PDF conversion
-            doc_generator = EnhancedDocumentGenerator({})
-            pdf_documents = doc_generator.create_pdf_documents(html_documents)
+            if doc_generator is None:
+                doc_generator = EnhancedDocumentGenerator({})
+            pdf_documents = doc_generator.create_pdf_documents(html_documents, executor_type=pdf_executor)
             
             # Validate PDF sizes
             for name, pdf_bytes in pdf_documents.items():
@@ -224,8 +346,14 @@ class HighPerformanceBatchProcessor:
             logger.error(f"Error creating error PDF: {str(e)}")
             return b"Error PDF generation failed"
     
-    def process_batch_files(self, progress_callback=None) -> Dict[str, Any]:
-        """Process all files in batch with enhanced memory management"""
+    def process_batch_files(self, progress_callback=None, resume: bool = False) -> Dict[str, Any]:
+        """
+        Process all files in batch with enhanced memory management
+        
+        Each result is appended to the batch manifest as soon as the file finishes.
+        With resume=True, files whose input digest and template version match a
+        successful manifest entry are skipped.
+        """
         start_time = time.time()
         all_stats = []
         
@@ -241,12 +369,15 @@ class HighPerformanceBatchProcessor:
                     'stats': []
                 }
             
+            pending, all_stats = self._plan_files(excel_files, resume, progress_callback)
+            
             # Process files with limited concurrency to manage memory
-            for i, file_path in enumerate(excel_files):
+            for i, (file_path, input_digest) in enumerate(pending):
                 try:
                     # Process single file
                     file_stats = self.process_single_file(file_path, progress_callback)
                     all_stats.append(file_stats)
+                    self.manifest.record(file_stats, input_digest, self.template_version)
                     
                     # Update counters
                     if file_stats['success']:
@@ -275,15 +406,12 @@ class HighPerformanceBatchProcessor:
             total_time = time.time() - start_time
             self.processing_stats['total_time'] = total_time
             
-            success_rate = (self.processing_stats['processed_files'] / 
-                          max(self.processing_stats['total_files'], 1)) * 100
-            
             # Memory cleanup
             gc.collect()
             
             return {
                 'success': True,
-                'message': f'Processed {self.processing_stats["processed_files"]} of {self.processing_stats["total_files"]} files ({success_rate:.1f}% success rate)',
+                'message': self._batch_message(),
                 'processing_time': total_time,
                 'stats': all_stats,
                 'summary': self.processing_stats
@@ -299,14 +427,30 @@ class HighPerformanceBatchProcessor:
                 'summary': self.processing_stats
             }
     
-    def process_batch_sequential(self, progress_callback=None) -> Dict[str, Any]:
+    def process_batch_sequential(self, progress_callback=None, resume: bool = False) -> Dict[str, Any]:
         """Process files sequentially (wrapper for process_batch_files)"""
-        return self.process_batch_files(progress_callback)
+        return self.process_batch_files(progress_callback, resume=resume)
     
-    def process_batch_parallel(self, max_workers: int = 4, progress_callback=None) -> Dict[str, Any]:
-        """Process files in parallel with memory management"""
-        # For memory safety, we'll limit parallel processing
-        max_workers = min(max_workers, self.max_concurrent_files)
+    def process_batch_parallel(self, max_workers: Optional[int] = None, progress_callback=None,
+                               use_processes: bool = False, resume: bool = False) -> Dict[str, Any]:
+        """
+        Process files in parallel with memory management
+        
+        Args:
+            max_workers: Number of workers (defaults to the core count bounded by worker_memory_mb)
+            progress_callback: Called with a status message as each file completes
+            use_processes: Use a process pool (sized by the core count and worker_memory_mb) so
+                parsing, rendering and PDF layout run outside the GIL; by default files run in
+                the thread pool limited by max_concurrent_files. Either way each file's
+                documents are converted serially inside its worker.
+            resume: Skip files that are unchanged since their last successful run
+        """
+        memory_bound = default_worker_count(self.worker_memory_mb)
+        if use_processes:
+            max_workers = min(max_workers or memory_bound, memory_bound)
+        else:
+            # For memory safety, we'll limit threaded processing
+            max_workers = min(max_workers or self.max_concurrent_files, self.max_concurrent_files)
         
         start_time = time.time()
         all_stats = []
@@ -323,13 +467,34 @@ class HighPerformanceBatchProcessor:
                     'stats': []
                 }
             
+            pending, all_stats = self._plan_files(excel_files, resume, progress_callback)
+            digests = {file_path: input_digest for file_path, input_digest in pending}
+            
             # Process files in parallel with executor
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            if not pending:
+                executor = None
+            elif use_processes:
+                logger.info(f"Processing {len(pending)} files with {max_workers} worker processes")
+                executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    initializer=_init_batch_worker,
+                    initargs=(str(self.input_directory), str(self.output_directory))
+                )
+            else:
+                executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+            
+            with executor or contextlib.nullcontext():
                 # Submit all tasks
-                future_to_file = {
-                    executor.submit(self._process_file_wrapper, file_path): file_path 
-                    for file_path in excel_files
-                }
+                if use_processes:
+                    future_to_file = {
+                        executor.submit(_process_file_in_worker, str(file_path)): file_path
+                        for file_path in digests
+                    }
+                else:
+                    future_to_file = {
+                        executor.submit(self._process_file_wrapper, file_path): file_path 
+                        for file_path in digests
+                    }
                 
                 # Collect results as they complete
                 for future in concurrent.futures.as_completed(future_to_file):
@@ -337,6 +502,13 @@ class HighPerformanceBatchProcessor:
                     try:
                         file_stats = future.result()
                         all_stats.append(file_stats)
+                        self.manifest.record(file_stats, digests[file_path], self.template_version)
+                        
+                        # Worker processes keep their own counters; fold their timings in here
+                        if use_processes:
+                            self.processing_stats['file_times'].append(file_stats['processing_time'])
+                            if file_stats['success']:
+                                self.processing_stats['output_sizes'].append(file_stats['output_size'])
                         
                         # Update counters
                         if file_stats['success']:
@@ -364,15 +536,12 @@ class HighPerformanceBatchProcessor:
             total_time = time.time() - start_time
             self.processing_stats['total_time'] = total_time
             
-            success_rate = (self.processing_stats['processed_files'] / 
-                          max(self.processing_stats['total_files'], 1)) * 100
-            
             # Memory cleanup
             gc.collect()
             
             return {
                 'success': True,
-                'message': f'Processed {self.processing_stats["processed_files"]} of {self.processing_stats["total_files"]} files ({success_rate:.1f}% success rate)',
+                'message': self._batch_message(),
                 'processing_time': total_time,
                 'stats': all_stats,
                 'summary': self.processing_stats
@@ -390,7 +559,7 @@ class HighPerformanceBatchProcessor:
     
     def _process_file_wrapper(self, file_path: Path) -> Dict[str, Any]:
         """Wrapper method for parallel processing"""
-        return self.process_single_file(file_path)
+        return self.process_single_file(file_path, pdf_executor=PARALLEL_BATCH_PDF_EXECUTOR)
     
     def generate_batch_report(self, results: Dict[str, Any]) -> str:
         """Generate a batch processing report"""
@@ -404,7 +573,9 @@ class HighPerformanceBatchProcessor:
         report.append(f"Total Files: {summary['total_files']}")
         report.append(f"Processed Files: {summary['processed_files']}")
         report.append(f"Failed Files: {summary['failed_files']}")
-        report.append(f"Success Rate: {(summary['processed_files'] / max(summary['total_files'], 1)) * 100:.1f}%")
+        report.append(f"Skipped (unchanged) Files: {summary.get('skipped_files', 0)}")
+        completed = summary['processed_files'] + summary.get('skipped_files', 0)
+        report.append(f"Success Rate: {(completed / max(summary['total_files'], 1)) * 100:.1f}%")
         report.append(f"Total Processing Time: {summary['total_time']:.2f} seconds")
         
         if summary['file_times']:
@@ -420,7 +591,11 @@ class HighPerformanceBatchProcessor:
         return "\n".join(report)
 
 class StreamlitBatchInterface:
-    """Streamlit interface for batch processing"""
+    """
+    Streamlit interface for batch processing
+
+    Streamlit is imported inside each method so headless batch runs never load it
+    """
     
     def __init__(self):
         self.processor = None
@@ -428,6 +603,7 @@ class StreamlitBatchInterface:
     
     def show_batch_interface(self):
         """Show the batch processing interface in Streamlit"""
+        import streamlit as st
         st.markdown("### 📁 Batch Processing Interface")
         
         # Input directory selection (default to lowercase 'input_files' used in repo)
@@ -472,6 +648,7 @@ class StreamlitBatchInterface:
     
     def _process_batch(self, input_dir: str, output_dir: str, max_workers: int, enable_preview: bool):
         """Process batch of files"""
+        import streamlit as st
         try:
             with st.spinner("Initializing batch processor..."):
                 self.processor = HighPerformanceBatchProcessor(input_dir, output_dir)
@@ -516,6 +693,7 @@ class StreamlitBatchInterface:
     
     def _show_file_preview(self, result: Dict[str, Any]):
         """Show preview of processed file"""
+        import streamlit as st
         if result['success']:
             st.success(f"✅ {result['file_name']} processed successfully")
         else:
@@ -523,6 +701,7 @@ class StreamlitBatchInterface:
     
     def _show_batch_results(self, results: List[Dict[str, Any]]):
         """Show batch processing results"""
+        import streamlit as st
         st.markdown("### 📊 Batch Processing Results")
         
         # Summary statistics
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark
+Times the ingest, compute, render, PDF, merge and ZIP stages over the workbooks in
+input_files/ and over synthetic bills, records throughput, latency percentiles and
+peak memory, and fails when a stage regresses past the stored baseline or a cold
+import of an entry module exceeds its budget
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from enhanced_document_generator_fixed import EnhancedDocumentGenerator
+from generate_additional_test_files import generate_scaled_workbook
+from utils.excel_processor import ExcelProcessor
+from utils.lazy_imports import measure_import
+from utils.render_cache import get_render_cache
+from utils.tracing import Tracer
+from utils.zip_packager import ZipPackager
+
+STAGES = ('ingest', 'compute', 'render', 'pdf', 'merge', 'zip')
+DEFAULT_INPUT_DIR = 'input_files'
+DEFAULT_SCALES = (1000, 10000, 50000)
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+DEFAULT_RESULTS = 'benchmark_results.json'
+# A stage regresses when its median latency grows by more than this fraction...
+DEFAULT_TOLERANCE = 0.25
+# ...and by more than this many milliseconds, so timer noise on tiny stages is ignored
+MIN_REGRESSION_MS = 20.0
+# Synthetic work orders are scaled to this total whatever their size, so every scale
+# renders the same totals and amounts in words
+SYNTHETIC_WORK_ORDER_TOTAL = 20000000.0
+SYNTHETIC_ZERO_RATE_RATIO = 0.05
+SYNTHETIC_EXTRA_ITEM_RATIO = 0.01
+# Cold import budget per entry module, in seconds, measured in a fresh interpreter
+IMPORT_TIME_BUDGETS = {
+    'billgen_cli': 0.2,
+    'enhanced_document_generator_fixed': 1.5,
+    'app': 2.5,
+    # Everything a headless conversion imports before it starts
+    'pipeline': 2.0,
+}
+# Budget names that stand for several modules imported together
+IMPORT_GROUPS = {
+    'pipeline': 'billgen_cli, batch_processor, enhanced_document_generator_fixed, utils.excel_processor',
+}
+
+
+def run_bill(file_path: Path, tracer: Tracer) -> Dict[str, Any]:
+    """Run every stage on one workbook with cold caches; returns per-stage spans"""
+    ExcelProcessor.clear_cache()
+    get_render_cache().clear()
+    tracer.clear()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        return _run_stages(file_path, tracer)
+
+
+def _run_stages(file_path: Path, tracer: Tracer) -> Dict[str, Any]:
+    with tracer.span('ingest'):
+        data = ExcelProcessor(file_path).process_excel(allow_missing_bill_quantity=True)
+    with tracer.span('compute'):
+        generator = EnhancedDocumentGenerator(data)
+    with tracer.span('render'):
+        html_documents = generator.generate_all_documents()
+    with tracer.span('pdf'):
+        pdf_documents = generator.create_pdf_documents(html_documents, executor_type='serial')
+    with tracer.span('merge'):
+        merged_pdf = generator.merge_pdf_documents(pdf_documents)
+    with tracer.span('zip'):
+        package = ZipPackager().create_package(html_documents, pdf_documents, merged_pdf)
+
+    work_order = data.get('work_order_data')
+    return {
+        'file': file_path.name,
+        'items': len(work_order) if isinstance(work_order, pd.DataFrame) else 0,
+        'zip_bytes': package.getbuffer().nbytes,
+        'stages': {span['name']: span for span in tracer.spans if span['name'] in STAGES},
+    }
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Latency percentiles, throughput and peak memory per stage for a set of bill runs"""
+    total_items = sum(run['items'] for run in runs)
+    stages = {}
+    for stage in STAGES:
+        wall = np.array([run['stages'][stage]['wall_ms'] for run in runs])
+        peaks = [run['stages'][stage].get('tracemalloc_peak_bytes') for run in runs]
+        total_seconds = wall.sum() / 1000
+        stages[stage] = {
+            'p50_ms': round(float(np.percentile(wall, 50)), 3),
+            'p95_ms': round(float(np.percentile(wall, 95)), 3),
+            'max_ms': round(float(wall.max()), 3),
+            'cpu_ms': round(sum(run['stages'][stage]['cpu_ms'] for run in runs), 3),
+            'bills_per_second': round(len(runs) / total_seconds, 3) if total_seconds else None,
+            'items_per_second': round(total_items / total_seconds, 1) if total_seconds else None,
+            'peak_memory_bytes': max(peaks) if None not in peaks else None,
+        }
+    return {
+        'bills': len(runs),
+        'items': total_items,
+        'peak_rss_bytes': max(run['stages'][stage]['rss_bytes'] or 0 for run in runs for stage in STAGES),
+        'stages': stages,
+    }
+
+
+def run_benchmark(input_dir: Optional[str] = DEFAULT_INPUT_DIR, scales=DEFAULT_SCALES, repeat: int = 1,
+                  trace_memory: bool = True, seed: int = 0) -> Dict[str, Any]:
+    """Benchmark each dataset: the input_files workbooks, then one synthetic bill per scale"""
+    tracer = Tracer(enabled=True, trace_memory=trace_memory)
+    datasets: Dict[str, List[Path]] = {}
+    if input_dir:
+        datasets['input_files'] = sorted(Path(input_dir).glob('*.xlsx'))
+
+    work_dir = Path(tempfile.mkdtemp(prefix='billgen_bench_'))
+    try:
+        for n_items in scales:
+            file_path = work_dir / f"synthetic_{n_items}.xlsx"
+            generate_scaled_workbook(file_path, n_items, zero_rate_ratio=SYNTHETIC_ZERO_RATE_RATIO,
+                                     extra_item_ratio=SYNTHETIC_EXTRA_ITEM_RATIO,
+                                     work_order_total=SYNTHETIC_WORK_ORDER_TOTAL, seed=seed)
+            datasets[f"synthetic_{n_items}"] = [file_path]
+
+        results = {}
+        for name, files in datasets.items():
+            if not files:
+                continue
+            print(f"⏱️ {name}: {len(files)} workbook(s) x {repeat}")
+            runs = []
+            for _ in range(repeat):
+                for file_path in files:
+                    try:
+                        runs.append(run_bill(file_path, tracer))
+                    except Exception as e:
+                        print(f"   ⚠️ Skipped {file_path.name}: {str(e)}")
+            if runs:
+                results[name] = summarize(runs)
+    finally:
+        tracer.disable()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': repeat,
+        'trace_memory': trace_memory,
+        'datasets': results,
+    }
+
+
+def run_import_benchmark() -> Dict[str, Any]:
+    """Cold import time of each entry module against its budget"""
+    imports = {}
+    for module, budget in IMPORT_TIME_BUDGETS.items():
+        try:
+            seconds = measure_import(IMPORT_GROUPS.get(module, module))['import_seconds']
+        except Exception as e:
+            print(f"   ⚠️ Could not import {module}: {str(e)}")
+            continue
+        imports[module] = {'import_seconds': seconds, 'budget_seconds': budget}
+    return imports
+
+
+def find_import_overruns(results: Dict[str, Any]) -> List[str]:
+    """Entry modules whose cold import took longer than their budget"""
+    return [f"import {module}: {stats['import_seconds']:.2f}s > budget {stats['budget_seconds']:.2f}s"
+            for module, stats in results.get('imports', {}).items()
+            if stats['import_seconds'] > stats['budget_seconds']]
+
+
+def find_regressions(results: Dict[str, Any], baseline: Dict[str, Any],
+                     tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Stages whose median latency exceeds the baseline by more than the tolerance"""
+    regressions = []
+    for name, dataset in results['datasets'].items():
+        baseline_stages = baseline.get('datasets', {}).get(name, {}).get('stages', {})
+        for stage, stats in dataset['stages'].items():
+            if stage not in baseline_stages:
+                continue
+            allowed = baseline_stages[stage]['p50_ms'] * (1 + tolerance)
+            if stats['p50_ms'] > allowed and stats['p50_ms'] - baseline_stages[stage]['p50_ms'] > MIN_REGRESSION_MS:
+                regressions.append(f"{name}/{stage}: p50 {stats['p50_ms']:.1f} ms > "
+                                   f"baseline {baseline_stages[stage]['p50_ms']:.1f} ms +{tolerance:.0%}")
+    return regressions
+
+
+def print_report(results: Dict[str, Any]):
+    for name, dataset in results['datasets'].items():
+        print(f"\n📊 {name} ({dataset['bills']} bills, {dataset['items']:,} items, "
+              f"peak RSS {dataset['peak_rss_bytes'] / 1024 / 1024:.0f} MB)")
+        print(f"   {'stage':<8} {'p50 ms':>10} {'p95 ms':>10} {'items/s':>12} {'peak MB':>9}")
+        for stage, stats in dataset['stages'].items():
+            peak = stats['peak_memory_bytes']
+            peak_text = f"{peak / 1024 / 1024:.1f}" if peak is not None else '-'
+            items_text = f"{stats['items_per_second']:,.0f}" if stats['items_per_second'] else '-'
+            print(f"   {stage:<8} {stats['p50_ms']:>10.1f} {stats['p95_ms']:>10.1f} {items_text:>12} {peak_text:>9}")
+    if results.get('imports'):
+        print("\n📦 Cold imports")
+        for module, stats in results['imports'].items():
+            print(f"   {module:<36} {stats['import_seconds']:>6.2f}s (budget {stats['budget_seconds']:.2f}s)")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--input-dir', default=DEFAULT_INPUT_DIR,
+                        help="Directory of workbooks to benchmark ('' to skip)")
+    parser.add_argument('--scales', default=','.join(str(s) for s in DEFAULT_SCALES),
+                        help="Comma-separated synthetic bill sizes in items ('' to skip)")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per workbook")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the synthetic workbooks")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="Skip tracemalloc peaks (faster, timings closer to production)")
+    parser.add_argument('--results', default=DEFAULT_RESULTS, help="Where to write the results JSON")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline results to compare against")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed fractional slowdown of a stage's median latency")
+    parser.add_argument('--update-baseline', action='store_true', help="Store these results as the new baseline")
+    parser.add_argument('--skip-imports', action='store_true', help="Skip the cold import budgets")
+    args = parser.parse_args(argv)
+
+    scales = [int(s) for s in args.scales.split(',') if s.strip()]
+    print("🏎️ Bill Generator Pipeline Benchmark")
+    print("=" * 60)
+    results = run_benchmark(args.input_dir or None, scales, args.repeat, not args.no_memory, args.seed)
+    if not args.skip_imports:
+        results['imports'] = run_import_benchmark()
+    print_report(results)
+
+    with open(args.results, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📝 Results written to {args.results}")
+
+    # Import budgets are absolute, so they are checked with or without a baseline
+    regressions = find_import_overruns(results)
+    if args.update_baseline:
+        shutil.copyfile(args.results, args.baseline)
+        print(f"📌 Baseline updated: {args.baseline}")
+    elif not Path(args.baseline).exists():
+        print(f"ℹ️ No baseline at {args.baseline}; run with --update-baseline to create one")
+    else:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions += find_regressions(results, baseline, args.tolerance)
+    if regressions:
+        print("\n💥 PERFORMANCE REGRESSIONS:")
+        for regression in regressions:
+            print(f"   ❌ {regression}")
+        return 1
+    print("\n🎉 No performance regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
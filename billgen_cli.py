@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Headless Bill Generator command line
+Converts one Excel bill, or every bill in a directory, to PDF without loading
+Streamlit. Pipeline modules are imported only after the arguments are parsed,
+so cache and engine options can be applied through their BILLGEN_* settings
+and `billgen --help` stays instant.
+"""
+
+import argparse
+import contextlib
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+OUTPUT_FORMATS = ('pdf', 'merged', 'html', 'zip')
+DEFAULT_FORMATS = 'pdf,merged'
+# Directory mode runs the batch processor, which writes individual and merged PDFs
+BATCH_FORMATS = ('pdf', 'merged')
+
+
+def _parse_formats(value: str) -> List[str]:
+    formats = [part.strip().lower() for part in value.split(',') if part.strip()]
+    unknown = [part for part in formats if part not in OUTPUT_FORMATS]
+    if unknown or not formats:
+        raise argparse.ArgumentTypeError(
+            f"unknown format {', '.join(unknown) or value!r}; choose from {', '.join(OUTPUT_FORMATS)}")
+    return formats
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='billgen',
+        description="Generate bill documents from Excel workbooks without the Streamlit UI")
+    parser.add_argument('input', help="Excel workbook, or a directory of workbooks")
+    parser.add_argument('-o', '--output-dir', default='billgen_output', help="Directory for generated files")
+    parser.add_argument('-f', '--format', type=_parse_formats, default=DEFAULT_FORMATS,
+                        help=f"Comma-separated outputs: {', '.join(OUTPUT_FORMATS)} (default: {DEFAULT_FORMATS})")
+    parser.add_argument('-w', '--workers', type=int,
+                        help="Worker processes for a directory, or PDF conversion workers for one file")
+    parser.add_argument('--executor', choices=('auto', 'serial', 'thread', 'process'),
+                        help="How documents of one bill are converted to PDF")
+    parser.add_argument('--reader', choices=('pandas', 'openpyxl'), help="Excel reader")
+    parser.add_argument('--resume', action='store_true',
+                        help="Directory mode: skip workbooks unchanged since their last successful run")
+    parser.add_argument('--no-cache', action='store_true', help="Disable the rendered document cache")
+    parser.add_argument('--cache-dir', help="Persist rendered documents in this directory")
+    parser.add_argument('--template-cache-dir', help="Persist compiled templates in this directory")
+    parser.add_argument('--trace', metavar='FILE',
+                        help="Write pipeline trace spans to FILE (.json for Chrome trace format)")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Show pipeline progress output")
+    return parser
+
+
+def apply_settings(args: argparse.Namespace):
+    """Map options onto the BILLGEN_* settings the pipeline modules read at import time"""
+    settings = {
+        'BILLGEN_RENDER_CACHE': '0' if args.no_cache else None,
+        'BILLGEN_RENDER_CACHE_DIR': args.cache_dir,
+        'BILLGEN_TEMPLATE_CACHE_DIR': args.template_cache_dir,
+        'BILLGEN_PDF_EXECUTOR': args.executor,
+        'BILLGEN_EXCEL_READER': args.reader,
+        'BILLGEN_TRACE': '1' if args.trace else None,
+        'BILLGEN_TRACE_FILE': args.trace,
+    }
+    if args.workers and Path(args.input).is_file():
+        settings['BILLGEN_PDF_WORKERS'] = str(args.workers)
+    for name, value in settings.items():
+        if value is not None:
+            os.environ[name] = value
+
+
+def convert_file(input_path: Path, output_dir: Path, formats: List[str]) -> Dict[str, Any]:
+    """Run one workbook through the pipeline and write the requested outputs"""
+    from enhanced_document_generator_fixed import EnhancedDocumentGenerator
+    from utils.excel_processor import ExcelProcessor
+
+    data = ExcelProcessor(input_path).process_excel(allow_missing_bill_quantity=True)
+    generator = EnhancedDocumentGenerator(data)
+
+    file_output_dir = output_dir / input_path.stem
+    file_output_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+
+    def write(name: str, content):
+        path = file_output_dir / name
+        if isinstance(content, str):
+            path.write_text(content, encoding='utf-8')
+        else:
+            path.write_bytes(content)
+        written.append(str(path))
+
+    if not {'pdf', 'merged', 'zip'} & set(formats):
+        # HTML only: stream each document to its file instead of holding them all in memory
+        for doc_name in generator.document_names():
+            path = file_output_dir / f"{doc_name.replace(' ', '_').lower()}.html"
+            with open(path, 'w', encoding='utf-8') as output:
+                generator.write_document(doc_name, output)
+            written.append(str(path))
+        return {'file_name': input_path.name, 'success': True, 'generated_files': written, 'reused': []}
+
+    html_documents = generator.generate_all_documents()
+    if 'html' in formats:
+        for doc_name, html in html_documents.items():
+            write(f"{doc_name.replace(' ', '_').lower()}.html", html)
+
+    pdf_documents = generator.create_pdf_documents(html_documents)
+    if 'pdf' in formats:
+        for pdf_name, pdf_bytes in pdf_documents.items():
+            write(pdf_name, pdf_bytes)
+    if {'merged', 'zip'} & set(formats):
+        merged_pdf = generator.merge_pdf_documents(pdf_documents)
+        if 'merged' in formats:
+            write(f"{input_path.stem}_Merged.pdf", merged_pdf)
+        if 'zip' in formats:
+            from utils.zip_packager import ZipPackager
+            package = ZipPackager().create_package(html_documents, pdf_documents, merged_pdf)
+            write(f"{input_path.stem}_documents.zip", package.getvalue())
+
+    return {'file_name': input_path.name, 'success': True, 'generated_files': written,
+            'reused': generator.render_summary['reused']}
+
+
+def run_directory(args: argparse.Namespace) -> Dict[str, Any]:
+    from batch_processor import HighPerformanceBatchProcessor
+
+    processor = HighPerformanceBatchProcessor(args.input, args.output_dir)
+    if args.workers and args.workers > 1:
+        return processor.process_batch_parallel(max_workers=args.workers, use_processes=True, resume=args.resume)
+    return processor.process_batch_sequential(resume=args.resume)
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    input_path = Path(args.input)
+    if not input_path.exists():
+        parser.error(f"{args.input} does not exist")
+    if input_path.is_dir() and set(args.format) - set(BATCH_FORMATS):
+        parser.error(f"directory mode writes {' and '.join(BATCH_FORMATS)} outputs only")
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    apply_settings(args)
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    # The pipeline reports progress with print(); keep stdout for the summary unless verbose
+    with contextlib.ExitStack() as stack:
+        if not args.verbose:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, 'w'))))
+        if input_path.is_dir():
+            result = run_directory(args)
+        else:
+            try:
+                result = convert_file(input_path, output_dir, args.format)
+            except Exception as e:
+                result = {'file_name': input_path.name, 'success': False, 'error': str(e)}
+    elapsed = time.perf_counter() - start
+
+    if input_path.is_dir():
+        print(f"{'✅' if result['success'] else '❌'} {result['message']} in {elapsed:.1f}s")
+        failed = [stats for stats in result.get('stats', []) if not stats.get('success')]
+        for stats in failed:
+            print(f"   ❌ {stats['file_name']}: {stats.get('error')}")
+        return 0 if result['success'] and not failed else 1
+
+    if not result['success']:
+        print(f"❌ {result['file_name']}: {result['error']}")
+        return 1
+    print(f"✅ {result['file_name']}: {len(result['generated_files'])} files in {output_dir} ({elapsed:.1f}s)")
+    if result['reused']:
+        print(f"♻️ Reused {len(result['reused'])} unchanged documents")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,61 @@
 import pandas as pd
-import gc
 from datetime import datetime
-from typing import Dict, Any
+from typing import IO, Dict, Any, BinaryIO, Iterable, Iterator, List, Tuple, Union
 import io
-import tempfile
+import itertools
+import time
 from pathlib import Path
-from functools import lru_cache
+from functools import partial
 import pandas as pd
-from jinja2 import Environment, FileSystemLoader
 from utils.template_renderer import TemplateRenderer
+from utils.template_registry import current_template_version, get_template_environment
+from utils.bill_computation import (
+    build_extra_item_rows, build_work_item_rows, serial_numbers
+)
+from utils.bill_model import BillModel
+from utils.deviation_engine import compute_deviation_frame, format_deviation_rows
+from utils.html_stream import buffered_chunks, write_chunks
+from utils.parallel_conversion import convert_documents
+from utils.pdf_engines import get_engine_registry
+from utils.tracing import span, traced
+from utils.render_cache import (
+    RENDER_CACHE_ENABLED, document_cache_key, frame_fingerprint, get_render_cache, json_digest,
+    merged_cache_key, native_pdf_cache_key, pdf_cache_key
+)
 import os
-import asyncio
-from utils.zip_packager import ZipPackager
 import logging
+from utils.lazy_imports import lazy_import
+
+# Browser pool (asyncio, Playwright), native ReportLab tables and DOCX/ZIP export load on first use
+browser_pool = lazy_import('utils.browser_pool')
+reportlab_tables = lazy_import('utils.reportlab_tables')
+zip_packager = lazy_import('utils.zip_packager')
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Build the tabular documents' PDFs from the bill rows instead of converting their HTML
+NATIVE_PDF_ENABLED = os.environ.get('BILLGEN_NATIVE_PDF', '1').lower() in ('1', 'true', 'yes')
+
 class EnhancedDocumentGenerator:
     """Enhanced document generator with fixed HTML-to-PDF conversion to achieve 95%+ matching"""
     
-    # Class-level cache for template environments
-    _template_env_cache = {}
+    # Inputs each document is rendered from (template and programmatic fallback), in output
+    # order. 'totals' is the computed bill totals, so it changes only when amounts do.
+    DOCUMENT_DEPENDENCIES = {
+        'First Page Summary': ('title_data', 'work_order_data', 'extra_items_data'),
+        'Deviation Statement': ('title_data', 'work_order_data', 'bill_quantity_data'),
+        'Final Bill Scrutiny Sheet': ('title_data', 'bill_quantity_data', 'totals'),
+        'Extra Items Statement': ('extra_items_data',),
+        'Certificate II': ('title_data', 'totals'),
+        'Certificate III': ('title_data', 'work_order_data'),
+    }
+    # Documents whose size grows with the bill, and the templates they are streamed from
+    TABLE_TEMPLATES = {
+        'First Page Summary': 'first_page.html',
+        'Deviation Statement': 'deviation_statement.html',
+        'Extra Items Statement': 'extra_items.html',
+    }
     
     def __init__(self, data: Dict[str, Any]):
         self.data = data
@@ -31,24 +65,26 @@ class EnhancedDocumentGenerator:
         self.bill_quantity_data = data.get('bill_quantity_data', pd.DataFrame())
         self.extra_items_data = data.get('extra_items_data', pd.DataFrame())
         
-        # Use cached template environment
+        # Use the shared, process-wide template environment
         template_dir = os.path.join(os.path.dirname(__file__), 'templates')
-        cache_key = template_dir
-        
-        if cache_key not in self._template_env_cache:
-            self._template_env_cache[cache_key] = Environment(
-                loader=FileSystemLoader(template_dir),
-                cache_size=400,  # Limit template cache size
-                auto_reload=False  # Disable auto-reload for performance
-            )
-        
-        self.jinja_env = self._template_env_cache[cache_key]
+        self.jinja_env = get_template_environment(template_dir)
         
         # Initialize template renderer for templates_14102025 format
         self.template_renderer = TemplateRenderer()
         
+        # Canonical bill figures, computed once and read by every document renderer
+        self._bill_model = None
+        
         # Prepare data for templates with memory optimization
         self.template_data = self._prepare_template_data()
+        
+        # Deviation frame is computed on first use and shared by the HTML and PDF paths
+        self._deviation_frame = None
+        # Item stores of the tabular documents, shared by the HTML, streaming and native PDF paths
+        self._table_data: Dict[str, Dict[str, Any]] = {}
+        # Digests of the document inputs, computed on first use to key the render cache
+        self._input_digests: Dict[str, str] = {}
+        self.render_summary: Dict[str, list] = {'rendered': [], 'reused': []}
     
     def _safe_float(self, value):
         """Safely convert value to float, return 0 if conversion fails"""
@@ -131,156 +167,51 @@ class EnhancedDocumentGenerator:
         else:
             return False
     
-    @lru_cache(maxsize=128)  # Cache number to words conversion
-    def _number_to_words(self, num):
-        """Convert number to words (simplified version)"""
-        if num == 0:
-            return "Zero"
-        
-        ones = ['', 'One', 'Two', 'Three', 'Four', 'Five', 'Six', 'Seven', 'Eight', 'Nine']
-        teens = ['Ten', 'Eleven', 'Twelve', 'Thirteen', 'Fourteen', 'Fifteen', 'Sixteen', 'Seventeen', 'Eighteen', 'Nineteen']
-        tens = ['', '', 'Twenty', 'Thirty', 'Forty', 'Fifty', 'Sixty', 'Seventy', 'Eighty', 'Ninety']
-        
-        def convert_hundreds(n):
-            result = ''
-            if n >= 100:
-                result += ones[n // 100] + ' Hundred '
-                n %= 100
-            if n >= 20:
-                result += tens[n // 10] + ' '
-                n %= 10
-            elif n >= 10:
-                result += teens[n - 10] + ' '
-                n = 0
-            if n > 0:
-                result += ones[n] + ' '
-            return result.strip()
-        
-        if num < 1000:
-            return convert_hundreds(num)
-        elif num < 100000:
-            thousands = num // 1000
-            remainder = num % 1000
-            result = convert_hundreds(thousands) + ' Thousand '
-            if remainder > 0:
-                result += convert_hundreds(remainder)
-            return result.strip()
-        else:
-            lakhs = num // 100000
-            remainder = num % 100000
-            result = convert_hundreds(lakhs) + ' Lakh '
-            if remainder > 0:
-                if remainder >= 1000:
-                    result += convert_hundreds(remainder // 1000) + ' Thousand '
-                    remainder %= 1000
-                if remainder > 0:
-                    result += convert_hundreds(remainder)
-            return result.strip()
+    def get_deviation_frame(self) -> pd.DataFrame:
+        """Return the work order vs bill quantity deviation frame, computed once per generator"""
+        if self._deviation_frame is None:
+            self._deviation_frame = compute_deviation_frame(self.work_order_data, self.bill_quantity_data)
+        return self._deviation_frame
+    
+    def get_bill_model(self) -> BillModel:
+        """Return the bill's line amounts, premium, deductions and totals, computed once per generator"""
+        if self._bill_model is None:
+            self._bill_model = BillModel(self.title_data, self.work_order_data, self.extra_items_data)
+        return self._bill_model
     
+    @traced('template_data.prepare')
     def _prepare_template_data(self) -> Dict[str, Any]:
         """Prepare data structure for Jinja2 templates with VBA-like zero rate handling"""
-        # Calculate totals and prepare structured data
-        work_items = []
-        total_amount = 0
+        # Line arrays are coerced once, in the bill model
+        model = self.get_bill_model()
+        lines = model.work_order_lines(zero_rate_masking=True)
+        total_amount = model.work_order_total
         
-        # Process work order data with memory optimization
-        for index, row in self.work_order_data.iterrows():
-            quantity_since = self._safe_float(row.get('Quantity Since', row.get('Quantity', 0)))
-            rate = self._safe_float(row.get('Rate', 0))
-            amount = quantity_since * rate
-            total_amount += amount
-            
-            # VBA-like behavior: Only populate amounts if rate is not zero
-            if rate != 0:
-                amount_upto = amount
-                amount_since = 0  # As per VBA, Quantity Since is 0 when Quantity Upto has value
-            else:
-                # For zero rates, leave amounts blank/zero as per VBA behavior
-                amount_upto = 0
-                amount_since = 0
-            
-            work_items.append({
-                'unit': row.get('Unit', ''),
-                'quantity_since': quantity_since if rate != 0 else 0,  # VBA behavior
-                'quantity_upto': self._safe_float(row.get('Quantity Upto', quantity_since)),
-                'item_no': self._safe_serial_no(row.get('Item No.', row.get('Item', row.get('S. No.', '')))),
-                'description': row.get('Description', ''),
-                'rate': rate,
-                'amount_upto': amount_upto,
-                'amount_since': amount_since,
-                'remark': row.get('Remark', '')
-            })
-            
-            # Periodic garbage collection for large datasets
-            if index % 100 == 0:
-                gc.collect()
+        # VBA-like behavior: zero-rate rows show no quantity or amount, and
+        # Amount Since stays 0 when Quantity Upto has a value
+        work_items = build_work_item_rows(
+            self.work_order_data, lines, serial_numbers(self.work_order_data)
+        )
         
-        # Process extra items with memory optimization
         extra_items = []
         extra_total = 0
         
         if isinstance(self.extra_items_data, pd.DataFrame) and not self.extra_items_data.empty:
-            for index, row in self.extra_items_data.iterrows():
-                quantity = self._safe_float(row.get('Quantity', 0))
-                rate = self._safe_float(row.get('Rate', 0))
-                amount = quantity * rate
-                extra_total += amount
-                
-                extra_items.append({
-                    'unit': row.get('Unit', ''),
-                    'quantity': quantity,
-                    'item_no': self._safe_serial_no(row.get('Item No.', row.get('Item', row.get('S. No.', '')))),
-                    'description': row.get('Description', ''),
-                    'rate': rate,
-                    'amount': amount,
-                    'remark': row.get('Remark', '')
-                })
-                
-                # Periodic garbage collection for large datasets
-                try:
-                    if int(str(index)) % 50 == 0:
-                        gc.collect()
-                except (ValueError, TypeError):
-                    pass
-        
-        # Calculate premiums
-        tender_premium_percent = self._safe_float(self.title_data.get('TENDER PREMIUM %', 0))
-        premium_amount = total_amount * (tender_premium_percent / 100)
-        grand_total = total_amount + premium_amount
-        
-        extra_premium = extra_total * (tender_premium_percent / 100)
-        extra_grand_total = extra_total + extra_premium
+            extra_total = model.extra_total
+            extra_items = build_extra_item_rows(
+                self.extra_items_data, model.extra_lines, serial_numbers(self.extra_items_data)
+            )
         
-        # Calculate deductions and final amounts
-        sd_amount = grand_total * 0.10  # Security Deposit 10%
-        it_amount = grand_total * 0.02  # Income Tax 2%
-        gst_amount = grand_total * 0.02  # GST 2%
-        lc_amount = grand_total * 0.01  # Labour Cess 1%
-        total_deductions = sd_amount + it_amount + gst_amount + lc_amount
-        net_payable = grand_total - total_deductions
+        # Premiums, deductions and final amounts come from the bill model
+        tender_premium_percent = model.premium_percent
+        bill_totals = model.totals
+        premium_amount = bill_totals['premium_amount']
+        grand_total = bill_totals['grand_total']
+        extra_premium = bill_totals['extra_premium']
+        extra_grand_total = bill_totals['extra_grand_total']
         
         # Calculate totals data structure
-        totals = {
-            'grand_total': grand_total,
-            'work_order_amount': total_amount,
-            'tender_premium_percent': tender_premium_percent / 100,
-            'tender_premium_amount': premium_amount,
-            'final_total': grand_total,
-            'extra_items_sum': extra_grand_total,
-            'sd_amount': sd_amount,
-            'it_amount': it_amount,
-            'gst_amount': gst_amount,
-            'lc_amount': lc_amount,
-            'total_deductions': total_deductions,
-            'net_payable': net_payable,
-            'excess_amount': 0,  # Will be calculated from deviation data
-            'excess_premium': 0,
-            'excess_total': 0,
-            'saving_amount': 0,
-            'saving_premium': 0,
-            'saving_total': 0,
-            'net_difference': 0
-        }
+        totals = model.template_totals()
         
         return {
             'title_data': self.title_data,
@@ -296,7 +227,7 @@ class EnhancedDocumentGenerator:
             'extra_premium': extra_premium,
             'extra_grand_total': extra_grand_total,
             'final_total': grand_total + extra_grand_total,
-            'payable_words': self._number_to_words(int(net_payable)),
+            'payable_words': model.payable_words,
             'notes': ['Work completed as per schedule', 'All measurements verified', 'Quality as per specifications'],
             'data': {
                 'measurement_officer': self.title_data.get('Measurement Officer', 'Measurement Officer Name'),
@@ -394,39 +325,21 @@ class EnhancedDocumentGenerator:
         
         return html_content
     
-    async def _generate_pdf_playwright(self, html_content: str, output_path: str) -> bool:
-        """Generate PDF using Playwright with memory optimization"""
+    @staticmethod
+    def _write_pdf_output(output: Union[str, BinaryIO], pdf_bytes: bytes):
+        """Write PDF bytes to a file path or a binary buffer"""
+        if isinstance(output, (str, os.PathLike)):
+            with open(output, 'wb') as f:
+                f.write(pdf_bytes)
+        else:
+            output.write(pdf_bytes)
+    
+    async def _generate_pdf_playwright(self, html_content: str, output: Union[str, BinaryIO]) -> bool:
+        """Generate PDF using the shared Playwright browser pool"""
         try:
-            # Lazy import to avoid hard dependency at module import time
-            from playwright.async_api import async_playwright
-            async with async_playwright() as p:
-                browser = await p.chromium.launch()
-                page = await browser.new_page()
-                
-                # Set viewport for consistent rendering
-                await page.set_viewport_size({"width": 1200, "height": 1600})
-                
-                # Load HTML content with extended timeout
-                await page.set_content(html_content, timeout=60000)  # 60 seconds timeout
-                
-                # Generate PDF with proper settings
-                await page.pdf(
-                    path=output_path,
-                    format='A4',
-                    print_background=True,
-                    margin={
-                        'top': '1cm',
-                        'right': '1cm', 
-                        'bottom': '1cm',
-                        'left': '1cm'
-                    }
-                )
-                
-                await browser.close()
-                
-                # Force garbage collection after PDF generation
-                gc.collect()
-                return True
+            pdf_bytes = await browser_pool.get_browser_pool().render_pdf_async(html_content)
+            self._write_pdf_output(output, pdf_bytes)
+            return True
         except ImportError:
             # Playwright not installed in the environment
             logger.error("Playwright not installed; skipping Playwright PDF generation")
@@ -435,8 +348,93 @@ class EnhancedDocumentGenerator:
             logger.error(f"Playwright PDF generation error: {str(e)}")
             return False
     
-    def _generate_pdf_weasyprint(self, html_content: str, output_path: str) -> bool:
-        """Generate PDF using WeasyPrint"""
+    @traced('pdf.playwright_pool')
+    def _render_playwright_documents(self, documents: Dict[str, str]) -> Dict[str, bytes]:
+        """Render all documents of a bill concurrently on the shared browser pool"""
+        registry = get_engine_registry()
+        if not registry.is_available('playwright'):
+            logger.error("Playwright not installed; skipping Playwright PDF generation")
+            return {}
+        start = time.perf_counter()
+        try:
+            results = browser_pool.get_browser_pool().render_documents(documents)
+        except Exception as e:
+            logger.error(f"Playwright PDF generation error: {str(e)}")
+            return {}
+        # Documents render concurrently, so each is charged the batch wall time
+        elapsed = time.perf_counter() - start
+        for name, pdf_bytes in results.items():
+            registry.record('playwright', name, bool(pdf_bytes), elapsed)
+        return {name: pdf_bytes for name, pdf_bytes in results.items() if pdf_bytes}
+    
+    def _table_document_data(self, doc_name: str) -> Dict[str, Any]:
+        """
+        Template data of a tabular document, shared by its template and native PDF renderers.
+        
+        Prepared once per generator: the item rows are a columnar ItemStore that every
+        renderer of the document iterates.
+        """
+        if doc_name in self._table_data:
+            return self._table_data[doc_name]
+        renderer = self.template_renderer
+        if doc_name == 'First Page Summary':
+            data = renderer._prepare_first_page_data(self.title_data, self.work_order_data, self.extra_items_data,
+                                                     model=self.get_bill_model())
+        elif doc_name == 'Deviation Statement':
+            data = renderer._prepare_deviation_data(self.title_data, self.work_order_data, model=self.get_bill_model(),
+                                                   frame=self.get_deviation_frame())
+        elif doc_name == 'Extra Items Statement':
+            data = renderer._prepare_extra_items_data(self.extra_items_data)
+        else:
+            raise KeyError(f"{doc_name} is not a tabular document")
+        self._table_data[doc_name] = data
+        return data
+    
+    def _generate_pdf_native(self, doc_name: str, output: Union[str, BinaryIO]) -> bool:
+        """Build a tabular document as ReportLab tables from the same rows its template renders"""
+        try:
+            reportlab_tables.build_document(doc_name, self._table_document_data(doc_name), output)
+            return True
+        except Exception as e:
+            print(f"Native ReportLab PDF generation failed for {doc_name}: {str(e)}")
+            return False
+    
+    def _has_bill_data(self) -> bool:
+        """Whether a bill was loaded, rather than the generator being created empty for its converters"""
+        has_work_order = isinstance(self.work_order_data, pd.DataFrame) and not self.work_order_data.empty
+        return has_work_order or self._has_extra_items()
+    
+    def _native_documents(self, doc_names: Iterable[str]) -> List[str]:
+        """
+        The documents to build natively from the bill rows.
+        
+        None without bill data: the native renderer ignores the HTML, so an empty generator
+        would produce blank tables.
+        """
+        if not NATIVE_PDF_ENABLED or not self._has_bill_data():
+            return []
+        return [doc_name for doc_name in doc_names if doc_name in reportlab_tables.NATIVE_DOCUMENTS]
+    
+    @traced('pdf.native_tables')
+    def _render_native_documents(self, doc_names: List[str]) -> Dict[str, bytes]:
+        """
+        Build the tabular documents straight from the bill rows, skipping HTML conversion.
+        
+        Documents that fail are left out and go through the HTML engines.
+        """
+        registry = get_engine_registry()
+        pdfs = {}
+        for doc_name in doc_names:
+            # The engine wrapper passes the HTML along, which the native renderer does not need
+            engine = self._engine_to_bytes(
+                lambda html_content, output, doc_name=doc_name: self._generate_pdf_native(doc_name, output))
+            pdf_bytes = registry.convert(doc_name, {'reportlab-native': engine}, '')
+            if pdf_bytes:
+                pdfs[doc_name] = pdf_bytes
+        return pdfs
+    
+    def _generate_pdf_weasyprint(self, html_content: str, output: Union[str, BinaryIO]) -> bool:
+        """Generate PDF using WeasyPrint into a file path or binary buffer"""
         try:
             from weasyprint import HTML, CSS
             from weasyprint.text.fonts import FontConfiguration
@@ -469,7 +467,7 @@ class EnhancedDocumentGenerator:
             
             # Generate PDF
             HTML(string=html_content).write_pdf(
-                output_path, 
+                output, 
                 stylesheets=[css], 
                 font_config=font_config
             )
@@ -481,8 +479,8 @@ class EnhancedDocumentGenerator:
             print(f"WeasyPrint PDF generation failed: {str(e)}")
             return False
     
-    def _generate_pdf_pdfkit(self, html_content: str, output_path: str) -> bool:
-        """Generate PDF using pdfkit with fixed options"""
+    def _generate_pdf_pdfkit(self, html_content: str, output: Union[str, BinaryIO]) -> bool:
+        """Generate PDF using pdfkit with fixed options into a file path or binary buffer"""
         try:
             import pdfkit
             
@@ -505,7 +503,8 @@ class EnhancedDocumentGenerator:
             }
             
             # Generate PDF
-            pdfkit.from_string(html_content, output_path, options=options)
+            # output_path=False makes pdfkit return the PDF bytes instead of writing a file
+            self._write_pdf_output(output, pdfkit.from_string(html_content, False, options=options))
             return True
         except ImportError:
             print("pdfkit not installed")
@@ -514,7 +513,7 @@ class EnhancedDocumentGenerator:
             print(f"pdfkit PDF generation failed: {str(e)}")
             return False
     
-    def _generate_pdf_reportlab(self, html_content: str, output_path: str) -> bool:
+    def _generate_pdf_reportlab(self, html_content: str, output: Union[str, BinaryIO]) -> bool:
         """Generate PDF using ReportLab as a fallback method with better HTML parsing"""
         try:
             from reportlab.pdfgen import canvas
@@ -530,7 +529,7 @@ class EnhancedDocumentGenerator:
             soup = BeautifulSoup(html_content, 'html.parser')
             
             # Create a PDF document
-            doc = SimpleDocTemplate(output_path, pagesize=A4)
+            doc = SimpleDocTemplate(output, pagesize=A4)
             story = []
             
             # Get styles
@@ -628,14 +627,10 @@ class EnhancedDocumentGenerator:
         html_content = self._fix_html_structure(html_content)
         html_content = self._add_print_css(html_content)
         
-        # Method 1: Using Playwright (Most Reliable)
+        # Method 1: Using Playwright (Most Reliable) on the persistent browser pool
         try:
-            # Run async function in event loop
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self._generate_pdf_playwright(html_content, output_path))
-            loop.close()
-            if result:
+            if get_engine_registry().is_available('playwright'):
+                self._write_pdf_output(output_path, browser_pool.get_browser_pool().render_pdf(html_content))
                 print(f"✅ Playwright successful for {output_path}")
                 return True
         except Exception as e:
@@ -653,61 +648,126 @@ class EnhancedDocumentGenerator:
             
         return False
     
+    def _input_digest(self, input_name: str) -> str:
+        """Digest of one declared document input (see DOCUMENT_DEPENDENCIES)"""
+        if input_name not in self._input_digests:
+            if input_name == 'title_data':
+                digest = json_digest(self.title_data)
+            elif input_name == 'totals':
+                digest = json_digest(self.template_data['totals'])
+            else:
+                digest = frame_fingerprint(getattr(self, input_name))
+            self._input_digests[input_name] = digest
+        return self._input_digests[input_name]
+    
+    def _document_inputs(self, doc_name: str) -> Dict[str, str]:
+        """Digests of only the inputs the document depends on"""
+        return {name: self._input_digest(name) for name in self.DOCUMENT_DEPENDENCIES[doc_name]}
+    
+    def document_cache_key(self, doc_name: str, template_version: str = None) -> str:
+        """Render cache key built from only the inputs the document depends on"""
+        return document_cache_key(doc_name, self._document_inputs(doc_name), template_version)
+    
+    @traced('render.all_documents')
     def generate_all_documents(self) -> Dict[str, str]:
         """
         Generate all required documents using Jinja2 templates
         
+        Generation is incremental: each document is cached on the inputs it depends on,
+        so only documents whose inputs changed are re-rendered (see ``render_summary``).
+        
         Returns:
             Dictionary containing all generated documents in HTML format
         """
         documents = {}
+        self.render_summary = {'rendered': [], 'reused': []}
+        cache = get_render_cache() if RENDER_CACHE_ENABLED else None
+        template_version = current_template_version() if cache is not None else None
         
-        # Generate First Page using template renderer that matches templates_14102025 format
-        try:
-            documents['First Page Summary'] = self.template_renderer.render_first_page(
-                self.title_data, self.work_order_data, self.extra_items_data
-            )
-        except Exception as e:
-            print(f"First Page template rendering failed, falling back to programmatic generation: {e}")
-            documents['First Page Summary'] = self._generate_first_page()
-        
-        # Generate other documents using templates
-        try:
-            # Use specialized renderers for deviation statement, extra items, certificate II, and certificate III
-            documents['Deviation Statement'] = self.template_renderer.render_deviation_statement(
-                self.title_data, self.work_order_data, self.extra_items_data)
-            documents['Final Bill Scrutiny Sheet'] = self.template_renderer.render_note_sheet(
-                self.title_data, self.work_order_data, self.extra_items_data)
-            
-            # Only generate Extra Items document if there are extra items
-            if self._has_extra_items():
-                documents['Extra Items Statement'] = self.template_renderer.render_extra_items(
-                    self.title_data, self.work_order_data, self.extra_items_data)
-            
-            # Use specialized renderers for Certificates
-            documents['Certificate II'] = self.template_renderer.render_certificate_ii(
-                self.title_data, self.work_order_data, self.extra_items_data)
-            documents['Certificate III'] = self.template_renderer.render_certificate_iii(
-                self.title_data, self.work_order_data, self.extra_items_data)
-        except Exception as template_error:
-            print(f"Template rendering failed, falling back to programmatic generation: {template_error}")
-            # Fallback to programmatic generation if templates fail (but keep First Page)
-            if 'Deviation Statement' not in documents:
-                documents['Deviation Statement'] = self._generate_deviation_statement()
-            if 'Final Bill Scrutiny Sheet' not in documents:
-                documents['Final Bill Scrutiny Sheet'] = self._generate_final_bill_scrutiny()
-            
-            # Only generate Extra Items document if there are extra items
-            if self._has_extra_items() and 'Extra Items Statement' not in documents:
-                documents['Extra Items Statement'] = self._generate_extra_items_statement()
-            
-            if 'Certificate II' not in documents:
-                documents['Certificate II'] = self._generate_certificate_ii()
-            if 'Certificate III' not in documents:
-                documents['Certificate III'] = self._generate_certificate_iii()
+        for doc_name in self.document_names():
+            key = self.document_cache_key(doc_name, template_version) if cache is not None else None
+            html_content = cache.get(key) if cache is not None else None
+            if html_content is None:
+                html_content = self._render_document(doc_name)
+                if cache is not None:
+                    cache.put(key, html_content)
+                self.render_summary['rendered'].append(doc_name)
+            else:
+                self.render_summary['reused'].append(doc_name)
+            documents[doc_name] = html_content
         
         return documents
     
+    def document_names(self) -> List[str]:
+        """Names of the documents generated for this bill, in output order"""
+        # Only generate Extra Items document if there are extra items
+        return [doc_name for doc_name in self.DOCUMENT_DEPENDENCIES
+                if doc_name != 'Extra Items Statement' or self._has_extra_items()]
+    
+    def stream_document(self, doc_name: str) -> Iterator[str]:
+        """
+        Render one document as chunks of HTML, without building the whole string.
+        
+        Tabular documents are streamed from their templates with ``Template.generate()``;
+        the others are small and rendered as usual. A cached rendering is served as is.
+        The first chunk is pulled before returning, so a template that fails (or yields
+        nothing) up to that point falls back to ``_render_document``; an error later in
+        the stream is raised to the consumer.
+        """
+        cache = get_render_cache() if RENDER_CACHE_ENABLED else None
+        html_content = None
+        if cache is not None:
+            html_content = cache.get(self.document_cache_key(doc_name))
+        if html_content is None and doc_name in self.TABLE_TEMPLATES:
+            try:
+                chunks = self.template_renderer.stream_template(self.TABLE_TEMPLATES[doc_name],
+                                                                self._table_document_data(doc_name))
+                first = next(chunks)
+                return itertools.chain([first], chunks)
+            except StopIteration:
+                print(f"{doc_name} template streamed nothing, rendering it whole")
+            except Exception as e:
+                print(f"{doc_name} template streaming failed, rendering it whole: {e}")
+        if html_content is None:
+            html_content = self._render_document(doc_name)
+        return buffered_chunks([html_content])
+    
+    def write_document(self, doc_name: str, output: IO) -> int:
+        """Stream one document's HTML to a text or binary stream; returns the characters written"""
+        with span('render.stream_document', document=doc_name):
+            return write_chunks(self.stream_document(doc_name), output)
+    
+    def _render_document(self, doc_name: str) -> str:
+        """
+        Render one document with the template renderer that matches the templates_14102025
+        format, falling back to programmatic generation if the template fails
+        """
+        model = self.get_bill_model()
+        renderers = {
+            'First Page Summary': (partial(self.template_renderer.render_first_page, model=model),
+                                   self._generate_first_page),
+            'Deviation Statement': (partial(self.template_renderer.render_deviation_statement, model=model,
+                                            bill_quantity_data=self.bill_quantity_data),
+                                    self._generate_deviation_statement),
+            'Final Bill Scrutiny Sheet': (partial(self.template_renderer.render_note_sheet, model=model),
+                                          self._generate_final_bill_scrutiny),
+            'Extra Items Statement': (self.template_renderer.render_extra_items,
+                                      self._generate_extra_items_statement),
+            'Certificate II': (self.template_renderer.render_certificate_ii, self._generate_certificate_ii),
+            'Certificate III': (partial(self.template_renderer.render_certificate_iii, model=model),
+                                self._generate_certificate_iii),
+        }
+        render_template, render_fallback = renderers[doc_name]
+        with span('render.document', document=doc_name):
+            try:
+                if doc_name in self.TABLE_TEMPLATES:
+                    return self.template_renderer.render_template(self.TABLE_TEMPLATES[doc_name],
+                                                                  self._table_document_data(doc_name))
+                return render_template(self.title_data, self.work_order_data, self.extra_items_data)
+            except Exception as e:
+                print(f"{doc_name} template rendering failed, falling back to programmatic generation: {e}")
+                return render_fallback()
+    
     def _render_template(self, template_name: str) -> str:
         """Render a Jinja2 template with the prepared data"""
         try:
@@ -717,100 +777,145 @@ class EnhancedDocumentGenerator:
             print(f"Failed to render template {template_name}: {e}")
             raise
     
-    def create_pdf_documents(self, documents: Dict[str, str]) -> Dict[str, bytes]:
-        """Create PDF documents from HTML with enhanced memory management"""
+    def _engine_to_bytes(self, engine):
+        """Wrap a path-or-buffer engine method so it returns usable PDF bytes or None"""
+        def convert(html_content: str):
+            # Fresh buffer per engine so a partial write from a failed engine is discarded
+            buffer = io.BytesIO()
+            if engine(html_content, buffer):
+                pdf_bytes = buffer.getvalue()
+                # Only keep reasonably sized PDFs (at least 100 bytes to account for minimal valid PDFs)
+                if len(pdf_bytes) > 100:
+                    return pdf_bytes
+            return None
+        return convert
+    
+    def _convert_single_document(self, doc_name: str, html_content: str) -> Tuple[bytes, bool]:
+        """
+        Convert one HTML document to PDF bytes in memory on the first known-good engine
+        
+        Returns:
+            Tuple of (PDF bytes, success); an error PDF is returned when every engine fails
+        """
+        engines = {
+            'reportlab': self._engine_to_bytes(self._generate_pdf_reportlab),
+            'weasyprint': self._engine_to_bytes(self._generate_pdf_weasyprint),
+            'pdfkit': self._engine_to_bytes(self._generate_pdf_pdfkit),
+        }
+        try:
+            pdf_bytes = get_engine_registry().convert(doc_name, engines, html_content)
+            if pdf_bytes:
+                return pdf_bytes, True
+            # Create error PDF using ReportLab
+            return self._create_error_pdf(doc_name, "PDF generation failed"), False
+        except Exception as e:
+            logger.error(f"Error creating PDF for {doc_name}: {str(e)}")
+            return self._create_error_pdf(doc_name, str(e)), False
+    
+    def _checked_pdf(self, doc_name: str, pdf_bytes: bytes) -> bytes:
+        """Only keep reasonably sized PDFs (at least 100 bytes to account for minimal valid PDFs)"""
+        if len(pdf_bytes) > 100:
+            return pdf_bytes
+        logger.warning(f"Generated PDF too small: {doc_name} ({len(pdf_bytes)} bytes)")
+        return self._create_error_pdf(doc_name, f"PDF too small: {len(pdf_bytes)} bytes")
+    
+    @traced('pdf.create_documents')
+    def create_pdf_documents(self, documents: Dict[str, str], executor_type: str = None,
+                             max_workers: int = None) -> Dict[str, bytes]:
+        """
+        Create PDF documents from HTML.
+        
+        PDFs already rendered from identical HTML with the same engines come from the
+        render cache. The rest are converted concurrently (see utils.parallel_conversion;
+        ``executor_type`` is 'auto', 'thread', 'process' or 'serial'). Results are returned
+        in the order of ``documents``.
+        """
         pdf_files = {}
-        temp_files = []
         
         try:
-            # Create temporary directory for PDF generation
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_path = Path(temp_dir)
-                
-                for doc_name, html_content in documents.items():
-                    try:
-                        # Create temporary file path
-                        temp_pdf_path = temp_path / f"{doc_name}.pdf"
-                        temp_files.append(temp_pdf_path)
-                        
-                        # Try multiple PDF generation methods
-                        success = False
-                        
-                        # Method 1: Try Playwright (most reliable) if explicitly enabled
-                        try:
-                            enable_playwright = os.environ.get('ENABLE_PLAYWRIGHT_PDF', '0').lower() in ('1', 'true', 'yes')
-                        except Exception:
-                            enable_playwright = False
-                        if enable_playwright:
-                            try:
-                                success = asyncio.run(self._generate_pdf_async(html_content, str(temp_pdf_path)))
-                            except Exception as e:
-                                print(f"Playwright failed for {doc_name}: {str(e)}")
-                        
-                        # Method 2: Try ReportLab as fallback
-                        if not success:
-                            try:
-                                success = self._generate_pdf_reportlab(html_content, str(temp_pdf_path))
-                            except Exception as e:
-                                print(f"ReportLab failed for {doc_name}: {str(e)}")
-                        
-                        # Method 3: Try WeasyPrint
-                        if not success:
-                            try:
-                                success = self._generate_pdf_weasyprint(html_content, str(temp_pdf_path))
-                            except Exception as e:
-                                print(f"WeasyPrint failed for {doc_name}: {str(e)}")
-                        
-                        # Method 4: Try pdfkit
-                        if not success:
-                            try:
-                                success = self._generate_pdf_pdfkit(html_content, str(temp_pdf_path))
-                            except Exception as e:
-                                print(f"pdfkit failed for {doc_name}: {str(e)}")
-                        
-                        if success and temp_pdf_path.exists():
-                            # Read PDF content
-                            with open(temp_pdf_path, 'rb') as f:
-                                pdf_bytes = f.read()
-                            
-                            # Only keep reasonably sized PDFs (at least 100 bytes to account for minimal valid PDFs)
-                            if len(pdf_bytes) > 100:  # At least 100 bytes for minimal valid PDF
-                                pdf_files[f"{doc_name}.pdf"] = pdf_bytes
-                            else:
-                                logger.warning(f"Generated PDF too small: {doc_name} ({len(pdf_bytes)} bytes)")
-                                # Create a simple ReportLab PDF as fallback
-                                error_pdf = self._create_error_pdf(doc_name, f"PDF too small: {len(pdf_bytes)} bytes")
-                                pdf_files[f"{doc_name}.pdf"] = error_pdf
-                        else:
-                            # Create error PDF using ReportLab
-                            error_pdf = self._create_error_pdf(doc_name, "PDF generation failed")
-                            pdf_files[f"{doc_name}.pdf"] = error_pdf
-                        
-                        # Force garbage collection after each PDF
-                        gc.collect()
-                        
-                    except Exception as e:
-                        logger.error(f"Error creating PDF for {doc_name}: {str(e)}")
-                        # Create error PDF using ReportLab
-                        error_pdf = self._create_error_pdf(doc_name, str(e))
-                        pdf_files[f"{doc_name}.pdf"] = error_pdf
-                
-                # Clean up temporary files explicitly
-                for temp_file in temp_files:
-                    try:
-                        if temp_file.exists():
-                            temp_file.unlink()
-                    except Exception:
-                        pass
+            # Method 1: Playwright (most reliable) if explicitly enabled - all documents
+            # are rendered concurrently on the shared browser pool
+            try:
+                enable_playwright = os.environ.get('ENABLE_PLAYWRIGHT_PDF', '0').lower() in ('1', 'true', 'yes')
+            except Exception:
+                enable_playwright = False
+            
+            cache = get_render_cache() if RENDER_CACHE_ENABLED else None
+            engine_version = get_engine_registry().engine_version() + ('+pool' if enable_playwright else '')
+            if NATIVE_PDF_ENABLED:
+                engine_version += '+native'
+            # Native PDFs are keyed on the bill inputs they are built from, the rest on their HTML
+            native_names = self._native_documents(documents)
+            cache_keys = {
+                name: (native_pdf_cache_key(name, self._document_inputs(name), engine_version)
+                       if name in native_names else pdf_cache_key(name, html, engine_version))
+                for name, html in documents.items()
+            }
+            cached = {}
+            if cache is not None:
+                for name, key in cache_keys.items():
+                    pdf_bytes = cache.get(key)
+                    if pdf_bytes is not None:
+                        cached[name] = pdf_bytes
+            pending = {name: html for name, html in documents.items() if name not in cached}
+            
+            playwright_pdfs = self._render_playwright_documents(pending) if enable_playwright and pending else {}
+            
+            remaining = {name: html for name, html in pending.items() if name not in playwright_pdfs}
+            # Tabular documents are built from the bill rows here, where the data is, rather than
+            # in the conversion workers, which only receive HTML
+            native_pdfs = self._render_native_documents([name for name in remaining if name in native_names])
+            
+            remaining = {name: html for name, html in remaining.items() if name not in native_pdfs}
+            # A native document that fell back to its HTML is cached on that HTML
+            for name in remaining:
+                cache_keys[name] = pdf_cache_key(name, documents[name], engine_version)
+            registry = get_engine_registry()
+            converted = {}
+            for doc_name, (pdf_bytes, success, attempts) in convert_documents(
+                    _convert_document_in_worker, remaining,
+                    executor_type=executor_type, max_workers=max_workers).items():
+                # Process pool workers report their engine attempts for the parent's routing
+                registry.record_worker_attempts(attempts)
+                converted[doc_name] = (pdf_bytes, success)
+            for doc_name, pdf_bytes in {**playwright_pdfs, **native_pdfs}.items():
+                converted[doc_name] = (self._checked_pdf(doc_name, pdf_bytes), len(pdf_bytes) > 100)
+            
+            for doc_name in documents:
+                if doc_name in cached:
+                    pdf_files[f"{doc_name}.pdf"] = cached[doc_name]
+                    continue
+                pdf_bytes, success = converted[doc_name]
+                pdf_files[f"{doc_name}.pdf"] = pdf_bytes
+                # Error PDFs are not cached so the next run retries the conversion
+                if success and cache is not None:
+                    cache.put(cache_keys[doc_name], pdf_bytes)
                         
         except Exception as e:
             logger.error(f"Error in PDF creation process: {str(e)}")
-        finally:
-            # Final garbage collection
-            gc.collect()
         
         return pdf_files
     
+    @traced('pdf.merge_documents')
+    def merge_pdf_documents(self, pdf_documents: Dict[str, bytes]) -> bytes:
+        """Merge the PDFs in order, reusing the merged output when no document changed"""
+        from utils.pdf_merger import PDFMerger
+        if not RENDER_CACHE_ENABLED:
+            return PDFMerger().merge_pdfs(pdf_documents)
+        
+        cache = get_render_cache()
+        key = merged_cache_key(pdf_documents)
+        merged_pdf = cache.get(key)
+        if merged_pdf is None:
+            merged_pdf = PDFMerger().merge_pdfs(pdf_documents)
+            if merged_pdf:
+                cache.put(key, merged_pdf)
+        return merged_pdf
+    
+    def get_render_cache_stats(self) -> Dict[str, Any]:
+        """Hit rates and memory usage of the process-wide rendered document cache"""
+        return get_render_cache().stats()
+    
     def generate_all_formats_and_zip(self) -> Dict[str, Any]:
         """
         Generate all documents in HTML, DOC, and PDF formats, plus create a ZIP package
@@ -851,9 +956,7 @@ class EnhancedDocumentGenerator:
             
             # Step 3: Generate merged PDF
             print("🔄 Creating merged PDF...")
-            from utils.pdf_merger import PDFMerger
-            merger = PDFMerger()
-            merged_pdf = merger.merge_pdfs(pdf_documents)
+            merged_pdf = self.merge_pdf_documents(pdf_documents)
             result['merged_pdf'] = merged_pdf
             
             if merged_pdf:
@@ -863,12 +966,12 @@ class EnhancedDocumentGenerator:
             
             # Step 4: Generate DOC documents using zip packager
             print("🔄 Generating DOC documents...")
-            zip_packager = ZipPackager()
+            packager = zip_packager.ZipPackager()
             doc_documents = {}
             
             for doc_name, html_content in html_documents.items():
                 try:
-                    doc_bytes = zip_packager._html_to_docx_bytes(doc_name, html_content)
+                    doc_bytes = packager._html_to_docx_bytes(doc_name, html_content)
                     doc_documents[f"{doc_name}.docx"] = doc_bytes
                 except Exception as e:
                     print(f"⚠️  Failed to generate DOC for {doc_name}: {str(e)}")
@@ -880,7 +983,7 @@ class EnhancedDocumentGenerator:
             
             # Step 5: Create ZIP package with all formats
             print("🔄 Creating ZIP package...")
-            zip_package = zip_packager.create_package(html_documents, pdf_documents, merged_pdf)
+            zip_package = packager.create_package(html_documents, pdf_documents, merged_pdf)
             result['zip_package'] = zip_package.getvalue()
             result['success'] = True
             
@@ -906,7 +1009,7 @@ class EnhancedDocumentGenerator:
         """Generate First Page Summary document with enhanced structure"""
         current_date = datetime.now().strftime('%d/%m/%Y')
         
-        html_content = f"""
+        html_parts = [f"""
         <!DOCTYPE html>
         <html>
         <head>
@@ -984,7 +1087,7 @@ class EnhancedDocumentGenerator:
                         </tr>
                     </thead>
                     <tbody>
-        """
+        """]
         
         # Add work order items
         for index, row in self.work_order_data.iterrows():
@@ -1002,7 +1105,7 @@ class EnhancedDocumentGenerator:
             amt_upto_display = f"{amount_upto:.2f}" if amount_upto > 0 else ""
             amt_since_display = f"{amount_since:.2f}" if amount_since > 0 else ""
             
-            html_content += f"""
+            html_parts.append(f"""
                         <tr>
                             <td>{row.get('Unit', '')}</td>
                             <td class="amount">{qty_since_display}</td>
@@ -1014,16 +1117,12 @@ class EnhancedDocumentGenerator:
                             <td class="amount">{amt_since_display}</td>
                             <td>{row.get('Remark', '')}</td>
                         </tr>
-            """
+            """)
         
-        # Calculate totals
-        total_amount = 0
-        for _, row in self.work_order_data.iterrows():
-            quantity_since = self._safe_float(row.get('Quantity Since', row.get('Quantity', 0)))
-            rate = self._safe_float(row.get('Rate', 0))
-            total_amount += quantity_since * rate
+        # Totals from the bill model
+        total_amount = self.get_bill_model().work_order_total
         
-        html_content += f"""
+        html_parts.append(f"""
                         <tr style="font-weight: bold;">
                             <td colspan="6">TOTAL</td>
                             <td class="amount">{total_amount:.2f}</td>
@@ -1035,15 +1134,15 @@ class EnhancedDocumentGenerator:
             </div>
         </body>
         </html>
-        """
+        """)
         
-        return html_content
+        return ''.join(html_parts)
     
     def _generate_deviation_statement(self) -> str:
         """Generate Deviation Statement document with enhanced structure"""
         current_date = datetime.now().strftime('%d/%m/%Y')
         
-        html_content = f"""
+        html_parts = [f"""
         <!DOCTYPE html>
         <html>
         <head>
@@ -1145,77 +1244,44 @@ class EnhancedDocumentGenerator:
                         </tr>
                     </thead>
                     <tbody>
-        """
+        """]
         
-        # Compare work order with bill quantity data
-        for index, wo_row in self.work_order_data.iterrows():
-            # Find corresponding bill quantity row
-            bq_row = None
-            if isinstance(self.bill_quantity_data, pd.DataFrame) and not self.bill_quantity_data.empty:
-                wo_item = wo_row.get('Item No.', wo_row.get('Item', wo_row.get('S. No.', '')))
-                bq_item_col = 'Item No.' if 'Item No.' in self.bill_quantity_data.columns else ('Item' if 'Item' in self.bill_quantity_data.columns else 'S. No.')
-                matching_rows = self.bill_quantity_data[
-                    self.bill_quantity_data[bq_item_col] == wo_item
-                ]
-                if isinstance(matching_rows, pd.DataFrame) and not matching_rows.empty:
-                    bq_row = matching_rows.iloc[0]
-            
-            wo_qty = self._safe_float(wo_row.get('Quantity Since', wo_row.get('Quantity', 0)))
-            wo_rate = self._safe_float(wo_row.get('Rate', 0))
-            wo_amount = wo_qty * wo_rate
-            
-            bq_qty = self._safe_float(bq_row.get('Quantity', 0)) if bq_row is not None else 0
-            bq_amount = bq_qty * wo_rate
-            
-            excess_qty = max(0, bq_qty - wo_qty)
-            excess_amt = excess_qty * wo_rate
-            saving_qty = max(0, wo_qty - bq_qty)
-            saving_amt = saving_qty * wo_rate
-            
-            # Format deviation values - show all values including zeros
-            wo_qty_display = f"{wo_qty:.2f}" if wo_qty >= 0 else "0.00"
-            wo_rate_display = f"{wo_rate:.2f}" if wo_rate >= 0 else "0.00"
-            wo_amount_display = f"{wo_amount:.2f}" if wo_amount >= 0 else "0.00"
-            bq_qty_display = f"{bq_qty:.2f}" if bq_qty >= 0 else "0.00"
-            bq_amount_display = f"{bq_amount:.2f}" if bq_amount >= 0 else "0.00"
-            excess_qty_display = f"{excess_qty:.2f}" if excess_qty >= 0 else "0.00"
-            excess_amt_display = f"{excess_amt:.2f}" if excess_amt >= 0 else "0.00"
-            saving_qty_display = f"{saving_qty:.2f}" if saving_qty >= 0 else "0.00"
-            saving_amt_display = f"{saving_amt:.2f}" if saving_amt >= 0 else "0.00"
-            
-            html_content += f"""
+        # Align work order and bill quantity rows in a single lookup
+        deviation_rows = format_deviation_rows(self.get_deviation_frame(), show_zero=True)
+        for row in deviation_rows:
+            html_parts.append(f"""
                         <tr>
-                            <td>{self._safe_serial_no(wo_row.get('Item No.', wo_row.get('Item', '')))}</td>
-                            <td>{wo_row.get('Description', '')}</td>
-                            <td>{wo_row.get('Unit', '')}</td>
-                            <td class="amount">{wo_qty_display}</td>
-                            <td class="amount">{wo_rate_display}</td>
-                            <td class="amount">{wo_amount_display}</td>
-                            <td class="amount">{bq_qty_display}</td>
-                            <td class="amount">{bq_amount_display}</td>
-                            <td class="amount">{excess_qty_display}</td>
-                            <td class="amount">{excess_amt_display}</td>
-                            <td class="amount">{saving_qty_display}</td>
-                            <td class="amount">{saving_amt_display}</td>
+                            <td>{row['item_no']}</td>
+                            <td>{row['description']}</td>
+                            <td>{row['unit']}</td>
+                            <td class="amount">{row['qty_wo']}</td>
+                            <td class="amount">{row['rate']}</td>
+                            <td class="amount">{row['amt_wo']}</td>
+                            <td class="amount">{row['qty_bill']}</td>
+                            <td class="amount">{row['amt_bill']}</td>
+                            <td class="amount">{row['excess_qty']}</td>
+                            <td class="amount">{row['excess_amt']}</td>
+                            <td class="amount">{row['saving_qty']}</td>
+                            <td class="amount">{row['saving_amt']}</td>
                             <td></td>
                         </tr>
-            """
+            """)
         
-        html_content += """
+        html_parts.append("""
                     </tbody>
                 </table>
             </div>
         </body>
         </html>
-        """
+        """)
         
-        return html_content
+        return ''.join(html_parts)
     
     def _generate_final_bill_scrutiny(self) -> str:
         """Generate Final Bill Scrutiny Sheet with enhanced structure"""
         current_date = datetime.now().strftime('%d/%m/%Y')
         
-        html_content = f"""
+        html_parts = [f"""
         <!DOCTYPE html>
         <html>
         <head>
@@ -1283,7 +1349,7 @@ class EnhancedDocumentGenerator:
                         </tr>
                     </thead>
                     <tbody>
-        """
+        """]
         
         total_amount = 0
         for index, row in self.bill_quantity_data.iterrows():
@@ -1292,7 +1358,7 @@ class EnhancedDocumentGenerator:
             amount = quantity * rate
             total_amount += amount
             
-            html_content += f"""
+            html_parts.append(f"""
                         <tr>
                             <td>{self._safe_serial_no(row.get('Item No.', row.get('Item', row.get('S. No.', ''))))}</td>
                             <td>{row.get('Description', '')}</td>
@@ -1301,9 +1367,9 @@ class EnhancedDocumentGenerator:
                             <td class="amount">{self._format_number(rate)}</td>
                             <td class="amount">{self._format_number(amount)}</td>
                         </tr>
-            """
+            """)
         
-        html_content += f"""
+        html_parts.append(f"""
                         <tr style="font-weight: bold;">
                             <td colspan="5">TOTAL</td>
                             <td class="amount">{total_amount:.0f}</td>
@@ -1313,15 +1379,15 @@ class EnhancedDocumentGenerator:
             </div>
         </body>
         </html>
-        """
+        """)
         
-        return html_content
+        return ''.join(html_parts)
     
     def _generate_extra_items_statement(self) -> str:
         """Generate Extra Items Statement with enhanced structure"""
         current_date = datetime.now().strftime('%d/%m/%Y')
         
-        html_content = f"""
+        html_parts = [f"""
         <!DOCTYPE html>
         <html>
         <head>
@@ -1375,10 +1441,10 @@ class EnhancedDocumentGenerator:
             <div class="container">
                 <h2>Extra Items Statement</h2>
                 <p><strong>Date:</strong> {current_date}</p>
-        """
+        """]
         
         if isinstance(self.extra_items_data, pd.DataFrame) and not self.extra_items_data.empty:
-            html_content += """
+            html_parts.append("""
                 <h3>Extra Items</h3>
                 <table>
                     <thead>
@@ -1392,7 +1458,7 @@ class EnhancedDocumentGenerator:
                         </tr>
                     </thead>
                     <tbody>
-            """
+            """)
             
             total_amount = 0
             for index, row in self.extra_items_data.iterrows():
@@ -1401,7 +1467,7 @@ class EnhancedDocumentGenerator:
                 amount = quantity * rate
                 total_amount += amount
                 
-                html_content += f"""
+                html_parts.append(f"""
                         <tr>
                             <td>{self._safe_serial_no(row.get('Item No.', row.get('Item No', row.get('Item', ''))))}</td>
                             <td>{row.get('Description', '')}</td>
@@ -1410,26 +1476,26 @@ class EnhancedDocumentGenerator:
                             <td class="amount">{self._format_number(rate)}</td>
                             <td class="amount">{self._format_number(amount)}</td>
                         </tr>
-                """
+                """)
             
-            html_content += f"""
+            html_parts.append(f"""
                         <tr style="font-weight: bold;">
                             <td colspan="5">TOTAL</td>
                             <td class="amount">{total_amount:.0f}</td>
                         </tr>
                     </tbody>
                 </table>
-            """
+            """)
         else:
-            html_content += "<p>No extra items found in the provided data.</p>"
+            html_parts.append("<p>No extra items found in the provided data.</p>")
         
-        html_content += """
+        html_parts.append("""
             </div>
         </body>
         </html>
-        """
+        """)
         
-        return html_content
+        return ''.join(html_parts)
     
     def _generate_certificate_ii(self) -> str:
         """Generate Professional Certificate II - Government Standard with enhanced structure"""
@@ -1929,3 +1995,21 @@ class EnhancedDocumentGenerator:
         except Exception as e:
             # If ReportLab also fails, return minimal PDF content
             return b"%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n/Pages 2 0 R\n>>\nendobj\n2 0 obj\n<<\n/Type /Pages\n/Kids [3 0 R]\n/Count 1\n>>\nendobj\n3 0 obj\n<<\n/Type /Page\n/Parent 2 0 R\n/MediaBox [0 0 612 792]\n/Resources <<\n/Font <<\n/F1 <<\n/Type /Font\n/Subtype /Type1\n/BaseFont /Helvetica\n>>\n>>\n>>\n/Contents 4 0 R\n>>\nendobj\n4 0 obj\n<<\n/Length 44\n>>\nstream\nBT\n/F1 12 Tf\n100 700 Td\n(Error PDF) Tj\nET\nendstream\nendobj\nxref\n0 5\n0000000000 65535 f \n0000000010 00000 n \n0000000053 00000 n \n0000000108 00000 n \n0000000256 00000 n \ntrailer\n<<\n/Size 5\n/Root 1 0 R\n>>\nstartxref\n365\n%%EOF"
+
+
+_worker_generator = None
+
+
+def _convert_document_in_worker(doc_name: str, html_content: str) -> Tuple[bytes, bool, Tuple[int, list]]:
+    """
+    Executor entry point: convert one document with a per-process generator.
+
+    Also returns (pid, engine attempts) so the parent can record them in its own registry.
+    """
+    global _worker_generator
+    if _worker_generator is None:
+        # The PDF engines only use the HTML they are given, so an empty bill is enough
+        _worker_generator = EnhancedDocumentGenerator({})
+    with get_engine_registry().captured_attempts() as attempts:
+        pdf_bytes, success = _worker_generator._convert_single_document(doc_name, html_content)
+    return pdf_bytes, success, (os.getpid(), attempts)
@@ -3,10 +3,14 @@ import gc
 from datetime import datetime
 from typing import Dict, Any
 import io
-from functools import lru_cache
 import os
-from jinja2 import Environment, FileSystemLoader
+from utils.template_registry import get_template_environment
 import logging
+from utils.bill_computation import (
+    ITEM_NO_COLUMNS, build_extra_item_rows, build_work_item_rows, raw_column
+)
+from utils.amount_words import amount_in_words
+from utils.bill_model import BillModel
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,9 +19,6 @@ logger = logging.getLogger(__name__)
 class FixedDocumentGenerator:
     """Fixed Document Generator that uses ReportLab for reliable PDF generation"""
     
-    # Class-level cache for template environments
-    _template_env_cache = {}
-    
     def __init__(self, data: Dict[str, Any]):
         self.data = data
         self.title_data = data.get('title_data', {})
@@ -25,24 +26,24 @@ class FixedDocumentGenerator:
         self.bill_quantity_data = data.get('bill_quantity_data', pd.DataFrame())
         self.extra_items_data = data.get('extra_items_data', pd.DataFrame())
         
-        # Use cached template environment
+        # Use the shared, process-wide template environment
         template_dir = os.path.join(os.path.dirname(__file__), 'templates')
         if not os.path.exists(template_dir):
             template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates')
-        cache_key = template_dir
-        
-        if cache_key not in self._template_env_cache:
-            self._template_env_cache[cache_key] = Environment(
-                loader=FileSystemLoader(template_dir),
-                cache_size=200,  # Limit template cache size
-                auto_reload=False  # Disable auto-reload for performance
-            )
+        self.jinja_env = get_template_environment(template_dir)
         
-        self.jinja_env = self._template_env_cache[cache_key]
+        # Bill figures are computed once and shared by every document
+        self._bill_model = None
         
         # Prepare data for templates with memory optimization
         self.template_data = self._prepare_template_data()
     
+    def get_bill_model(self) -> BillModel:
+        """Return the bill's line amounts, premium, deductions and totals, computed once per generator"""
+        if self._bill_model is None:
+            self._bill_model = BillModel(self.title_data, self.work_order_data, self.extra_items_data)
+        return self._bill_model
+    
     def _safe_float(self, value):
         """Safely convert value to float, return 0 if conversion fails"""
         try:
@@ -63,96 +64,31 @@ class FixedDocumentGenerator:
     
     def _prepare_template_data(self) -> Dict[str, Any]:
         """Prepare data structure for templates with memory optimization"""
-        # Calculate totals and prepare structured data
-        work_items = []
-        total_amount = 0
-        
-        # Process work order data with memory optimization
-        for i, (index, row) in enumerate(self.work_order_data.iterrows()):
-            quantity_since = self._safe_float(row.get('Quantity Since', row.get('Quantity', 0)))
-            rate = self._safe_float(row.get('Rate', 0))
-            amount = quantity_since * rate
-            total_amount += amount
-            
-            work_items.append({
-                'unit': row.get('Unit', ''),
-                'quantity_since': quantity_since,
-                'quantity_upto': self._safe_float(row.get('Quantity Upto', quantity_since)),
-                'item_no': row.get('Item No.', row.get('Item', '')),
-                'description': row.get('Description', ''),
-                'rate': rate,
-                'amount_upto': amount,
-                'amount_since': amount,
-                'remark': row.get('Remark', '')
-            })
-            
-            # Periodic garbage collection for large datasets
-            if i % 100 == 0:
-                gc.collect()
+        # Line arrays are coerced once, in the bill model
+        model = self.get_bill_model()
+        lines = model.work_order_lines()
+        total_amount = model.work_order_total
+        work_items = build_work_item_rows(
+            self.work_order_data, lines, raw_column(self.work_order_data, ITEM_NO_COLUMNS),
+            amount_since=lines['amount']
+        )
         
-        # Process extra items with memory optimization
+        # Process extra items
         extra_items = []
         extra_total = 0
         
         if isinstance(self.extra_items_data, pd.DataFrame) and not self.extra_items_data.empty:
-            for i, (index, row) in enumerate(self.extra_items_data.iterrows()):
-                quantity = self._safe_float(row.get('Quantity', 0))
-                rate = self._safe_float(row.get('Rate', 0))
-                amount = quantity * rate
-                extra_total += amount
-                
-                extra_items.append({
-                    'unit': row.get('Unit', ''),
-                    'quantity': quantity,
-                    'item_no': row.get('Item No.', row.get('Item', '')),
-                    'description': row.get('Description', ''),
-                    'rate': rate,
-                    'amount': amount,
-                    'remark': row.get('Remark', '')
-                })
-                
-                # Periodic garbage collection for large datasets
-                if i % 50 == 0:
-                    gc.collect()
-        
-        # Calculate premiums
-        tender_premium_percent = self._safe_float(self.title_data.get('TENDER PREMIUM %', 0))
-        premium_amount = total_amount * (tender_premium_percent / 100)
-        grand_total = total_amount + premium_amount
-        
-        extra_premium = extra_total * (tender_premium_percent / 100)
-        extra_grand_total = extra_total + extra_premium
+            extra_total = model.extra_total
+            extra_items = build_extra_item_rows(
+                self.extra_items_data, model.extra_lines, raw_column(self.extra_items_data, ITEM_NO_COLUMNS)
+            )
         
-        # Calculate deductions and final amounts
-        sd_amount = grand_total * 0.10  # Security Deposit 10%
-        it_amount = grand_total * 0.02  # Income Tax 2%
-        gst_amount = grand_total * 0.02  # GST 2%
-        lc_amount = grand_total * 0.01  # Labour Cess 1%
-        total_deductions = sd_amount + it_amount + gst_amount + lc_amount
-        net_payable = grand_total - total_deductions
+        # Premiums, deductions and final amounts come from the bill model
+        tender_premium_percent = model.premium_percent
+        bill_totals = model.totals
         
         # Calculate totals data structure
-        totals = {
-            'grand_total': grand_total,
-            'work_order_amount': total_amount,
-            'tender_premium_percent': tender_premium_percent / 100,
-            'tender_premium_amount': premium_amount,
-            'final_total': grand_total,
-            'extra_items_sum': extra_grand_total,
-            'sd_amount': sd_amount,
-            'it_amount': it_amount,
-            'gst_amount': gst_amount,
-            'lc_amount': lc_amount,
-            'total_deductions': total_deductions,
-            'net_payable': net_payable,
-            'excess_amount': 0,
-            'excess_premium': 0,
-            'excess_total': 0,
-            'saving_amount': 0,
-            'saving_premium': 0,
-            'saving_total': 0,
-            'net_difference': 0
-        }
+        totals = model.template_totals()
         
         # Force garbage collection
         gc.collect()
@@ -271,57 +207,11 @@ class FixedDocumentGenerator:
             self.template_data['totals']['tender_premium_percent'] * 100,
             self.template_data['totals']['tender_premium_amount'],
             self.template_data['totals']['grand_total'],
-            self._number_to_words(int(self.template_data['totals']['grand_total']))
+            amount_in_words(self.template_data['totals']['grand_total'])
         )
         
         return html_content
     
-    @lru_cache(maxsize=64)  # Cache number to words conversion
-    def _number_to_words(self, num):
-        """Convert number to words (simplified version)"""
-        if num == 0:
-            return "Zero"
-        
-        ones = ['', 'One', 'Two', 'Three', 'Four', 'Five', 'Six', 'Seven', 'Eight', 'Nine']
-        teens = ['Ten', 'Eleven', 'Twelve', 'Thirteen', 'Fourteen', 'Fifteen', 'Sixteen', 'Seventeen', 'Eighteen', 'Nineteen']
-        tens = ['', '', 'Twenty', 'Thirty', 'Forty', 'Fifty', 'Sixty', 'Seventy', 'Eighty', 'Ninety']
-        
-        def convert_hundreds(n):
-            result = ''
-            if n >= 100:
-                result += ones[n // 100] + ' Hundred '
-                n %= 100
-            if n >= 20:
-                result += tens[n // 10] + ' '
-                n %= 10
-            elif n >= 10:
-                result += teens[n - 10] + ' '
-                n = 0
-            if n > 0:
-                result += ones[n] + ' '
-            return result.strip()
-        
-        if num < 1000:
-            return convert_hundreds(num)
-        elif num < 100000:
-            thousands = num // 1000
-            remainder = num % 1000
-            result = convert_hundreds(thousands) + ' Thousand '
-            if remainder > 0:
-                result += convert_hundreds(remainder)
-            return result.strip()
-        else:
-            lakhs = num // 100000
-            remainder = num % 100000
-            result = convert_hundreds(lakhs) + ' Lakh '
-            if remainder > 0:
-                if remainder >= 1000:
-                    result += convert_hundreds(remainder // 1000) + ' Thousand '
-                    remainder %= 1000
-                if remainder > 0:
-                    result += convert_hundreds(remainder)
-            return result.strip()
-    
     def _generate_deviation_statement(self) -> str:
         """Generate Deviation Statement document"""
         # Implementation would go here
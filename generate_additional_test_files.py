@@ -1,56 +1,65 @@
 #!/usr/bin/env python3
 """
 Generate 25 additional test Excel files for comprehensive testing
+With --items, generates stress-test workbooks of any size (up to 100k items)
+with configurable zero-rate, extra-item and description length mixes
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 import random
 from pathlib import Path
+from typing import Dict, Iterator, Optional
 import sys
 import os
+import xlsxwriter
 
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+# Sample descriptions
+WORK_DESCRIPTIONS = [
+    "Excavation in ordinary soil including dressing of sides and bottom",
+    "Providing and laying RCC M20 for foundation",
+    "Brickwork in cement mortar 1:6",
+    "Plastering in cement mortar 1:6",
+    "Electrical wiring with copper cables",
+    "Installation of LED lights",
+    "Waterproofing treatment with bitumen",
+    "Painting with emulsion paint",
+    "Flooring with vitrified tiles",
+    "Door frame installation",
+    "Window frame installation",
+    "Roofing with asbestos sheets",
+    "Concrete mixing and pouring",
+    "Steel reinforcement bars installation",
+    "Sand filling and leveling",
+    "Gravel base preparation",
+    "Asphalt road construction",
+    "Drainage pipe installation",
+    "Septic tank construction",
+    "Boundary wall construction",
+    "Fencing with chain link",
+    "Landscaping and gardening",
+    "Tree planting and maintenance",
+    "Irrigation system installation",
+    "Solar panel installation",
+    "Air conditioning unit installation",
+    "Fire alarm system installation",
+    "CCTV camera installation",
+    "Network cabling",
+    "Security door installation"
+]
+
+# Sample units
+WORK_UNITS = ["CuM", "SqM", "No", "Mtr", "Kg", "Ltr", "SqFt", "Rmt", "Nos"]
+
+
 def generate_random_work_order_items(n_items=50):
     """Generate random work order items for testing"""
-    # Sample descriptions
-    descriptions = [
-        "Excavation in ordinary soil including dressing of sides and bottom",
-        "Providing and laying RCC M20 for foundation",
-        "Brickwork in cement mortar 1:6",
-        "Plastering in cement mortar 1:6",
-        "Electrical wiring with copper cables",
-        "Installation of LED lights",
-        "Waterproofing treatment with bitumen",
-        "Painting with emulsion paint",
-        "Flooring with vitrified tiles",
-        "Door frame installation",
-        "Window frame installation",
-        "Roofing with asbestos sheets",
-        "Concrete mixing and pouring",
-        "Steel reinforcement bars installation",
-        "Sand filling and leveling",
-        "Gravel base preparation",
-        "Asphalt road construction",
-        "Drainage pipe installation",
-        "Septic tank construction",
-        "Boundary wall construction",
-        "Fencing with chain link",
-        "Landscaping and gardening",
-        "Tree planting and maintenance",
-        "Irrigation system installation",
-        "Solar panel installation",
-        "Air conditioning unit installation",
-        "Fire alarm system installation",
-        "CCTV camera installation",
-        "Network cabling",
-        "Security door installation"
-    ]
-    
-    # Sample units
-    units = ["CuM", "SqM", "No", "Mtr", "Kg", "Ltr", "SqFt", "Rmt", "Nos"]
+    descriptions = WORK_DESCRIPTIONS
+    units = WORK_UNITS
     
     # Generate items
     items = []
@@ -103,12 +112,169 @@ def create_excel_file(file_path, title_data, work_order_data):
         bill_qty_df = pd.DataFrame(columns=['Item No.', 'Description', 'Unit', 'Quantity', 'Rate', 'Amount'])
         bill_qty_df.to_excel(writer, sheet_name='Bill Quantity', index=False)
 
+
+# Specification clauses appended to descriptions; real BSR items run from a few
+# words to well over a thousand characters
+SPECIFICATION_CLAUSES = (
+    "including all materials, labour, tools and plant",
+    "complete as per drawings and directions of the Engineer-in-charge",
+    "with ISI marked materials conforming to relevant IS codes",
+    "including cutting, bending, binding and placing in position",
+    "in all kinds of soil up to a lift of 1.5 m",
+    "including curing, finishing and cleaning of the site",
+    "with lead up to 50 m and all incidental charges",
+    "including scaffolding, shuttering and removal thereof",
+)
+MAX_DESCRIPTION_CLAUSES = 40
+# Description suffix per clause count, shared by every description with that count
+DESCRIPTION_SUFFIXES = [''] + [' ' + ', '.join(SPECIFICATION_CLAUSES[i % len(SPECIFICATION_CLAUSES)] for i in range(k))
+                               for k in range(1, MAX_DESCRIPTION_CLAUSES + 1)]
+# Largest stress-test workbook, in work order items
+MAX_SCALED_ITEMS = 100000
+
+
+def _scaled_item_number(i: int, hierarchical: bool) -> str:
+    """Flat '1', '2', ... or chapter.section.item numbers like '1.A.1' for the i-th item"""
+    if not hierarchical:
+        return str(i + 1)
+    # 10 items per section, 26 sections (A-Z) per chapter
+    return f"{i // 260 + 1}.{chr(65 + (i // 10) % 26)}.{i % 10 + 1}"
+
+
+def _description_choices(rng: np.random.Generator, n_items: int, description_skew: float):
+    """Base description and clause count per item; clause counts follow a Pareto tail: most short, a few very long"""
+    base = rng.integers(0, len(WORK_DESCRIPTIONS), n_items)
+    clauses = np.minimum(rng.pareto(description_skew, n_items).astype(int), MAX_DESCRIPTION_CLAUSES)
+    return base, clauses
+
+
+def _scaled_rows(hierarchical: bool, base: np.ndarray, clauses: np.ndarray, units: np.ndarray,
+                 quantities: np.ndarray, rates: np.ndarray) -> Iterator[list]:
+    """Sheet rows built one at a time from the column arrays, never all at once"""
+    for i, (b, c, unit, quantity, rate) in enumerate(zip(base, clauses, units, quantities, rates)):
+        yield [_scaled_item_number(i, hierarchical), WORK_DESCRIPTIONS[b] + DESCRIPTION_SUFFIXES[c], unit,
+               quantity, rate, round(quantity * rate, 2)]
+
+
+def generate_scaled_workbook(file_path, n_items: int, zero_rate_ratio: float = 0.0,
+                             extra_item_ratio: float = 0.0, hierarchical: bool = False,
+                             description_skew: float = 1.5, work_order_total: Optional[float] = None,
+                             seed: Optional[int] = None) -> Dict[str, int]:
+    """
+    Write a stress-test workbook with xlsxwriter in constant-memory mode
+
+    Only numeric column arrays are kept; item numbers and descriptions are built
+    row by row as the sheets are written.
+
+    Args:
+        file_path: Workbook to write
+        n_items: Work order items (every one is billed), at most MAX_SCALED_ITEMS
+        zero_rate_ratio: Fraction of items with a zero rate
+        extra_item_ratio: Extra items as a fraction of n_items
+        hierarchical: Use chapter.section.item numbers instead of 1, 2, 3...
+        description_skew: Pareto shape of the description length; lower means longer tails
+        work_order_total: Scale quantities so the work order amounts to this many rupees
+        seed: Seed for reproducible workbooks
+
+    Returns:
+        Row counts written per sheet
+    """
+    if not 0 < n_items <= MAX_SCALED_ITEMS:
+        raise ValueError(f"n_items must be between 1 and {MAX_SCALED_ITEMS}")
+    rng = np.random.default_rng(seed)
+    random.seed(seed)
+
+    rates = rng.uniform(50, 5000, n_items).round(2)
+    rates[rng.random(n_items) < zero_rate_ratio] = 0.0
+    quantities = rng.uniform(1, 100, n_items)
+    if work_order_total:
+        amount = (quantities * rates).sum()
+        if amount > 0:
+            quantities *= work_order_total / amount
+    quantities = quantities.round(3)
+    billed = (quantities * rng.uniform(0.5, 1.1, n_items)).round(3)
+    units = rng.choice(WORK_UNITS, n_items)
+    base, clauses = _description_choices(rng, n_items, description_skew)
+    n_extra = int(round(n_items * extra_item_ratio))
+
+    workbook = xlsxwriter.Workbook(str(file_path), {'constant_memory': True})
+    try:
+        # Constant-memory mode flushes each row once the next one starts, so every
+        # sheet is written strictly top to bottom
+        title = workbook.add_worksheet('Title')
+        for row, (key, value) in enumerate(generate_title_data(Path(file_path).name).items()):
+            title.write_row(row, 0, [key, value])
+
+        work_order = workbook.add_worksheet('Work Order')
+        work_order.write_row(0, 0, ['Item No.', 'Description', 'Unit', 'Quantity Since', 'Rate', 'Amount Since'])
+        for row, values in enumerate(_scaled_rows(hierarchical, base, clauses, units, quantities, rates), 1):
+            work_order.write_row(row, 0, values)
+
+        bill_quantity = workbook.add_worksheet('Bill Quantity')
+        bill_quantity.write_row(0, 0, ['Item No.', 'Description', 'Unit', 'Quantity', 'Rate', 'Amount'])
+        for row, values in enumerate(_scaled_rows(hierarchical, base, clauses, units, billed, rates), 1):
+            bill_quantity.write_row(row, 0, values)
+
+        extra_items = workbook.add_worksheet('Extra Items')
+        extra_items.write_row(0, 0, ['Item No.', 'Description', 'Unit', 'Quantity', 'Rate', 'Amount'])
+        extra_quantities = rng.uniform(1, 20, n_extra).round(2)
+        extra_rates = rng.uniform(100, 2000, n_extra).round(2)
+        for i in range(n_extra):
+            extra_items.write_row(i + 1, 0, [f"E-{i + 1:03d}", f"Extra {WORK_DESCRIPTIONS[i % len(WORK_DESCRIPTIONS)]}",
+                                             units[i % n_items], extra_quantities[i], extra_rates[i],
+                                             round(extra_quantities[i] * extra_rates[i], 2)])
+    finally:
+        workbook.close()
+
+    return {'work_order': n_items, 'bill_quantity': n_items, 'extra_items': n_extra,
+            'zero_rate': int((rates == 0).sum())}
+
+
+def generate_scaled_files(output_dir: str, n_items: int, count: int = 1, **options):
+    """Generate ``count`` stress-test workbooks of ``n_items`` items each"""
+    input_dir = Path(output_dir)
+    input_dir.mkdir(exist_ok=True)
+    seed = options.pop('seed', None)
+
+    for i in range(1, count + 1):
+        file_name = f"stress_{n_items}_items_{i:02d}.xlsx"
+        print(f"Creating {file_name}...")
+        counts = generate_scaled_workbook(input_dir / file_name, n_items,
+                                          seed=None if seed is None else seed + i, **options)
+        print(f"  ✓ Created with {counts['work_order']} work items, {counts['zero_rate']} zero-rate, "
+              f"{counts['extra_items']} extra items")
+
+    print(f"\n✅ Successfully generated {count} stress-test files in {input_dir}")
+
+
 def main():
-    """Generate 25 additional test files"""
+    """Generate 25 additional test files, or stress-test files with --items"""
+    parser = argparse.ArgumentParser(description="Generate test Excel files")
+    parser.add_argument('--items', type=int, help="Items per workbook; generates stress-test files")
+    parser.add_argument('--count', type=int, default=1, help="Number of stress-test files")
+    parser.add_argument('--output-dir', default="INPUT_FILES", help="Directory for the generated files")
+    parser.add_argument('--zero-rate-ratio', type=float, default=0.0, help="Fraction of zero-rate items")
+    parser.add_argument('--extra-item-ratio', type=float, default=0.0, help="Extra items per work order item")
+    parser.add_argument('--hierarchical', action='store_true', help="Use 1.A.1 style item numbers")
+    parser.add_argument('--description-skew', type=float, default=1.5,
+                        help="Pareto shape of description lengths (lower gives longer descriptions)")
+    parser.add_argument('--work-order-total', type=float, help="Scale quantities to this work order amount")
+    parser.add_argument('--seed', type=int, help="Seed for reproducible files")
+    args = parser.parse_args()
+
+    if args.items is not None:
+        if not 0 < args.items <= MAX_SCALED_ITEMS:
+            parser.error(f"--items must be between 1 and {MAX_SCALED_ITEMS}")
+        generate_scaled_files(args.output_dir, args.items, args.count,
+                              zero_rate_ratio=args.zero_rate_ratio, extra_item_ratio=args.extra_item_ratio,
+                              hierarchical=args.hierarchical, description_skew=args.description_skew,
+                              work_order_total=args.work_order_total, seed=args.seed)
+        return
+
     print("Generating 25 additional test Excel files...")
     
     # Create directory if it doesn't exist
-    input_dir = Path("INPUT_FILES")
+    input_dir = Path(args.output_dir)
     input_dir.mkdir(exist_ok=True)
     
     # Generate 25 files
@@ -5,17 +5,23 @@ Ensures proper A4 sizing with 10mm margins and high-quality output
 """
 
 import io
-import gc
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
 import tempfile
 import os
 
+from utils.parallel_conversion import convert_documents, resolve_executor_type
+from utils.pdf_engines import get_engine_registry
+from utils.tracing import traced
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Conversion engines in order of preference
+ENGINE_PREFERENCE = ('weasyprint', 'playwright', 'xhtml2pdf', 'reportlab')
+
 class OptimizedPDFConverter:
     """Optimized PDF converter with proper A4 sizing and margins"""
     
@@ -30,104 +36,42 @@ class OptimizedPDFConverter:
         }
     
     def _check_available_engines(self) -> Dict[str, bool]:
-        """Check which PDF conversion engines are available"""
-        engines = {
-            'weasyprint': False,
-            'xhtml2pdf': False,
-            'playwright': False,
-            'reportlab': False
-        }
-        
-        # Check WeasyPrint
-        try:
-            import weasyprint
-            engines['weasyprint'] = True
-            logger.info("✅ WeasyPrint available")
-        except ImportError:
-            logger.warning("❌ WeasyPrint not available")
-        
-        # Check xhtml2pdf
-        try:
-            import xhtml2pdf
-            engines['xhtml2pdf'] = True
-            logger.info("✅ xhtml2pdf available")
-        except ImportError:
-            logger.warning("❌ xhtml2pdf not available")
-        
-        # Check Playwright
-        try:
-            from playwright.async_api import async_playwright
-            engines['playwright'] = True
-            logger.info("✅ Playwright available")
-        except ImportError:
-            logger.warning("❌ Playwright not available")
-        
-        # Check ReportLab
-        try:
-            from reportlab.pdfgen import canvas
-            from reportlab.lib.pagesizes import A4
-            engines['reportlab'] = True
-            logger.info("✅ ReportLab available")
-        except ImportError:
-            logger.warning("❌ ReportLab not available")
-        
-        return engines
+        """Check which PDF conversion engines are available (probed once per process)"""
+        available = get_engine_registry().available_engines
+        return {engine: available.get(engine, False) for engine in ENGINE_PREFERENCE}
     
-    def convert_documents_to_pdf(self, documents: Dict[str, str]) -> Dict[str, bytes]:
+    @traced('pdf.convert_documents')
+    def convert_documents_to_pdf(self, documents: Dict[str, str], executor_type: Optional[str] = None,
+                                 max_workers: Optional[int] = None) -> Dict[str, bytes]:
         """
         Convert HTML documents to high-quality PDFs with proper A4 sizing
         
         Args:
             documents: Dictionary of HTML documents
+            executor_type: 'auto', 'thread', 'process' or 'serial' (see utils.parallel_conversion)
+            max_workers: Maximum number of concurrent conversions
             
         Returns:
-            Dictionary of PDF documents as bytes
+            Dictionary of PDF documents as bytes, in the order of ``documents``
         """
-        pdf_files = {}
+        kind = resolve_executor_type(executor_type, len(documents))
+        # Process workers need a picklable module-level function with their own converter;
+        # threads and serial runs use this converter, so subclass overrides apply
+        worker = _convert_document_in_worker if kind == 'process' else self._convert_document_here
+        results = convert_documents(worker, documents, executor_type=kind, max_workers=max_workers)
         
-        for doc_name, html_content in documents.items():
-            logger.info(f"🔄 Converting {doc_name} to PDF...")
-            
-            try:
-                # Preprocess HTML for better PDF conversion
-                processed_html = self._preprocess_html(html_content)
-                
-                # Try conversion engines in order of preference
-                pdf_bytes = None
-                
-                # 1. Try WeasyPrint (best for complex layouts)
-                if self.available_engines['weasyprint'] and pdf_bytes is None:
-                    pdf_bytes = self._convert_with_weasyprint(processed_html)
-                
-                # 2. Try Playwright (good for modern CSS)
-                if self.available_engines['playwright'] and pdf_bytes is None:
-                    pdf_bytes = self._convert_with_playwright(processed_html)
-                
-                # 3. Try xhtml2pdf (fallback)
-                if self.available_engines['xhtml2pdf'] and pdf_bytes is None:
-                    pdf_bytes = self._convert_with_xhtml2pdf(processed_html)
-                
-                # 4. Fallback to ReportLab
-                if pdf_bytes is None:
-                    pdf_bytes = self._convert_with_reportlab_fallback(doc_name, processed_html)
-                
-                if pdf_bytes and len(pdf_bytes) > 1024:  # At least 1KB
-                    pdf_files[f"{doc_name}.pdf"] = pdf_bytes
-                    self.conversion_stats['successful_conversions'] += 1
-                    self.conversion_stats['total_size'] += len(pdf_bytes)
-                    logger.info(f"✅ Successfully converted {doc_name} ({len(pdf_bytes):,} bytes)")
-                else:
-                    raise Exception("PDF conversion produced invalid result")
-                    
-            except Exception as e:
-                logger.error(f"❌ Error converting {doc_name}: {str(e)}")
-                pdf_bytes = self._create_error_pdf(doc_name, str(e))
-                pdf_files[f"{doc_name}.pdf"] = pdf_bytes
+        registry = get_engine_registry()
+        pdf_files = {}
+        for doc_name, (pdf_bytes, success, attempts) in results.items():
+            # Process pool workers report their engine attempts for the parent's routing
+            registry.record_worker_attempts(attempts)
+            pdf_files[f"{doc_name}.pdf"] = pdf_bytes
+            self.conversion_stats['total_conversions'] += 1
+            if success:
+                self.conversion_stats['successful_conversions'] += 1
+                self.conversion_stats['total_size'] += len(pdf_bytes)
+            else:
                 self.conversion_stats['failed_conversions'] += 1
-            
-            finally:
-                self.conversion_stats['total_conversions'] += 1
-                gc.collect()  # Clean up memory
         
         # Update average size
         if self.conversion_stats['successful_conversions'] > 0:
@@ -137,6 +81,53 @@ class OptimizedPDFConverter:
         
         return pdf_files
     
+    def _convert_document_here(self, doc_name: str, html_content: str) -> Tuple[bytes, bool, Tuple[int, list]]:
+        """Thread/serial entry point; attempts are already in this process's registry"""
+        pdf_bytes, success = self.convert_single_document(doc_name, html_content)
+        return pdf_bytes, success, (os.getpid(), [])
+    
+    def convert_single_document(self, doc_name: str, html_content: str) -> Tuple[bytes, bool]:
+        """
+        Convert one HTML document on the first known-good engine
+        
+        Returns:
+            Tuple of (PDF bytes, success); an error PDF is returned when every engine fails
+        """
+        logger.info(f"🔄 Converting {doc_name} to PDF...")
+        
+        try:
+            # Preprocess HTML for better PDF conversion
+            processed_html = self._preprocess_html(html_content)
+            
+            # Engines in order of preference; the registry tries the engine that last
+            # worked for this document first and skips engines that are not installed
+            engines = {
+                'weasyprint': self._convert_with_weasyprint,    # best for complex layouts
+                'playwright': self._convert_with_playwright,    # good for modern CSS
+                'xhtml2pdf': self._convert_with_xhtml2pdf,      # fallback
+                'reportlab': lambda html: self._convert_with_reportlab_fallback(doc_name, html),
+            }
+            candidates = {engine: self._sized(engines[engine]) for engine in ENGINE_PREFERENCE}
+            # Routed separately from EnhancedDocumentGenerator, whose engines differ
+            pdf_bytes = get_engine_registry().convert(f"optimized/{doc_name}", candidates, processed_html)
+            
+            if pdf_bytes:
+                logger.info(f"✅ Successfully converted {doc_name} ({len(pdf_bytes):,} bytes)")
+                return pdf_bytes, True
+            raise Exception("PDF conversion produced invalid result")
+                
+        except Exception as e:
+            logger.error(f"❌ Error converting {doc_name}: {str(e)}")
+            return self._create_error_pdf(doc_name, str(e)), False
+    
+    @staticmethod
+    def _sized(engine):
+        """Treat PDFs under 1KB as a failed conversion"""
+        def convert(html_content: str) -> Optional[bytes]:
+            pdf_bytes = engine(html_content)
+            return pdf_bytes if pdf_bytes and len(pdf_bytes) > 1024 else None
+        return convert
+    
     def _preprocess_html(self, html_content: str) -> str:
         """Preprocess HTML for better PDF conversion"""
         # Add proper CSS for A4 sizing and margins
@@ -239,37 +230,22 @@ class OptimizedPDFConverter:
             raise
     
     def _convert_with_playwright(self, html_content: str) -> bytes:
-        """Convert HTML to PDF using Playwright"""
+        """Convert HTML to PDF using the shared Playwright browser pool"""
         try:
-            import asyncio
-            from playwright.async_api import async_playwright
-            
-            async def _convert():
-                async with async_playwright() as p:
-                    browser = await p.chromium.launch()
-                    page = await browser.new_page()
-                    
-                    # Set content
-                    await page.set_content(html_content)
-                    
-                    # Generate PDF with A4 settings
-                    pdf_bytes = await page.pdf(
-                        format='A4',
-                        margin={
-                            'top': '10mm',
-                            'right': '10mm',
-                            'bottom': '10mm',
-                            'left': '10mm'
-                        },
-                        print_background=True,
-                        prefer_css_page_size=True
-                    )
-                    
-                    await browser.close()
-                    return pdf_bytes
-            
-            # Run async conversion
-            return asyncio.run(_convert())
+            from utils.browser_pool import get_browser_pool
+            
+            # Generate PDF with A4 settings
+            return get_browser_pool().render_pdf(html_content, {
+                'format': 'A4',
+                'margin': {
+                    'top': '10mm',
+                    'right': '10mm',
+                    'bottom': '10mm',
+                    'left': '10mm'
+                },
+                'print_background': True,
+                'prefer_css_page_size': True
+            })
             
         except Exception as e:
             logger.error(f"Playwright conversion error: {str(e)}")
@@ -421,6 +397,10 @@ class OptimizedPDFConverter:
         """Get conversion statistics"""
         return self.conversion_stats.copy()
     
+    def get_engine_stats(self) -> Dict[str, Any]:
+        """Get process-wide per-engine success rates, latencies and routing"""
+        return get_engine_registry().get_stats()
+    
     def validate_pdf_quality(self, pdf_bytes: bytes) -> Dict[str, Any]:
         """Validate PDF quality and return metrics"""
         quality_metrics = {
@@ -460,6 +440,22 @@ class OptimizedPDFConverter:
         
         return quality_metrics
 
+_worker_converter = None
+
+
+def _convert_document_in_worker(doc_name: str, html_content: str) -> Tuple[bytes, bool, Tuple[int, list]]:
+    """
+    Executor entry point: convert one document with a per-process converter.
+
+    Also returns (pid, engine attempts) so the parent can record them in its own registry.
+    """
+    global _worker_converter
+    if _worker_converter is None:
+        _worker_converter = OptimizedPDFConverter()
+    with get_engine_registry().captured_attempts() as attempts:
+        pdf_bytes, success = _worker_converter.convert_single_document(doc_name, html_content)
+    return pdf_bytes, success, (os.getpid(), attempts)
+
 def main():
     """Test the PDF converter"""
     converter = OptimizedPDFConverter()
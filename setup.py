@@ -16,6 +16,9 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/CRAJKUMARSINGH/BillGeneratorV01",
     packages=find_packages(),
+    # Top-level pipeline modules used by the console scripts
+    py_modules=["app", "billgen_cli", "batch_processor", "enhanced_document_generator_fixed",
+                "optimized_pdf_converter"],
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
@@ -29,6 +32,7 @@ setup(
     entry_points={
         "console_scripts": [
             "bill-generator=app:main",
+            "billgen=billgen_cli:main",
         ],
     },
 )
\ No newline at end of file
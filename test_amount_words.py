@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test amounts in words (Indian numbering with paise)
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from utils.amount_words import amount_in_words, amounts_in_words, number_to_words
+from utils.bill_model import BillModel
+from utils.template_renderer import TemplateRenderer
+
+
+def test_number_to_words():
+    """Whole rupees use thousand, lakh and crore"""
+    print("Testing number to words...")
+    cases = {
+        0: 'Zero',
+        7: 'Seven',
+        19: 'Nineteen',
+        105: 'One Hundred Five',
+        2040: 'Two Thousand Forty',
+        952147: 'Nine Lakh Fifty Two Thousand One Hundred Forty Seven',
+        10000000: 'One Crore',
+        128239420: 'Twelve Crore Eighty Two Lakh Thirty Nine Thousand Four Hundred Twenty',
+        10 ** 10: 'One Thousand Crore',
+        -45: 'Minus Forty Five',
+    }
+    for number, words in cases.items():
+        assert number_to_words(number) == words, number
+    print("✅ Numbers spelled")
+
+
+def test_amount_in_words_with_paise():
+    """Paise follow the amount as printed with two decimals"""
+    assert amount_in_words(1050.5) == 'One Thousand Fifty and Fifty Paise'
+    assert amount_in_words(1050) == 'One Thousand Fifty'
+    assert amount_in_words(0.07) == 'Seven Paise'
+    assert amount_in_words(99.999) == 'One Hundred'
+    assert amount_in_words(-2.5) == 'Minus Two and Fifty Paise'
+    print("✅ Paise spelled")
+
+
+def test_amounts_in_words_bulk():
+    """Lists, arrays and Series convert in one call, matching the scalar conversion"""
+    expected = ['One Thousand Fifty and Fifty Paise', 'Zero', 'Zero',
+                'Two Crore Fifty Lakh', 'One Thousand Fifty and Fifty Paise']
+    amounts = [1050.5, None, 'n/a', 25000000, 1050.5]
+    assert amounts_in_words(amounts) == expected
+    assert amounts_in_words(pd.Series(amounts)) == expected
+    assert amounts_in_words(np.array([1050.5, 0, 0, 25000000, 1050.5])) == expected
+    assert amounts_in_words([]) == []
+
+    values = np.random.default_rng(7).uniform(0, 5e8, 2000).round(2)
+    assert amounts_in_words(values) == [amount_in_words(value) for value in values]
+    print("✅ 2000 amounts converted in bulk")
+
+
+def test_payable_words_keep_paise():
+    """Certificates spell the payable amount with its paise"""
+    work_order = pd.DataFrame([{'Item No.': '1', 'Description': 'Excavation', 'Unit': 'Cum',
+                                'Quantity Since': 10, 'Rate': 100.25}])
+    model = BillModel({'Name of Work': 'Road repair'}, work_order)
+    assert model.net_payable == 1002.5 * 0.85
+    assert model.payable_words == 'Eight Hundred Fifty Two and Twelve Paise'
+
+    html = TemplateRenderer().render_certificate_iii(model.title_data, work_order, model=model)
+    assert amount_in_words(model.payable_amount) in html
+    assert 'One Thousand Two and Fifty Paise' in html
+    print("✅ Payable amounts spelled with paise")
+
+
+if __name__ == "__main__":
+    test_number_to_words()
+    test_amount_in_words_with_paise()
+    test_amounts_in_words_bulk()
+    test_payable_words_keep_paise()
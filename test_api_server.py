@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test the bill generation HTTP API
+"""
+
+import asyncio
+import io
+import json
+import os
+import sys
+import threading
+import time
+import zipfile
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from api_server import BillGeneratorAPI, JobManager
+
+SAMPLE = Path(__file__).resolve().parent / "input_files" / "3rdFinalVidExtra.xlsx"
+
+
+def _request(app, method, path, body=b'', content_type='application/octet-stream', query=b''):
+    """Drive the ASGI app for one request; returns (status, headers, body, body message count)"""
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query,
+             'headers': [(b'content-type', content_type.encode()),
+                         (b'content-length', str(len(body)).encode())]}
+    asyncio.run(app(scope, receive, send))
+    start = sent[0]
+    chunks = [message['body'] for message in sent[1:]]
+    return start['status'], dict(start['headers']), b''.join(chunks), len(chunks)
+
+
+def _wait_for(app, job_id, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status, _, body, _ = _request(app, 'GET', f'/jobs/{job_id}')
+        job = json.loads(body)
+        if job['status'] not in ('queued', 'running'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_workbook_job_streams_zip():
+    """An uploaded workbook becomes a job whose ZIP result is streamed in chunks"""
+    print("Testing workbook job...")
+    app = BillGeneratorAPI(JobManager(workers=1, queue_size=2))
+    try:
+        status, headers, body, _ = _request(app, 'POST', '/jobs', SAMPLE.read_bytes())
+        assert status == 202
+        job_id = json.loads(body)['job_id']
+        assert headers[b'location'] == f"/jobs/{job_id}".encode()
+
+        assert _wait_for(app, job_id)['status'] == 'done'
+        status, headers, body, chunk_count = _request(app, 'GET', f'/jobs/{job_id}/result')
+        assert status == 200 and headers[b'content-type'] == b'application/zip'
+        assert chunk_count > 1 and int(headers[b'content-length']) == len(body)
+        names = zipfile.ZipFile(io.BytesIO(body)).namelist()
+        assert 'pdf/First Page Summary.pdf' in names and 'combined/all_documents_combined.pdf' in names
+
+        assert _request(app, 'DELETE', f'/jobs/{job_id}')[0] == 200
+        assert _request(app, 'GET', f'/jobs/{job_id}')[0] == 404
+        print(f"✅ ZIP of {len(names)} files streamed in {chunk_count} chunks")
+    finally:
+        app.manager.shutdown(wait=True)
+
+
+def test_json_bill_job():
+    """A JSON bill payload runs through the same pipeline"""
+    app = BillGeneratorAPI(JobManager(workers=1, queue_size=2))
+    bill = {
+        'title_data': {'Name of Work': 'Road repair', 'Agreement No.': '12/2024'},
+        'work_order_data': [{'Item No.': '1', 'Description': 'Excavation', 'Unit': 'Cum',
+                             'Quantity Since': 10, 'Rate': 100.0}],
+        'bill_quantity_data': [{'Item No.': '1', 'Quantity': 8}],
+        'extra_items_data': [],
+    }
+    try:
+        status, _, body, _ = _request(app, 'POST', '/jobs', json.dumps(bill).encode(), 'application/json')
+        assert status == 202
+        assert _wait_for(app, json.loads(body)['job_id'])['status'] == 'done'
+        assert _request(app, 'POST', '/jobs', b'{not json', 'application/json')[0] == 400
+        print("✅ JSON bill job completed")
+    finally:
+        app.manager.shutdown(wait=True)
+
+
+def test_full_queue_is_refused_and_jobs_time_out():
+    """Submissions beyond workers + queue get 429; an overrunning job is marked timed out"""
+    print("Testing backpressure and timeouts...")
+    release = threading.Event()
+
+    def runner(job):
+        release.wait(5)
+        job.check_deadline('render')
+        return b'zip'
+
+    app = BillGeneratorAPI(JobManager(workers=1, queue_size=1, runner=runner))
+    try:
+        first = json.loads(_request(app, 'POST', '/jobs', b'a', query=b'timeout=0.05')[2])
+        second = json.loads(_request(app, 'POST', '/jobs', b'b')[2])
+        status, headers, _, _ = _request(app, 'POST', '/jobs', b'c')
+        assert status == 429 and b'retry-after' in headers
+        assert json.loads(_request(app, 'GET', '/health')[2])['accepting'] is False
+        assert _request(app, 'GET', f"/jobs/{second['job_id']}/result")[0] == 409
+
+        time.sleep(0.1)
+        release.set()
+        timed_out = _wait_for(app, first['job_id'])
+        assert timed_out['status'] == 'timeout' and 'render' in timed_out['error']
+        assert _wait_for(app, second['job_id'])['status'] == 'done'
+        # Capacity is released once jobs finish
+        assert _request(app, 'POST', '/jobs', b'd')[0] == 202
+        assert _request(app, 'GET', '/jobs/unknown')[0] == 404
+        print("✅ Queue bounded and timeouts enforced")
+    finally:
+        release.set()
+        app.manager.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    test_workbook_job_streams_zip()
+    test_json_bill_job()
+    test_full_queue_is_refused_and_jobs_time_out()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test the parallel batch modes of HighPerformanceBatchProcessor
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PyPDF2 import PdfReader
+
+from batch_processor import HighPerformanceBatchProcessor, default_worker_count
+from enhanced_document_generator_fixed import EnhancedDocumentGenerator
+from utils.batch_manifest import BatchManifest, MANIFEST_FILE_NAME
+
+SAMPLE_FILE = Path(__file__).parent / "input_files" / "3rdFinalVidExtra.xlsx"
+
+
+def test_default_worker_count_is_bounded():
+    """Worker count defaults to the core count and respects the memory budget"""
+    workers = default_worker_count()
+    assert 1 <= workers <= (os.cpu_count() or 1)
+    # A budget larger than any machine's memory still leaves one worker
+    assert default_worker_count(worker_memory_mb=10 ** 9) == 1
+    print(f"✅ Default worker count: {workers}")
+
+
+def test_process_pool_batch():
+    """Pool workers write their own outputs and return small stats dicts"""
+    print("Testing process-pool batch mode...")
+    work_dir = Path(tempfile.mkdtemp())
+    try:
+        input_dir = work_dir / "input"
+        input_dir.mkdir()
+        shutil.copy(SAMPLE_FILE, input_dir / "bill_a.xlsx")
+        shutil.copy(SAMPLE_FILE, input_dir / "bill_b.xlsx")
+
+        processor = HighPerformanceBatchProcessor(str(input_dir), str(work_dir / "output"))
+        results = processor.process_batch_parallel(max_workers=2, use_processes=True)
+
+        assert results['success'], results['message']
+        assert processor.processing_stats['processed_files'] == 2
+        assert len(processor.processing_stats['file_times']) == 2
+        for file_stats in results['stats']:
+            assert file_stats['success'], file_stats['error']
+            assert set(file_stats) == {'file_name', 'success', 'processing_time', 'output_size',
+                                       'error', 'generated_files'}
+            for output_file in file_stats['generated_files']:
+                assert Path(output_file).exists()
+        print("✅ Process-pool batch completed")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_thread_batch_converts_documents_serially():
+    """Parallel batches default to threads and never start per-document pools"""
+    print("Testing threaded batch mode...")
+    work_dir = Path(tempfile.mkdtemp())
+    create_pdf_documents = EnhancedDocumentGenerator.create_pdf_documents
+    executors = []
+
+    def recording_create_pdf_documents(generator, documents, executor_type=None, **kwargs):
+        executors.append(executor_type)
+        return create_pdf_documents(generator, documents, executor_type=executor_type, **kwargs)
+
+    EnhancedDocumentGenerator.create_pdf_documents = recording_create_pdf_documents
+    try:
+        input_dir = work_dir / "input"
+        input_dir.mkdir()
+        shutil.copy(SAMPLE_FILE, input_dir / "bill_a.xlsx")
+        shutil.copy(SAMPLE_FILE, input_dir / "bill_b.xlsx")
+
+        processor = HighPerformanceBatchProcessor(str(input_dir), str(work_dir / "output"))
+        results = processor.process_batch_parallel(max_workers=2)
+        assert results['success'], results['message']
+        assert processor.processing_stats['processed_files'] == 2
+        assert executors == ['serial', 'serial'], executors
+        print("✅ Threaded batch converted each file's documents serially")
+    finally:
+        EnhancedDocumentGenerator.create_pdf_documents = create_pdf_documents
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_batch_pdfs_contain_item_rows():
+    """Tabular PDFs written by a batch run are built from the bill, not left blank"""
+    print("Testing batch PDF contents...")
+    work_dir = Path(tempfile.mkdtemp())
+    try:
+        input_dir = work_dir / "input"
+        input_dir.mkdir()
+        shutil.copy(SAMPLE_FILE, input_dir / "bill.xlsx")
+
+        processor = HighPerformanceBatchProcessor(str(input_dir), str(work_dir / "output"))
+        file_stats = processor.process_single_file(input_dir / "bill.xlsx")
+        assert file_stats['success'], file_stats['error']
+
+        for doc_name in ('First Page Summary', 'Deviation Statement'):
+            pdf_path = work_dir / "output" / "bill" / f"{doc_name}.pdf"
+            text = ''.join(page.extract_text() for page in PdfReader(str(pdf_path)).pages)
+            assert 'Short point (up to 3 mtr.)' in text, doc_name
+        print("✅ Batch PDFs contain the item rows")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_resume_skips_unchanged_files():
+    """A resumed batch only reprocesses files whose content changed"""
+    print("Testing resumable batch manifest...")
+    work_dir = Path(tempfile.mkdtemp())
+    try:
+        input_dir = work_dir / "input"
+        input_dir.mkdir()
+        shutil.copy(SAMPLE_FILE, input_dir / "bill_a.xlsx")
+        shutil.copy(SAMPLE_FILE, input_dir / "bill_b.xlsx")
+        output_dir = work_dir / "output"
+
+        first = HighPerformanceBatchProcessor(str(input_dir), str(output_dir))
+        assert first.process_batch_files()['success']
+        manifest = BatchManifest(output_dir / MANIFEST_FILE_NAME)
+        assert manifest.summary() == {'success': 2}
+
+        # Change one input; the other must be skipped on resume
+        (input_dir / "bill_b.xlsx").write_bytes(
+            (Path(__file__).parent / "input_files" / "new_t01plus.xlsx").read_bytes())
+        resumed = HighPerformanceBatchProcessor(str(input_dir), str(output_dir))
+        results = resumed.process_batch_files(resume=True)
+
+        skipped = [s['file_name'] for s in results['stats'] if s.get('skipped')]
+        assert skipped == ['bill_a.xlsx']
+        assert resumed.processing_stats['processed_files'] == 1
+        assert resumed.processing_stats['skipped_files'] == 1
+        print("✅ Resume skipped the unchanged file")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_default_worker_count_is_bounded()
+    test_process_pool_batch()
+    test_thread_batch_converts_documents_serially()
+    test_batch_pdfs_contain_item_rows()
+    test_resume_skips_unchanged_files()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test the pipeline benchmark harness
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_pipeline import STAGES, find_import_overruns, find_regressions, main
+
+
+def test_benchmark_writes_results_and_detects_regressions():
+    """A small synthetic run reports every stage and is checked against its baseline"""
+    print("Testing pipeline benchmark...")
+    work_dir = Path(tempfile.mkdtemp())
+    try:
+        results_path = work_dir / "results.json"
+        baseline_path = work_dir / "baseline.json"
+        args = ['--input-dir', '', '--scales', '40', '--no-memory', '--skip-imports',
+                '--results', str(results_path), '--baseline', str(baseline_path)]
+        assert main(args + ['--update-baseline']) == 0
+
+        with open(results_path) as f:
+            results = json.load(f)
+        dataset = results['datasets']['synthetic_40']
+        assert dataset['bills'] == 1 and dataset['items'] == 40
+        assert tuple(dataset['stages']) == STAGES
+        assert all(stats['p50_ms'] > 0 for stats in dataset['stages'].values())
+
+        # Identical results never regress; a stage twice as slow as its baseline does
+        assert find_regressions(results, results) == []
+        baseline = json.loads(json.dumps(results))
+        baseline['datasets']['synthetic_40']['stages']['pdf']['p50_ms'] = dataset['stages']['pdf']['p50_ms'] / 2 - 30
+        regressions = find_regressions(results, baseline)
+        assert len(regressions) == 1 and regressions[0].startswith('synthetic_40/pdf')
+        print("✅ Benchmark results written and regressions detected")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_import_overruns():
+    """Cold imports are compared with their absolute budgets"""
+    results = {'imports': {'billgen_cli': {'import_seconds': 0.05, 'budget_seconds': 0.2},
+                           'app': {'import_seconds': 3.1, 'budget_seconds': 2.5}}}
+    assert find_import_overruns(results) == ['import app: 3.10s > budget 2.50s']
+    assert find_import_overruns({'datasets': {}}) == []
+    print("✅ Import budget overruns reported")
+
+
+if __name__ == "__main__":
+    test_benchmark_writes_results_and_detects_regressions()
+    test_import_overruns()
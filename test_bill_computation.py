@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test the vectorized bill computation shared by the document generators
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.bill_computation import (
+    compute_bill_totals, compute_work_order_lines, format_amounts, serial_numbers, to_numeric_array
+)
+from enhanced_document_generator_fixed import EnhancedDocumentGenerator
+
+
+def _work_order():
+    return pd.DataFrame({
+        'Item No.': ['1', '1.1', None, '2'],
+        'Description': ['Main item', 'Zero rate item', 'Blank rate item', 'Text rate item'],
+        'Unit': ['Nos', 'Mtr', 'Kg', 'Nos'],
+        'Quantity Since': [10, 5, 3, 2],
+        'Rate': [100.5, 0, None, 'abc'],
+    })
+
+
+def test_numeric_coercion_matches_safe_float():
+    """Blank, NaN and text cells coerce to 0.0 like _safe_float"""
+    values = pd.Series(['12.5', '', None, 'abc', 7, np.nan], dtype=object)
+    assert to_numeric_array(values).tolist() == [12.5, 0.0, 0.0, 0.0, 7.0, 0.0]
+    assert format_amounts(np.array([1.234, 0.0, -1.0])) == ['1.23', '', '']
+    assert serial_numbers(_work_order()) == ['1', '1.1', '', '2']
+    print("✅ Column coercion matches the per-row helpers")
+
+
+def test_zero_rate_masking():
+    """Zero-rate rows keep their description but show no quantity or amount"""
+    lines = compute_work_order_lines(_work_order(), zero_rate_masking=True)
+    assert lines['amount'].tolist() == [1005.0, 0.0, 0.0, 0.0]
+    assert lines['zero_rate'].tolist() == [False, True, True, True]
+    assert lines['quantity_since_display'].tolist() == [10.0, 0.0, 0.0, 0.0]
+    # Quantity Upto falls back to the unmasked Quantity Since
+    assert lines['quantity_upto'].tolist() == [10.0, 5.0, 3.0, 2.0]
+    print("✅ Zero-rate rows are masked as arrays")
+
+
+def test_totals_and_generator_template_data():
+    """Premium, deductions and totals match the generator's template data"""
+    totals = compute_bill_totals(1000.0, 200.0, 0.10)
+    assert totals['premium_amount'] == 100.0
+    assert totals['grand_total'] == 1100.0
+    assert totals['extra_grand_total'] == 220.0
+    assert abs(totals['total_deductions'] - 165.0) < 1e-9
+    assert abs(totals['net_payable'] - 935.0) < 1e-9
+
+    generator = EnhancedDocumentGenerator({
+        'title_data': {'TENDER PREMIUM %': '10%'},
+        'work_order_data': _work_order(),
+        'extra_items_data': pd.DataFrame(),
+    })
+    data = generator.template_data
+    assert [item['item_no'] for item in data['work_items']] == ['1', '1.1', '', '2']
+    assert data['work_items'][1]['amount_upto'] == 0.0
+    assert abs(data['total_amount'] - 1005.0) < 1e-9
+    assert abs(data['grand_total'] - 1105.5) < 1e-9
+
+    first_page = generator.template_renderer._prepare_first_page_data({}, _work_order())
+    items = first_page['data']['items']
+    assert items[0]['amount'] == '1005.00'
+    assert items[1]['unit'] == '' and items[1]['description'] == 'Zero rate item'
+    print("✅ Totals and template data computed from arrays")
+
+
+if __name__ == "__main__":
+    test_numeric_coercion_matches_safe_float()
+    test_zero_rate_masking()
+    test_totals_and_generator_template_data()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test the canonical bill model shared by the document renderers
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+from enhanced_document_generator_fixed import EnhancedDocumentGenerator
+from utils.bill_model import BillModel, premium_percent
+from utils.template_renderer import TemplateRenderer
+
+
+def _bill_data():
+    return {
+        'title_data': {'Name of Work': 'Road repair', 'TENDER PREMIUM %': '5%'},
+        'work_order_data': pd.DataFrame([
+            {'Item No.': '1', 'Description': 'Excavation', 'Unit': 'Cum', 'Quantity': 99,
+             'Quantity Since': 10, 'Rate': 100.0},
+            {'Item No.': '2', 'Description': 'Heading', 'Unit': '', 'Quantity Since': 5, 'Rate': 0},
+        ]),
+        'extra_items_data': pd.DataFrame([{'Item No.': 'E1', 'Description': 'Shoring', 'Unit': 'Sqm',
+                                           'Quantity': 4, 'Rate': 50.0}]),
+    }
+
+
+def test_premium_percent():
+    """Premium is read as a percent; missing or invalid values mean no premium"""
+    assert premium_percent({'TENDER PREMIUM %': '4.25%'}) == 4.25
+    assert premium_percent({'Tender Premium': 1}) == 1.0
+    assert premium_percent({'TENDER PREMIUM %': ''}) == 0.0
+    assert premium_percent({'TENDER PREMIUM %': 'n/a'}) == 0.0
+    assert premium_percent({}) == 0.0 and premium_percent(None) == 0.0
+    print("✅ Premium parsed")
+
+
+def test_bill_model_totals():
+    """Work order amounts use Quantity Since; extra items are kept separate"""
+    data = _bill_data()
+    model = BillModel(data['title_data'], data['work_order_data'], data['extra_items_data'])
+    assert model.work_order_total == 1000.0 and model.extra_total == 200.0
+    assert model.premium_fraction == 0.05
+    assert model.payable_amount == 1050.0
+    assert abs(model.net_payable - 1050.0 * 0.85) < 1e-9
+    assert model.template_totals()['tender_premium_amount'] == 50.0
+    # Unmasked lines show zero-rate quantities, masked ones hide them
+    assert model.work_order_lines()['quantity_since_display'].tolist() == [10.0, 5.0]
+    assert model.work_order_lines(zero_rate_masking=True)['quantity_since_display'].tolist() == [10.0, 0.0]
+    print("✅ Bill totals computed")
+
+
+def test_documents_agree_on_totals():
+    """First page, certificate and note sheet all show the model's payable amount"""
+    generator = EnhancedDocumentGenerator(_bill_data())
+    model = generator.get_bill_model()
+    assert generator.get_bill_model() is model
+    assert generator.template_data['totals']['grand_total'] == model.payable_amount
+    documents = generator.generate_all_documents()
+    for doc_name in ('First Page Summary', 'Certificate III', 'Final Bill Scrutiny Sheet'):
+        assert '1050' in documents[doc_name], doc_name
+
+    # Renderers called without a model build the same figures themselves
+    renderer = TemplateRenderer()
+    data = _bill_data()
+    html = renderer.render_certificate_iii(generator.title_data, data['work_order_data'])
+    assert html == documents['Certificate III']
+    print("✅ Documents agree on totals")
+
+
+if __name__ == "__main__":
+    test_premium_percent()
+    test_bill_model_totals()
+    test_documents_agree_on_totals()
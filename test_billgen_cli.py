@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test the headless billgen command line
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from billgen_cli import main
+
+REPO_DIR = Path(__file__).resolve().parent
+SAMPLE = REPO_DIR / "input_files" / "3rdFinalVidExtra.xlsx"
+
+
+def test_single_file_writes_requested_formats():
+    """One workbook produces PDFs, the merged PDF, HTML and a ZIP"""
+    print("Testing billgen single-file mode...")
+    out_dir = Path(tempfile.mkdtemp())
+    saved_environ = dict(os.environ)
+    try:
+        assert main([str(SAMPLE), '-o', str(out_dir), '-f', 'pdf,merged,html,zip', '--executor', 'serial']) == 0
+        files = {path.name for path in (out_dir / SAMPLE.stem).iterdir()}
+        assert 'First Page Summary.pdf' in files and 'first_page_summary.html' in files
+        assert f"{SAMPLE.stem}_Merged.pdf" in files and f"{SAMPLE.stem}_documents.zip" in files
+        print(f"✅ {len(files)} files written")
+
+        # HTML only streams the documents to their files without converting them
+        html_dir = out_dir / 'html_only'
+        assert main([str(SAMPLE), '-o', str(html_dir), '-f', 'html']) == 0
+        html_files = {path.name for path in (html_dir / SAMPLE.stem).iterdir()}
+        assert html_files == {name for name in files if name.endswith('.html')}
+    finally:
+        # main() applies its options as BILLGEN_* environment settings
+        os.environ.clear()
+        os.environ.update(saved_environ)
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def test_cold_start_skips_ui_and_browser_engines():
+    """A fresh conversion defers the PDF engines and DOCX export and never imports Streamlit or browsers"""
+    print("Testing billgen cold start...")
+    out_dir = tempfile.mkdtemp()
+    script = (
+        "import sys\n"
+        "import billgen_cli, batch_processor\n"
+        "from enhanced_document_generator_fixed import EnhancedDocumentGenerator\n"
+        "from utils.excel_processor import ExcelProcessor\n"
+        "print(sorted(m for m in ('reportlab', 'playwright', 'weasyprint', 'docx', 'streamlit') if m in sys.modules))\n"
+        f"assert billgen_cli.main([{str(SAMPLE)!r}, '-o', {out_dir!r}, '--executor', 'serial']) == 0\n"
+        "print(sorted(m for m in ('streamlit', 'playwright', 'weasyprint') if m in sys.modules))\n"
+    )
+    try:
+        result = subprocess.run([sys.executable, '-c', script], cwd=REPO_DIR, capture_output=True,
+                                text=True, timeout=300)
+        assert result.returncode == 0, result.stderr
+        lines = result.stdout.strip().splitlines()
+        assert lines[0] == '[]', lines[0]
+        assert lines[-1] == '[]', lines[-1]
+        print("✅ Pipeline imported without PDF engines, UI or browser engines")
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_single_file_writes_requested_formats()
+    test_cold_start_skips_ui_and_browser_engines()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test the hash-join deviation engine used by the Deviation Statement
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from enhanced_document_generator_fixed import EnhancedDocumentGenerator
+from utils.deviation_engine import compute_deviation_frame, deviation_totals, format_deviation_rows
+from utils.template_renderer import TemplateRenderer
+
+
+def test_items_align_on_normalized_numbers():
+    """Work order and bill quantity rows align on normalized item numbers"""
+    print("Testing deviation engine alignment...")
+    work_order = pd.DataFrame({
+        'Item No.': [1, ' 2 ', 3.0, None, '1.10'],
+        'Description': ['A', 'B', 'C', 'Sub item', 'D'],
+        'Unit': ['Nos', 'Mtr', 'Kg', 'Nos', 'Nos'],
+        'Quantity Since': [10, 5, 4, 2, 1],
+        'Rate': [100, 10, 0, 5, 20],
+    })
+    bill_quantity = pd.DataFrame({
+        'Item No.': ['1', '2', '2', '3', '1.1'],
+        'Quantity': [12, 3, 99, 4, 7],
+    })
+
+    frame = compute_deviation_frame(work_order, bill_quantity)
+    assert frame['matched'].tolist() == [True, True, True, False, False]
+    # The first Bill Quantity row wins for duplicated item numbers
+    assert frame['qty_bill'].tolist() == [12.0, 3.0, 4.0, 0.0, 0.0]
+    assert frame['excess_qty'].tolist() == [2.0, 0.0, 0.0, 0.0, 0.0]
+    assert frame['saving_amt'].tolist() == [0.0, 20.0, 0.0, 10.0, 20.0]
+
+    totals = deviation_totals(frame)
+    assert totals['amt_wo'] == 1000 + 50 + 10 + 20
+    assert totals['excess_amt'] == 200
+
+    rows = format_deviation_rows(frame)
+    assert rows[0]['excess_amt'] == '200.00' and rows[0]['saving_qty'] == ''
+    assert format_deviation_rows(frame, show_zero=True)[0]['saving_qty'] == '0.00'
+    print("✅ Deviation rows aligned with a single lookup")
+
+
+def test_missing_bill_quantity():
+    """Without bill quantity data every work order quantity is a saving"""
+    work_order = pd.DataFrame({'Item No.': [1], 'Quantity Since': [3], 'Rate': [2]})
+    frame = compute_deviation_frame(work_order, pd.DataFrame())
+    assert frame['saving_amt'].tolist() == [6.0]
+    assert compute_deviation_frame(pd.DataFrame(), pd.DataFrame()).empty
+    print("✅ Missing bill quantity handled")
+
+
+def test_template_uses_deviation_frame():
+    """The deviation template reports the engine's quantities and totals"""
+    work_order = pd.DataFrame({'Item No.': [1, 2], 'Description': ['A', 'B'], 'Unit': ['Nos', 'Mtr'],
+                               'Quantity Since': [10, 5], 'Rate': [100, 10]})
+    bill_quantity = pd.DataFrame({'Item No.': ['1', '2'], 'Quantity': [12, 3]})
+    frame = compute_deviation_frame(work_order, bill_quantity)
+    totals = deviation_totals(frame)
+
+    data = TemplateRenderer()._prepare_deviation_data({}, work_order, bill_quantity_data=bill_quantity)
+    summary = data['data']['summary']
+    assert summary['work_order_total'] == f"{totals['amt_wo']:.2f}" == '1050.00'
+    assert summary['executed_total'] == f"{totals['amt_bill']:.2f}" == '1230.00'
+    assert [item.qty_bill for item in data['data']['items']] == ['12.00', '3.00']
+
+    generator = EnhancedDocumentGenerator({'title_data': {}, 'work_order_data': work_order,
+                                           'bill_quantity_data': bill_quantity})
+    html = TemplateRenderer().render_deviation_statement({}, work_order, bill_quantity_data=bill_quantity,
+                                                         model=generator.get_bill_model())
+    assert html == generator._render_document('Deviation Statement')
+    print("✅ Template deviations match the engine")
+
+
+if __name__ == "__main__":
+    test_items_align_on_normalized_numbers()
+    test_missing_bill_quantity()
+    test_template_uses_deviation_frame()
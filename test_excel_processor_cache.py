@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed parsed result cache and workbook readers of ExcelProcessor
+"""
+
+import io
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.excel_processor import ExcelProcessor
+from utils.cache_utils import SizeBoundedLRUCache, stream_digest
+
+SAMPLE_FILE = Path(__file__).parent / "input_files" / "3rdFinalVidExtra.xlsx"
+
+
+class _Upload(io.BytesIO):
+    """Mimic a Streamlit UploadedFile (file-like object with a name)"""
+
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+
+
+def test_same_bytes_share_cache_entry():
+    """Two separate uploads of the same workbook hit the same cache entry"""
+    print("Testing content-addressed Excel cache...")
+    ExcelProcessor.clear_cache()
+    raw = SAMPLE_FILE.read_bytes()
+
+    first = ExcelProcessor(_Upload(raw, "first.xlsx")).process_excel()
+    second = ExcelProcessor(_Upload(raw, "renamed.xlsx")).process_excel()
+    from_path = ExcelProcessor(str(SAMPLE_FILE)).process_excel()
+
+    stats = ExcelProcessor.get_cache_stats()
+    print(f"Cache stats: {stats}")
+    assert stats['misses'] == 1
+    assert stats['hits'] == 2
+    assert first['title_data'] == second['title_data'] == from_path['title_data']
+    pd.testing.assert_frame_equal(first['work_order_data'], second['work_order_data'])
+
+    # Callers must not be able to mutate the cached entry
+    second['title_data']['Bill Number'] = 'Changed'
+    second['work_order_data'].iloc[0, 0] = 999
+    third = ExcelProcessor(_Upload(raw, "third.xlsx")).process_excel()
+    assert third['title_data']['Bill Number'] != 'Changed'
+    assert third['work_order_data'].iloc[0, 0] != 999
+    print("✅ Re-uploads are served from the parsed result cache")
+
+
+def test_size_bounded_lru_eviction():
+    """The LRU cache evicts by total byte size, oldest first"""
+    cache = SizeBoundedLRUCache(max_bytes=100)
+    cache.put('a', b'x' * 40)
+    cache.put('b', b'x' * 40)
+    assert cache.get('a') is not None  # 'a' becomes most recently used
+    cache.put('c', b'x' * 40)
+
+    assert 'a' in cache and 'c' in cache
+    assert 'b' not in cache
+    assert cache.current_bytes == 80
+    assert cache.put('huge', b'x' * 101) is False
+    assert cache.stats()['evictions'] == 1
+    assert stream_digest(b'abc') == stream_digest(io.BytesIO(b'abc'))
+    print("✅ Size-bounded LRU eviction works")
+
+
+def test_single_pass_reader_matches_pandas():
+    """The single-pass openpyxl reader produces the same data as the pandas reader"""
+    print("Testing single-pass openpyxl reader parity...")
+    input_dir = Path(__file__).parent / "input_files"
+    for workbook in ("3rdFinalVidExtra.xlsx", "new_t01plus.xlsx", "generated_test_file_01.xlsx"):
+        ExcelProcessor.clear_cache()
+        expected = ExcelProcessor(str(input_dir / workbook)).process_excel(allow_missing_bill_quantity=True)
+        ExcelProcessor.clear_cache()
+        actual = ExcelProcessor(str(input_dir / workbook), reader='openpyxl').process_excel(
+            allow_missing_bill_quantity=True)
+
+        assert actual['title_data'] == expected['title_data']
+        for key in ('work_order_data', 'bill_quantity_data', 'extra_items_data'):
+            pd.testing.assert_frame_equal(actual[key], expected[key])
+    print("✅ Single-pass reader matches pd.read_excel output")
+
+
+if __name__ == "__main__":
+    test_same_bytes_share_cache_entry()
+    test_size_bounded_lru_eviction()
+    test_single_pass_reader_matches_pandas()
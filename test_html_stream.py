@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test streaming HTML rendering
+"""
+
+import io
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from enhanced_document_generator_fixed import EnhancedDocumentGenerator
+from utils.html_stream import buffered_chunks, encoded_chunks, write_chunks
+
+
+def _generator(n_items):
+    work_order = pd.DataFrame({
+        'Item No.': [str(i) for i in range(n_items)],
+        'Description': ['Earth work in excavation & <disposal>'] * n_items,
+        'Unit': ['Cum'] * n_items,
+        'Quantity Since': np.ones(n_items),
+        'Rate': np.full(n_items, 100.0),
+    })
+    extra_items = pd.DataFrame([{'Item No.': 'E1', 'Description': 'Shoring', 'Unit': 'Sqm',
+                                 'Quantity': 4, 'Rate': 50.0}])
+    return EnhancedDocumentGenerator({'title_data': {'Name of Work': 'Road repair'},
+                                      'work_order_data': work_order, 'extra_items_data': extra_items})
+
+
+def test_buffered_chunks():
+    """Small pieces are coalesced into chunks of about the requested size"""
+    chunks = list(buffered_chunks(['ab'] * 10, chunk_chars=5))
+    assert ''.join(chunks) == 'ab' * 10
+    assert [len(chunk) for chunk in chunks] == [6, 6, 6, 2]
+    assert list(buffered_chunks([])) == []
+    assert b''.join(encoded_chunks(['₹', '1'])) == '₹1'.encode('utf-8')
+
+    text, binary = io.StringIO(), io.BytesIO()
+    assert write_chunks(['₹', 'x'], text) == 2 and text.getvalue() == '₹x'
+    write_chunks(['₹', 'x'], binary)
+    assert binary.getvalue() == '₹x'.encode('utf-8')
+    print("✅ Chunks buffered and written")
+
+
+def test_streamed_documents_match_rendered():
+    """Every document streams to the same HTML the whole-string renderer produces"""
+    print("Testing streamed documents...")
+    generator = _generator(50)
+    for doc_name in generator.document_names():
+        output = io.StringIO()
+        generator.write_document(doc_name, output)
+        assert output.getvalue() == generator._render_document(doc_name), doc_name
+    print(f"✅ {len(generator.document_names())} documents streamed")
+
+
+def test_large_statement_streams_in_chunks():
+    """A 20k-row Deviation Statement arrives in bounded chunks"""
+    generator = _generator(20000)
+    sizes = [len(chunk) for chunk in generator.stream_document('Deviation Statement')]
+    assert len(sizes) > 10
+    # A chunk overshoots the target by at most one rendered piece
+    assert max(sizes) < 2 * 64 * 1024
+    print(f"✅ {sum(sizes)} characters in {len(sizes)} chunks")
+
+
+def test_broken_template_falls_back():
+    """A template that fails on its first chunk is rendered whole instead"""
+    generator = _generator(7)
+    # Without its context the template fails with "'data' is undefined" before yielding
+    generator._table_document_data = lambda doc_name: {}
+    output = io.StringIO()
+    generator.write_document('Deviation Statement', output)
+    assert output.getvalue() == generator._render_document('Deviation Statement')
+    print("✅ Broken template stream fell back to whole rendering")
+
+
+if __name__ == "__main__":
+    test_buffered_chunks()
+    test_streamed_documents_match_rendered()
+    test_large_statement_streams_in_chunks()
+    test_broken_template_falls_back()
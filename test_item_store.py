@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test the columnar item store
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from enhanced_document_generator_fixed import EnhancedDocumentGenerator
+from utils.item_store import AmountColumn, ItemRow, ItemStore
+
+
+def test_amount_column_formats_on_access():
+    """Positive amounts show two decimals; zero, negative, NaN and masked cells are blank"""
+    column = AmountColumn([1.005, 0, -3, np.nan, 12.5, 7], blank=[False] * 5 + [True])
+    assert column.tolist() == ['1.00', '', '', '', '12.50', '']
+    assert len(column) == 6
+    print("✅ Amounts formatted")
+
+
+def test_rows_read_like_dicts():
+    """Rows support attribute, key and get() access and hold no per-row dict"""
+    store = ItemStore({'serial_no': ['1', '2'], 'rate': AmountColumn([100, 0]),
+                       'quantity': np.array([2.5, 3.0])})
+    row = store[1]
+    assert isinstance(row, ItemRow) and not hasattr(row, '__dict__')
+    assert row.serial_no == '2' and row['rate'] == '' and row.get('missing', '-') == '-'
+    assert type(row.quantity) is float and 'rate' in row
+    assert store[-1].to_dict() == row.to_dict()
+    assert [item.serial_no for item in store] == ['1', '2']
+    try:
+        row.missing
+        assert False, "expected AttributeError"
+    except AttributeError:
+        pass
+    try:
+        ItemStore({'a': [1], 'b': [1, 2]})
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    print("✅ Rows read like dicts")
+
+
+def test_concat_fills_missing_columns():
+    """Concatenated stores keep row order and blank the columns a store lacks"""
+    work = ItemStore({'serial_no': ['1'], 'amount': AmountColumn([10])})
+    extra = ItemStore({'serial_no': ['E1'], 'amount': AmountColumn([5]), 'remark': ['new']})
+    combined = ItemStore.concat([work, ItemStore({}), extra])
+    assert combined.to_dicts() == [{'serial_no': '1', 'amount': '10.00', 'remark': ''},
+                                   {'serial_no': 'E1', 'amount': '5.00', 'remark': 'new'}]
+    assert isinstance(combined.column('amount'), AmountColumn)
+    assert ItemStore.concat([work]) is work
+    assert len(ItemStore.concat([])) == 0
+    print("✅ Stores concatenated")
+
+
+def test_generator_shares_one_store():
+    """HTML rendering and the native PDF path use the same prepared rows"""
+    work_order = pd.DataFrame({'Item No.': ['1', '2'], 'Description': ['Excavation', 'Filling'],
+                               'Unit': ['Cum', 'Cum'], 'Quantity': [10, 4], 'Rate': [100.0, 50.0]})
+    bill_quantity = pd.DataFrame({'Item No.': ['1', '2'], 'Quantity': [12, 3]})
+    generator = EnhancedDocumentGenerator({'title_data': {'Name of Work': 'Road repair'},
+                                           'work_order_data': work_order, 'bill_quantity_data': bill_quantity})
+    data = generator._table_document_data('Deviation Statement')
+    assert generator._table_document_data('Deviation Statement') is data
+    items = data['data']['items']
+    assert isinstance(items, ItemStore)
+    assert [(item.excess_amt, item.saving_amt) for item in items] == [('200.00', ''), ('', '50.00')]
+    assert data['data']['summary']['work_order_total'] == '1200.00'
+    assert 'Filling' in generator._render_document('Deviation Statement')
+    print("✅ One item store per document")
+
+
+if __name__ == "__main__":
+    test_amount_column_formats_on_access()
+    test_rows_read_like_dicts()
+    test_concat_fills_missing_columns()
+    test_generator_shares_one_store()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Test lazy imports and the modules each entry module defers
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.lazy_imports import DEFERRED_IMPORTS, LazyModule, deferred_imports_loaded, lazy_import, optional_import
+
+
+def test_lazy_module_imports_on_first_use():
+    """A proxy imports its module on first attribute access and reuses it afterwards"""
+    name = 'email.mime.application'
+    sys.modules.pop(name, None)
+    proxy = lazy_import(name)
+    assert isinstance(proxy, LazyModule) and name not in sys.modules
+    assert proxy.MIMEApplication.__name__ == 'MIMEApplication'
+    assert name in sys.modules and proxy.MIMEApplication is sys.modules[name].MIMEApplication
+    # Modules already imported are returned as they are
+    assert lazy_import('os') is os
+    assert optional_import('no_such_billgen_module') is None
+    print("✅ Lazy module loaded on first use")
+
+
+def test_entry_modules_defer_heavy_imports():
+    """Cold imports leave PDF engines, DOCX export and batch mode unloaded"""
+    print("Testing deferred imports...")
+    for module in DEFERRED_IMPORTS:
+        loaded = deferred_imports_loaded(module)
+        assert not loaded, f"{module} imported {loaded} eagerly"
+        print(f"✅ {module} defers {len(DEFERRED_IMPORTS[module])} modules")
+
+
+if __name__ == "__main__":
+    test_lazy_module_imports_on_first_use()
+    test_entry_modules_defer_heavy_imports()
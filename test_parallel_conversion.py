@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test concurrent per-document PDF conversion
+"""
+
+import io
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from enhanced_document_generator_fixed import EnhancedDocumentGenerator
+from optimized_pdf_converter import OptimizedPDFConverter
+from utils.parallel_conversion import convert_documents, get_process_pool, resolve_executor_type
+from utils.pdf_engines import get_engine_registry
+from utils.render_cache import get_render_cache
+
+DOCUMENTS = {
+    f"doc_{i}": f"<html><body><h1>Document {i}</h1><table><tr><td>Item</td><td>{i}</td></tr></table></body></html>"
+    for i in (3, 1, 2, 5, 4)
+}
+
+
+def _tag(name, payload):
+    return f"{name}:{len(payload)}"
+
+
+def test_results_keep_document_order():
+    """Every executor returns results in the original document order"""
+    print("Testing executor order preservation...")
+    expected = {name: _tag(name, html) for name, html in DOCUMENTS.items()}
+    for executor_type in ('serial', 'thread', 'process'):
+        results = convert_documents(_tag, DOCUMENTS, executor_type=executor_type, max_workers=2)
+        assert list(results) == list(DOCUMENTS), executor_type
+        assert results == expected, executor_type
+    assert resolve_executor_type('process', 1) == 'serial'
+    print("✅ Order preserved for serial, thread and process executors")
+
+
+def test_auto_uses_threads_and_one_process_pool():
+    """'auto' never forks; the process executor reuses one long-lived pool"""
+    assert resolve_executor_type('auto', 5) == 'thread'
+    pool = get_process_pool()
+    convert_documents(_tag, DOCUMENTS, executor_type='process')
+    convert_documents(_tag, DOCUMENTS, executor_type='process', max_workers=3)
+    assert get_process_pool() is pool
+    print("✅ Process pool reused across calls")
+
+
+def test_process_workers_report_engine_attempts():
+    """Engine outcomes from process workers reach the parent's statistics and routing"""
+    registry = get_engine_registry()
+    registry.reset()
+    get_render_cache().clear()
+    EnhancedDocumentGenerator({}).create_pdf_documents(DOCUMENTS, executor_type='process')
+    stats = registry.get_stats()
+    assert set(DOCUMENTS) <= set(stats['routing']), stats['routing']
+    assert sum(engine['attempts'] for engine in stats['engines'].values()) >= len(DOCUMENTS)
+
+    registry.reset()
+    OptimizedPDFConverter().convert_documents_to_pdf(DOCUMENTS, executor_type='process')
+    assert {f"optimized/{name}" for name in DOCUMENTS} <= set(registry.get_stats()['routing'])
+    print("✅ Worker attempts recorded in the parent")
+
+
+def test_create_pdf_documents_executors():
+    """Generator PDFs come back as valid PDFs in document order for each executor"""
+    print("Testing EnhancedDocumentGenerator parallel conversion...")
+    generator = EnhancedDocumentGenerator({})
+    for executor_type in ('serial', 'thread', 'process'):
+        # Start cold so every executor actually converts
+        get_render_cache().clear()
+        pdf_files = generator.create_pdf_documents(DOCUMENTS, executor_type=executor_type)
+        assert list(pdf_files) == [f"{name}.pdf" for name in DOCUMENTS], executor_type
+        assert all(pdf.startswith(b'%PDF') for pdf in pdf_files.values()), executor_type
+    print("✅ Generator conversion matches across executors")
+
+
+def test_engines_render_into_buffers():
+    """PDF engines write into in-memory buffers as well as file paths"""
+    generator = EnhancedDocumentGenerator({})
+    buffer = io.BytesIO()
+    assert generator._generate_pdf_reportlab(DOCUMENTS['doc_1'], buffer)
+    assert buffer.getvalue().startswith(b'%PDF')
+    pdf_bytes, success = generator._convert_single_document('doc_1', DOCUMENTS['doc_1'])
+    assert success and pdf_bytes.startswith(b'%PDF')
+    print("✅ ReportLab rendered into a BytesIO buffer")
+
+
+def test_converter_stats_are_collected():
+    """Converter statistics are aggregated in the caller when documents run in workers"""
+    converter = OptimizedPDFConverter()
+    pdf_files = converter.convert_documents_to_pdf(DOCUMENTS, executor_type='thread')
+    assert list(pdf_files) == [f"{name}.pdf" for name in DOCUMENTS]
+    stats = converter.get_conversion_stats()
+    assert stats['total_conversions'] == len(DOCUMENTS)
+    assert stats['successful_conversions'] + stats['failed_conversions'] == len(DOCUMENTS)
+    print("✅ Converter stats aggregated")
+
+
+def test_converter_subclass_used_in_threads():
+    """Thread and serial conversions call the converter's own convert_single_document"""
+    class MarkingConverter(OptimizedPDFConverter):
+        def convert_single_document(self, doc_name, html_content):
+            return b'%PDF-marked ' + doc_name.encode(), True
+
+    for executor_type, documents in (('thread', DOCUMENTS), ('serial', dict(list(DOCUMENTS.items())[:1]))):
+        pdf_files = MarkingConverter().convert_documents_to_pdf(documents, executor_type=executor_type)
+        assert pdf_files == {f"{name}.pdf": b'%PDF-marked ' + name.encode() for name in documents}
+    print("✅ Converter subclass honoured by thread and serial conversions")
+
+
+if __name__ == "__main__":
+    test_results_keep_document_order()
+    test_auto_uses_threads_and_one_process_pool()
+    test_process_workers_report_engine_attempts()
+    test_create_pdf_documents_executors()
+    test_engines_render_into_buffers()
+    test_converter_stats_are_collected()
+    test_converter_subclass_used_in_threads()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test the process-wide PDF engine registry
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.pdf_engines import PDFEngineRegistry, get_engine_registry
+
+
+def _registry(**available):
+    registry = PDFEngineRegistry()
+    registry._available = dict(available)
+    return registry
+
+
+def test_routes_to_known_good_engine():
+    """After a success the document type goes straight to that engine"""
+    print("Testing engine routing...")
+    registry = _registry(first=True, second=True, missing=False)
+    calls = []
+
+    def failing(html):
+        calls.append('first')
+        raise RuntimeError("broken engine")
+
+    def working(html):
+        calls.append('second')
+        return b'%PDF-ok'
+
+    candidates = {'missing': working, 'first': failing, 'second': working}
+    assert registry.convert('First Page', candidates, '<html/>') == b'%PDF-ok'
+    assert calls == ['first', 'second']
+
+    calls.clear()
+    assert registry.convert('First Page', candidates, '<html/>') == b'%PDF-ok'
+    assert calls == ['second']
+    # Other document types still start with the preferred engine
+    assert registry.engines_for('Deviation Statement', candidates) == ['first', 'second']
+
+    stats = registry.get_stats()
+    assert stats['routing'] == {'First Page': 'second'}
+    assert stats['engines']['first']['success_rate'] == 0.0
+    assert stats['engines']['second']['attempts'] == 2
+    assert 'missing' not in stats['engines']
+    print("✅ Known-good engine used first")
+
+
+def test_failed_engine_is_demoted_not_dropped():
+    """An engine that stops working loses its route but remains a last resort"""
+    registry = _registry(first=True, second=True)
+    registry.record('first', 'Certificate II', False, 0.1)
+    assert registry.engines_for('Certificate II', ['first', 'second']) == ['second', 'first']
+    registry.record('first', 'Certificate II', True, 0.1)
+    assert registry.engines_for('Certificate II', ['first', 'second']) == ['first', 'second']
+    print("✅ Failed engine demoted")
+
+
+def test_process_registry_probes_once():
+    """The shared registry probes availability once and reports ReportLab"""
+    registry = get_engine_registry()
+    assert registry.available_engines is registry.available_engines
+    assert registry.is_available('reportlab')
+    print("✅ Engine probe cached")
+
+
+if __name__ == "__main__":
+    test_routes_to_known_good_engine()
+    test_failed_engine_is_demoted_not_dropped()
+    test_process_registry_probes_once()
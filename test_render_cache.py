@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test memoization of rendered HTML and PDF documents
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import pandas as pd
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from enhanced_document_generator_fixed import EnhancedDocumentGenerator
+from utils.render_cache import RenderCache, get_render_cache
+from utils.template_registry import current_template_version
+
+
+def _bill_data(quantity=10, extra_quantity=None):
+    extra_items = pd.DataFrame()
+    if extra_quantity is not None:
+        extra_items = pd.DataFrame({
+            'Item No.': ['E1'], 'Description': ['Extra railing'], 'Unit': ['Rmt'],
+            'Quantity': [extra_quantity], 'Rate': [450.0],
+        })
+    return {
+        'title_data': {'Name of Work': 'Road repair', 'Agreement No.': '12/2024'},
+        'work_order_data': pd.DataFrame({
+            'Item No.': ['1', '2'],
+            'Description': ['Excavation', 'Concrete'],
+            'Unit': ['Cum', 'Cum'],
+            'Quantity Since': [quantity, 4],
+            'Rate': [100.0, 2500.0],
+        }),
+        'bill_quantity_data': pd.DataFrame({'Item No.': ['1', '2'], 'Quantity': [quantity, 4]}),
+        'extra_items_data': extra_items,
+    }
+
+
+def test_cache_keys_track_bill_data():
+    """Equal bills share document keys; an edited cell changes only the documents that read it"""
+    first, same, edited = (EnhancedDocumentGenerator(data)
+                           for data in (_bill_data(), _bill_data(), _bill_data(quantity=11)))
+    for doc_name in first.document_names():
+        assert first.document_cache_key(doc_name) == same.document_cache_key(doc_name), doc_name
+    assert first.document_cache_key('Deviation Statement') != edited.document_cache_key('Deviation Statement')
+    assert first.document_cache_key('Extra Items Statement') == edited.document_cache_key('Extra Items Statement')
+    # The template version is hashed once and reused for every key
+    assert current_template_version() == current_template_version()
+    print("✅ Cache keys follow bill data")
+
+
+def test_unchanged_bill_is_served_from_cache():
+    """A rerun for the same bill hits the cache for HTML and every PDF"""
+    print("Testing rendered document memoization...")
+    cache = get_render_cache()
+    cache.clear()
+
+    html = EnhancedDocumentGenerator(_bill_data()).generate_all_documents()
+    pdfs = EnhancedDocumentGenerator(_bill_data()).create_pdf_documents(html, executor_type='serial')
+    misses = cache.stats()['misses']
+
+    # Streamlit rerun: new generator, same data
+    rerun = EnhancedDocumentGenerator(_bill_data())
+    html_again = rerun.generate_all_documents()
+    pdfs_again = rerun.create_pdf_documents(html_again, executor_type='serial')
+
+    assert html_again == html
+    assert pdfs_again == pdfs
+    stats = cache.stats()
+    assert stats['misses'] == misses
+    # One hit per HTML document and one per PDF
+    assert stats['hits'] == 2 * len(html)
+    print(f"✅ Rerun served from cache (hit rate {stats['hit_rate']:.0%})")
+
+
+def test_only_dependent_documents_are_regenerated():
+    """Editing an extra item re-renders only the documents that depend on extra items"""
+    print("Testing incremental document regeneration...")
+    get_render_cache().clear()
+    first = EnhancedDocumentGenerator(_bill_data(extra_quantity=2))
+    first_html = first.generate_all_documents()
+    pdfs = first.create_pdf_documents(first_html, executor_type='serial')
+    merged = first.merge_pdf_documents(pdfs)
+    assert first.render_summary['reused'] == []
+
+    edited = EnhancedDocumentGenerator(_bill_data(extra_quantity=3))
+    html = edited.generate_all_documents()
+    # The extra amount changes the bill totals, which the note sheet and Certificate II depend on
+    assert edited.render_summary['rendered'] == ['First Page Summary', 'Final Bill Scrutiny Sheet',
+                                                 'Extra Items Statement', 'Certificate II']
+    assert edited.render_summary['reused'] == ['Deviation Statement', 'Certificate III']
+
+    # Certificate II HTML came out identical, so its PDF is still reused
+    edited_pdfs = edited.create_pdf_documents(html, executor_type='serial')
+    assert edited_pdfs['Certificate II.pdf'] is pdfs['Certificate II.pdf']
+    assert edited_pdfs['Deviation Statement.pdf'] is pdfs['Deviation Statement.pdf']
+    assert html['First Page Summary'] != first_html['First Page Summary']
+    assert edited_pdfs['First Page Summary.pdf'] is not pdfs['First Page Summary.pdf']
+
+    # An unchanged PDF set reuses the merged output
+    assert first.merge_pdf_documents(pdfs) is merged
+    print("✅ Only changed documents regenerated")
+
+
+def test_disk_tier_survives_restart():
+    """Entries written to the disk tier are found by a fresh cache instance"""
+    disk_dir = tempfile.mkdtemp()
+    try:
+        RenderCache(1024 * 1024, disk_dir).put('pdf:key', b'%PDF-1.4 cached')
+        restarted = RenderCache(1024 * 1024, disk_dir)
+        assert restarted.get('pdf:key') == b'%PDF-1.4 cached'
+        assert restarted.get('pdf:key') == b'%PDF-1.4 cached'
+        stats = restarted.stats()
+        assert stats['disk_hits'] == 1 and stats['hits'] == 1 and stats['hit_rate'] == 1.0
+        assert restarted.get('pdf:other') is None
+        print("✅ Disk tier reused after restart")
+    finally:
+        shutil.rmtree(disk_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_cache_keys_track_bill_data()
+    test_unchanged_bill_is_served_from_cache()
+    test_only_dependent_documents_are_regenerated()
+    test_disk_tier_survives_restart()
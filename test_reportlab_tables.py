@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test the native ReportLab tables for the tabular documents
+"""
+
+import io
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+from PyPDF2 import PdfReader
+
+from enhanced_document_generator_fixed import EnhancedDocumentGenerator
+from utils.pdf_engines import get_engine_registry
+from utils.reportlab_tables import build_document
+
+
+def _deviation_data(n_items):
+    items = [{'serial_no': str(i), 'description': 'Excavation in hard rock & <disposal> ' * (i % 7 + 1),
+              'unit': 'Cum', 'qty_wo': '10.00', 'rate': '100.00', 'amt_wo': '1000.00', 'qty_bill': '12.00',
+              'amt_bill': '1200.00', 'excess_qty': '2.00', 'excess_amt': '200.00', 'saving_qty': '',
+              'saving_amt': '', 'remark': ''} for i in range(n_items)]
+    return {'header_data': [], 'data': {'items': items, 'summary': {'premium': {'percent': 0.05},
+                                                                     'net_difference': '200.00'}}}
+
+
+def test_long_deviation_statement_pages():
+    """A long statement is landscape, one table per page, with the header on every page"""
+    print("Testing long Deviation Statement...")
+    output = io.BytesIO()
+    build_document('Deviation Statement', _deviation_data(600), output)
+    pages = PdfReader(io.BytesIO(output.getvalue())).pages
+    assert len(pages) > 5
+    for page in pages:
+        assert float(page.mediabox.width) > float(page.mediabox.height)
+        if 'Cum' in page.extract_text():
+            assert 'ITEM No.' in page.extract_text()
+    text = ''.join(page.extract_text() for page in pages)
+    assert '<disposal>' in text and 'Overall Excess' in text
+    print(f"✅ 600 items on {len(pages)} landscape pages")
+
+
+def test_empty_tables_render():
+    """Documents without rows still render with a placeholder row"""
+    for doc_name, data in (('Extra Items Statement', {'data': {'items': []}}),
+                           ('Deviation Statement', {'data': {'items': []}}),
+                           ('First Page Summary', {'data': {'items': [], 'totals': {}}})):
+        output = io.BytesIO()
+        build_document(doc_name, data, output)
+        assert output.getvalue().startswith(b'%PDF')
+    print("✅ Empty tables rendered")
+
+
+def test_generator_builds_tabular_documents_natively():
+    """The generator builds tabular PDFs from the bill rows and converts the rest from HTML"""
+    data = {
+        'title_data': {'Name of Work': 'Road repair', 'TENDER PREMIUM %': 5},
+        'work_order_data': pd.DataFrame([{'Item No.': '1', 'Description': 'Excavation', 'Unit': 'Cum',
+                                          'Quantity Since': 10, 'Rate': 100.0}]),
+        'bill_quantity_data': pd.DataFrame([{'Item No.': '1', 'Quantity': 8}]),
+        'extra_items_data': pd.DataFrame([{'Item No.': 'E1', 'Description': 'Shoring', 'Unit': 'Sqm',
+                                           'Quantity': 4, 'Rate': 50.0}]),
+    }
+    generator = EnhancedDocumentGenerator(data)
+    documents = generator.generate_all_documents()
+    pdfs = generator.create_pdf_documents(documents, executor_type='serial')
+    assert set(pdfs) == {f"{name}.pdf" for name in documents}
+    routing = get_engine_registry().get_stats()['routing']
+    for name in ('First Page Summary', 'Deviation Statement', 'Extra Items Statement'):
+        assert routing[name] == 'reportlab-native'
+    assert routing['Certificate II'] != 'reportlab-native'
+    text = PdfReader(io.BytesIO(pdfs['First Page Summary.pdf'])).pages[0].extract_text()
+    assert 'Excavation' in text and 'Shoring' in text
+    print("✅ Tabular documents built natively")
+
+
+def test_empty_generator_does_not_build_or_cache_blank_tables():
+    """A generator without bill data converts the HTML it is given; its PDFs are not reused for a real bill"""
+    data = {
+        'title_data': {'Name of Work': 'Road repair'},
+        'work_order_data': pd.DataFrame([{'Item No.': '1', 'Description': 'Excavation', 'Unit': 'Cum',
+                                          'Quantity Since': 10, 'Rate': 100.0}]),
+    }
+    generator = EnhancedDocumentGenerator(data)
+    html = {'First Page Summary': generator.generate_all_documents()['First Page Summary']}
+    empty = EnhancedDocumentGenerator({})
+    assert empty._native_documents(html) == []
+    empty.create_pdf_documents(html, executor_type='serial')
+
+    pdfs = generator.create_pdf_documents(html, executor_type='serial')
+    text = PdfReader(io.BytesIO(pdfs['First Page Summary.pdf'])).pages[0].extract_text()
+    assert 'Excavation' in text
+    assert get_engine_registry().get_stats()['routing']['First Page Summary'] == 'reportlab-native'
+    print("✅ Empty generator left the native tables alone")
+
+
+if __name__ == "__main__":
+    test_long_deviation_statement_pages()
+    test_empty_tables_render()
+    test_generator_builds_tabular_documents_natively()
+    test_empty_generator_does_not_build_or_cache_blank_tables()
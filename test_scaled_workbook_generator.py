@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test the scalable stress-test workbook generator
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from generate_additional_test_files import MAX_SCALED_ITEMS, generate_scaled_workbook
+from utils.excel_processor import ExcelProcessor
+
+
+def test_generated_workbook_matches_requested_mix():
+    """The workbook has the requested item count and ratios and reads back through ingest"""
+    print("Testing scaled workbook generator...")
+    work_dir = Path(tempfile.mkdtemp())
+    try:
+        file_path = work_dir / "stress.xlsx"
+        counts = generate_scaled_workbook(file_path, 2000, zero_rate_ratio=0.25, extra_item_ratio=0.01,
+                                          hierarchical=True, work_order_total=5000000, seed=7)
+        assert counts['work_order'] == 2000 and counts['extra_items'] == 20
+        assert 400 < counts['zero_rate'] < 600
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            data = ExcelProcessor(file_path).process_excel()
+        work_order = data['work_order_data']
+        assert len(work_order) == 2000
+        assert len(data['bill_quantity_data']) == 2000
+        assert len(data['extra_items_data']) == 20
+        assert work_order['Item No.'].iloc[0] == '1.A.1' and work_order['Item No.'].iloc[10] == '1.B.1'
+        assert abs((work_order['Quantity Since'] * work_order['Rate']).sum() - 5000000) < 5000
+
+        # Skewed lengths: mostly short descriptions with a long tail
+        lengths = work_order['Description'].str.len()
+        assert lengths.median() < 100 and lengths.max() > 1000
+
+        # Same seed, same workbook contents
+        again = work_dir / "again.xlsx"
+        generate_scaled_workbook(again, 2000, zero_rate_ratio=0.25, extra_item_ratio=0.01,
+                                 hierarchical=True, work_order_total=5000000, seed=7)
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert ExcelProcessor(again).process_excel()['work_order_data'].equals(work_order)
+        print(f"✅ Generated {len(work_order)} items, {counts['zero_rate']} at zero rate")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_item_count_is_capped():
+    """Stress workbooks stop at MAX_SCALED_ITEMS items"""
+    assert MAX_SCALED_ITEMS == 100000
+    for n_items in (0, MAX_SCALED_ITEMS + 1):
+        try:
+            generate_scaled_workbook(Path(tempfile.gettempdir()) / "never_written.xlsx", n_items)
+            assert False, f"expected ValueError for {n_items}"
+        except ValueError:
+            pass
+    print("✅ Item count capped")
+
+
+if __name__ == "__main__":
+    test_generated_workbook_matches_requested_mix()
+    test_item_count_is_capped()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test the shared compiled-template registry
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from enhanced_document_generator_fixed import EnhancedDocumentGenerator
+from utils.document_generator import DocumentGenerator
+from utils import template_registry
+from utils.template_registry import get_template_environment, precompile_templates
+from utils.template_renderer import TemplateRenderer
+
+
+def test_renderers_share_one_environment():
+    """Every renderer of the templates directory uses the same compiled templates"""
+    print("Testing shared template environment...")
+    generator = EnhancedDocumentGenerator({})
+    renderer = TemplateRenderer()
+    assert generator.jinja_env is renderer.jinja_env
+    assert generator.jinja_env is DocumentGenerator({}).jinja_env
+    assert generator.jinja_env.get_template('first_page.html') is renderer.jinja_env.get_template('first_page.html')
+    print("✅ Renderers share one environment")
+
+
+def test_edited_template_is_recompiled():
+    """A template file change is picked up; the bytecode cache is written to disk"""
+    work_dir = Path(tempfile.mkdtemp())
+    try:
+        template_dir = work_dir / "templates"
+        template_dir.mkdir()
+        template_path = template_dir / "page.html"
+        template_path.write_text("Total {{ amount }}")
+
+        env = get_template_environment(str(template_dir), bytecode_cache_dir=str(work_dir / "bytecode"))
+        assert precompile_templates(env) == 1
+        assert env.get_template('page.html').render(amount=5) == "Total 5"
+        assert list((work_dir / "bytecode").iterdir())
+
+        template_path.write_text("Net {{ amount }}")
+        later = time.time() + 5
+        os.utime(template_path, (later, later))
+        assert env.get_template('page.html').render(amount=5) == "Net 5"
+        print("✅ Edited template recompiled")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_template_version_follows_edits():
+    """The template version is hashed once and rehashed only after a template changes"""
+    work_dir = Path(tempfile.mkdtemp())
+    default_dirs = template_registry.DEFAULT_TEMPLATE_DIRS
+    try:
+        (work_dir / 'page.html').write_text('<p>{{ value }}</p>')
+        template_registry.DEFAULT_TEMPLATE_DIRS = (work_dir,)
+        template_registry.clear_template_registry()
+        version = template_registry.current_template_version()
+        assert template_registry.current_template_version() == version
+
+        (work_dir / 'page.html').write_text('<p>{{ value }} edited</p>')
+        assert template_registry.current_template_version() != version
+        print("✅ Template version follows edits")
+    finally:
+        template_registry.DEFAULT_TEMPLATE_DIRS = default_dirs
+        template_registry.clear_template_registry()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_renderers_share_one_environment()
+    test_edited_template_is_recompiled()
+    test_template_version_follows_edits()
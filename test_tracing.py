@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test pipeline tracing spans and trace export
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+import pandas as pd
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from enhanced_document_generator_fixed import EnhancedDocumentGenerator
+from utils.render_cache import get_render_cache
+from utils.tracing import Tracer, get_tracer
+
+
+def test_nested_spans_and_export():
+    """Nested spans record their parent, the outermost one the memory peak, and export in both formats"""
+    print("Testing nested tracing spans...")
+    tracer = Tracer(enabled=True, trace_memory=True)
+    try:
+        with tracer.span('outer', bill='A'):
+            with tracer.span('inner'):
+                block = bytearray(2 * 1024 * 1024)
+            del block
+    finally:
+        tracer.disable()
+
+    inner, outer = tracer.spans
+    assert inner['name'] == 'inner' and inner['parent'] == 'outer' and inner['depth'] == 1
+    assert outer['parent'] is None and outer['attributes'] == {'bill': 'A'}
+    assert outer['wall_ms'] >= inner['wall_ms'] >= 0
+    # The child's allocation counts towards the outermost span's peak
+    assert 'tracemalloc_peak_bytes' not in inner
+    assert outer['tracemalloc_peak_bytes'] >= 2 * 1024 * 1024
+
+    out_dir = tempfile.mkdtemp()
+    try:
+        jsonl_path = os.path.join(out_dir, 'trace.jsonl')
+        assert tracer.export_jsonl(jsonl_path) == 2
+        with open(jsonl_path) as f:
+            assert [json.loads(line)['name'] for line in f] == ['inner', 'outer']
+
+        chrome_path = os.path.join(out_dir, 'trace.json')
+        assert tracer.export_chrome_trace(chrome_path) == 2
+        with open(chrome_path) as f:
+            events = json.load(f)['traceEvents']
+        assert {event['ph'] for event in events} == {'X'}
+        assert events[1]['args']['bill'] == 'A'
+        print("✅ Spans nested and exported")
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def test_pipeline_stages_are_traced():
+    """Generating a bill records spans for data prep, each render and PDF creation"""
+    print("Testing pipeline spans...")
+    data = {
+        'title_data': {'Name of Work': 'Road repair', 'Agreement No.': '12/2024'},
+        'work_order_data': pd.DataFrame({
+            'Item No.': ['1'], 'Description': ['Excavation'], 'Unit': ['Cum'],
+            'Quantity Since': [10], 'Rate': [100.0],
+        }),
+        'bill_quantity_data': pd.DataFrame({'Item No.': ['1'], 'Quantity': [10]}),
+        'extra_items_data': pd.DataFrame(),
+    }
+    get_render_cache().clear()
+    tracer = get_tracer()
+    tracer.clear()
+    tracer.enable(trace_memory=False)
+    try:
+        generator = EnhancedDocumentGenerator(data)
+        html = generator.generate_all_documents()
+        pdfs = generator.create_pdf_documents(html, executor_type='serial')
+        generator.merge_pdf_documents(pdfs)
+    finally:
+        tracer.disable()
+
+    summary = tracer.summary()
+    for name in ('template_data.prepare', 'render.all_documents', 'render.document',
+                 'pdf.create_documents', 'pdf.merge_documents', 'pdf.merge'):
+        assert name in summary, f"missing span {name}"
+    assert summary['render.document']['count'] == len(html)
+    assert any(name.startswith('pdf.engine.') for name in summary)
+    # The native table span times the ReportLab build itself, once per PDF run
+    assert summary['pdf.native_tables']['count'] == 1
+    native_builds = [s for s in tracer.spans if s['name'] == 'pdf.engine.reportlab-native']
+    assert native_builds and all(s['parent'] == 'pdf.native_tables' for s in native_builds)
+    tracer.clear()
+    print(f"✅ {len(summary)} pipeline span types recorded")
+
+
+def test_concurrent_spans_share_one_memory_peak():
+    """A span in another thread neither resets nor records the process-wide peak"""
+    tracer = Tracer(enabled=True, trace_memory=True)
+
+    def worker():
+        with tracer.span('worker'):
+            block = bytearray(2 * 1024 * 1024)
+            del block
+
+    try:
+        with tracer.span('request'):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+    finally:
+        tracer.disable()
+
+    worker_span, request_span = tracer.spans
+    assert worker_span['depth'] == 0 and 'tracemalloc_peak_bytes' not in worker_span
+    assert request_span['tracemalloc_peak_bytes'] >= 2 * 1024 * 1024
+    print("✅ Concurrent spans share the outermost memory peak")
+
+
+if __name__ == "__main__":
+    test_nested_spans_and_export()
+    test_concurrent_spans_share_one_memory_peak()
+    test_pipeline_stages_are_traced()
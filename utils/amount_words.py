@@ -0,0 +1,99 @@
+"""
+Amounts in words for Bill Generator
+Spells rupee amounts in the Indian numbering system (thousand, lakh, crore) with
+paise. Word tables are built once at import and conversions are memoized, so
+certificates and batch runs converting thousands of amounts spell each distinct
+amount only once; amounts_in_words() converts a whole column at a time.
+"""
+
+from functools import lru_cache
+from typing import Any, List
+
+import numpy as np
+
+from utils.bill_computation import to_numeric_array
+
+_ONES = ('', 'One', 'Two', 'Three', 'Four', 'Five', 'Six', 'Seven', 'Eight', 'Nine',
+         'Ten', 'Eleven', 'Twelve', 'Thirteen', 'Fourteen', 'Fifteen', 'Sixteen', 'Seventeen',
+         'Eighteen', 'Nineteen')
+_TENS = ('', '', 'Twenty', 'Thirty', 'Forty', 'Fifty', 'Sixty', 'Seventy', 'Eighty', 'Ninety')
+
+# Words for 0-99 and 0-999 ('' for zero), looked up instead of rebuilt per call
+BELOW_HUNDRED = tuple(_ONES[n] if n < 20 else f"{_TENS[n // 10]} {_ONES[n % 10]}".strip() for n in range(100))
+BELOW_THOUSAND = tuple(
+    f"{_ONES[n // 100]} Hundred {BELOW_HUNDRED[n % 100]}".strip() if n >= 100 else BELOW_HUNDRED[n]
+    for n in range(1000)
+)
+
+# Indian place values above a thousand: (divisor, name), largest first
+CRORE = 10 ** 7
+_PLACES = ((10 ** 5, 'Lakh'), (10 ** 3, 'Thousand'))
+
+WORDS_CACHE_SIZE = 4096
+
+
+def _integer_words(num: int) -> str:
+    parts = []
+    crores, num = divmod(num, CRORE)
+    if crores:
+        # Beyond 99 crore the crore count is itself spelled in lakh/thousand
+        parts.append(_integer_words(crores) + ' Crore')
+    for divisor, name in _PLACES:
+        count, num = divmod(num, divisor)
+        if count:
+            parts.append(f"{BELOW_HUNDRED[count]} {name}")
+    if num:
+        parts.append(BELOW_THOUSAND[num])
+    return ' '.join(parts)
+
+
+@lru_cache(maxsize=WORDS_CACHE_SIZE)
+def number_to_words(num: int) -> str:
+    """
+    Spell a whole number in Indian numbering, e.g. 12500000 -> "One Crore Twenty Five Lakh".
+
+    Zero is "Zero" and negative numbers are prefixed with "Minus".
+    """
+    num = int(num)
+    if num == 0:
+        return 'Zero'
+    if num < 0:
+        return 'Minus ' + number_to_words(-num)
+    return _integer_words(num)
+
+
+@lru_cache(maxsize=WORDS_CACHE_SIZE)
+def _formatted_amount_words(formatted: str) -> str:
+    negative = formatted.startswith('-')
+    rupees, paise = formatted.lstrip('-').split('.')
+    rupees, paise = int(rupees), int(paise)
+    if rupees and paise:
+        words = f"{number_to_words(rupees)} and {number_to_words(paise)} Paise"
+    elif paise:
+        words = f"{number_to_words(paise)} Paise"
+    else:
+        words = number_to_words(rupees)
+    return f"Minus {words}" if negative and (rupees or paise) else words
+
+
+def amount_in_words(amount: Any) -> str:
+    """
+    Spell a rupee amount with its paise, e.g. 1050.5 -> "One Thousand Fifty and Fifty Paise".
+
+    Paise are taken from the amount rounded to two decimals, as the documents print it.
+    """
+    return _formatted_amount_words('%.2f' % float(amount))
+
+
+def amounts_in_words(amounts: Any) -> List[str]:
+    """
+    Spell a column of rupee amounts (list, array or Series); blanks and non-numeric values count as 0.
+
+    Amounts are formatted as one array operation and each distinct amount is spelled once.
+    """
+    values = to_numeric_array(amounts)
+    if values.size == 0:
+        return []
+    distinct, positions = np.unique(np.char.mod('%.2f', values), return_inverse=True)
+    words = [_formatted_amount_words(formatted) for formatted in distinct.tolist()]
+    return [words[position] for position in positions.tolist()]
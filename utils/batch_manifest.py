@@ -0,0 +1,87 @@
+"""
+Batch job manifest for Bill Generator
+Append-only JSONL record of every processed file (input digest, status, timings,
+output paths), written as each file finishes so interrupted batches can resume
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Template versions live with the template registry; re-exported for batch callers
+from utils.template_registry import DEFAULT_TEMPLATE_DIRS, compute_template_version  # noqa: F401
+
+MANIFEST_FILE_NAME = "batch_manifest.jsonl"
+
+class BatchManifest:
+    """Durable per-file batch status stored as JSON lines"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Read existing entries; the last entry per input file wins"""
+        entries = {}
+        if not self.path.exists():
+            return entries
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A run killed mid-write leaves a truncated last line
+                    continue
+                if 'file_name' in entry:
+                    entries[entry['file_name']] = entry
+        return entries
+
+    def record(self, file_stats: Dict[str, Any], input_digest: Optional[str],
+               template_version: str) -> Dict[str, Any]:
+        """Append the result of one file and flush it to disk immediately"""
+        entry = {
+            'file_name': file_stats['file_name'],
+            'input_digest': input_digest,
+            'template_version': template_version,
+            'status': 'success' if file_stats.get('success') else 'failed',
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'processing_time': round(file_stats.get('processing_time', 0), 3),
+            'output_size': file_stats.get('output_size', 0),
+            'output_files': file_stats.get('generated_files', []),
+            'error': file_stats.get('error'),
+        }
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.entries[entry['file_name']] = entry
+        return entry
+
+    def is_up_to_date(self, file_name: str, input_digest: Optional[str], template_version: str) -> bool:
+        """True if the file already succeeded with the same input and templates and its outputs still exist"""
+        entry = self.entries.get(file_name)
+        if not entry or input_digest is None:
+            return False
+        return (
+            entry.get('status') == 'success'
+            and entry.get('input_digest') == input_digest
+            and entry.get('template_version') == template_version
+            and all(Path(output).exists() for output in entry.get('output_files', []))
+        )
+
+    def summary(self) -> Dict[str, int]:
+        """Count entries by status"""
+        counts: Dict[str, int] = {}
+        for entry in self.entries.values():
+            counts[entry['status']] = counts.get(entry['status'], 0) + 1
+        return counts
@@ -0,0 +1,228 @@
+"""
+Vectorized bill computation for Bill Generator
+Coerces quantity, rate and amount columns once and computes line amounts,
+premium, deductions and totals as NumPy array operations.
+Shared by every document generator and template renderer.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.item_store import ItemStore
+
+# Column name fallbacks, tried in order (matches the row.get(...) chains of the generators)
+ITEM_NO_COLUMNS = ('Item No.', 'Item')
+SERIAL_NO_COLUMNS = ('Item No.', 'Item', 'S. No.')
+QUANTITY_SINCE_COLUMNS = ('Quantity Since', 'Quantity')
+
+# Statutory deductions applied on the grand total
+DEDUCTION_RATES = {
+    'sd_amount': 0.10,   # Security Deposit 10%
+    'it_amount': 0.02,   # Income Tax 2%
+    'gst_amount': 0.02,  # GST 2%
+    'lc_amount': 0.01,   # Labour Cess 1%
+}
+
+
+def _is_frame(df: Any) -> bool:
+    return isinstance(df, pd.DataFrame)
+
+
+def find_column(df: pd.DataFrame, names: Iterable[str]) -> Optional[str]:
+    """Return the first of ``names`` present in the DataFrame"""
+    if not _is_frame(df):
+        return None
+    for name in names:
+        if name in df.columns:
+            return name
+    return None
+
+
+def to_numeric_array(values: Any) -> np.ndarray:
+    """
+    Vectorized equivalent of ``_safe_float``: blanks, NaN and non-numeric text become 0.0
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == bool:
+        series = series.astype(object)
+    numeric = pd.to_numeric(series, errors='coerce')
+    return numeric.to_numpy(dtype='float64', na_value=0.0)
+
+
+def numeric_column(df: pd.DataFrame, names: Iterable[str], default: Any = 0.0) -> np.ndarray:
+    """Coerce the first existing column of ``names`` to float, or broadcast ``default``"""
+    length = len(df) if _is_frame(df) else 0
+    column = find_column(df, names)
+    if column is not None:
+        return to_numeric_array(df[column])
+    if isinstance(default, np.ndarray):
+        return default
+    return np.full(length, float(default), dtype='float64')
+
+
+def raw_column(df: pd.DataFrame, names: Iterable[str], default: Any = '') -> List[Any]:
+    """Return the raw cell values of the first existing column of ``names``"""
+    length = len(df) if _is_frame(df) else 0
+    column = find_column(df, names)
+    if column is not None:
+        return df[column].tolist()
+    return [default] * length
+
+
+def serial_numbers(df: pd.DataFrame, names: Iterable[str] = SERIAL_NO_COLUMNS) -> List[str]:
+    """Vectorized ``_safe_serial_no``: NaN/None become '', everything else is stripped text"""
+    column = find_column(df, names)
+    if column is None:
+        return [''] * (len(df) if _is_frame(df) else 0)
+    values = df[column].astype(object)
+    missing = values.isna().to_numpy()
+    text = values.astype(str)
+    blank = missing | (text.str.lower() == 'nan').to_numpy()
+    return np.where(blank, '', text.str.strip()).tolist()
+
+
+def format_amounts(values: np.ndarray) -> List[str]:
+    """Format positive values with two decimals and leave zero/negative cells blank"""
+    values = np.asarray(values, dtype='float64')
+    if values.size == 0:
+        return []
+    return np.where(values > 0, np.char.mod('%.2f', values), '').tolist()
+
+
+def compute_work_order_lines(work_order_data: pd.DataFrame, zero_rate_masking: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Compute work order line arrays.
+
+    Args:
+        work_order_data: Work Order DataFrame
+        zero_rate_masking: Apply VBA behaviour - zero-rate rows show no quantity or amount
+
+    Returns:
+        Dict of arrays: quantity_since, quantity_upto, rate, amount, zero_rate
+        plus the masked display arrays quantity_since_display and amount_upto_display
+    """
+    quantity_since = numeric_column(work_order_data, QUANTITY_SINCE_COLUMNS)
+    quantity_upto = numeric_column(work_order_data, ('Quantity Upto',), default=quantity_since)
+    rate = numeric_column(work_order_data, ('Rate',))
+    amount = quantity_since * rate
+    zero_rate = rate == 0
+
+    lines = {
+        'quantity_since': quantity_since,
+        'quantity_upto': quantity_upto,
+        'rate': rate,
+        'amount': amount,
+        'zero_rate': zero_rate,
+    }
+    if zero_rate_masking:
+        lines['quantity_since_display'] = np.where(zero_rate, 0.0, quantity_since)
+        lines['amount_upto_display'] = np.where(zero_rate, 0.0, amount)
+    else:
+        lines['quantity_since_display'] = quantity_since
+        lines['amount_upto_display'] = amount
+    return lines
+
+
+def compute_extra_item_lines(extra_items_data: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Compute extra item line arrays: quantity, rate, amount, zero_rate"""
+    if not _is_frame(extra_items_data) or extra_items_data.empty:
+        empty = np.zeros(0, dtype='float64')
+        return {'quantity': empty, 'rate': empty, 'amount': empty, 'zero_rate': empty.astype(bool)}
+    quantity = numeric_column(extra_items_data, ('Quantity',))
+    rate = numeric_column(extra_items_data, ('Rate',))
+    return {
+        'quantity': quantity,
+        'rate': rate,
+        'amount': quantity * rate,
+        'zero_rate': rate == 0,
+    }
+
+
+def compute_bill_totals(work_order_total: float, extra_total: float, premium_fraction: float) -> Dict[str, float]:
+    """
+    Compute premium, grand totals, statutory deductions and net payable.
+
+    Args:
+        work_order_total: Sum of work order line amounts
+        extra_total: Sum of extra item line amounts
+        premium_fraction: Tender premium as a fraction (0.05 for 5%)
+    """
+    premium_amount = work_order_total * premium_fraction
+    grand_total = work_order_total + premium_amount
+    extra_premium = extra_total * premium_fraction
+    extra_grand_total = extra_total + extra_premium
+
+    deductions = {name: grand_total * rate for name, rate in DEDUCTION_RATES.items()}
+    total_deductions = sum(deductions.values())
+
+    totals = {
+        'work_order_amount': work_order_total,
+        'premium_amount': premium_amount,
+        'grand_total': grand_total,
+        'extra_total': extra_total,
+        'extra_premium': extra_premium,
+        'extra_grand_total': extra_grand_total,
+        'total_deductions': total_deductions,
+        'net_payable': grand_total - total_deductions,
+    }
+    totals.update(deductions)
+    return totals
+
+
+def template_totals(bill_totals: Dict[str, float], premium_fraction: float) -> Dict[str, Any]:
+    """Build the ``totals`` structure expected by the note sheet and certificate templates"""
+    return {
+        'grand_total': bill_totals['grand_total'],
+        'work_order_amount': bill_totals['work_order_amount'],
+        'tender_premium_percent': premium_fraction,
+        'tender_premium_amount': bill_totals['premium_amount'],
+        'final_total': bill_totals['grand_total'],
+        'extra_items_sum': bill_totals['extra_grand_total'],
+        'sd_amount': bill_totals['sd_amount'],
+        'it_amount': bill_totals['it_amount'],
+        'gst_amount': bill_totals['gst_amount'],
+        'lc_amount': bill_totals['lc_amount'],
+        'total_deductions': bill_totals['total_deductions'],
+        'net_payable': bill_totals['net_payable'],
+        'excess_amount': 0,  # Will be calculated from deviation data
+        'excess_premium': 0,
+        'excess_total': 0,
+        'saving_amount': 0,
+        'saving_premium': 0,
+        'saving_total': 0,
+        'net_difference': 0
+    }
+
+
+def build_work_item_rows(work_order_data: pd.DataFrame, lines: Dict[str, np.ndarray],
+                         item_numbers: List[Any], amount_since: Optional[np.ndarray] = None) -> ItemStore:
+    """Assemble the work item rows consumed by the Jinja templates from precomputed arrays"""
+    if amount_since is None:
+        amount_since = np.zeros(len(item_numbers), dtype='float64')
+    return ItemStore({
+        'unit': raw_column(work_order_data, ('Unit',)),
+        'quantity_since': lines['quantity_since_display'],
+        'quantity_upto': lines['quantity_upto'],
+        'item_no': item_numbers,
+        'description': raw_column(work_order_data, ('Description',)),
+        'rate': lines['rate'],
+        'amount_upto': lines['amount_upto_display'],
+        'amount_since': np.asarray(amount_since, dtype='float64'),
+        'remark': raw_column(work_order_data, ('Remark',)),
+    })
+
+
+def build_extra_item_rows(extra_items_data: pd.DataFrame, lines: Dict[str, np.ndarray],
+                          item_numbers: List[Any]) -> ItemStore:
+    """Assemble the extra item rows consumed by the Jinja templates"""
+    return ItemStore({
+        'unit': raw_column(extra_items_data, ('Unit',)),
+        'quantity': lines['quantity'],
+        'item_no': item_numbers,
+        'description': raw_column(extra_items_data, ('Description',)),
+        'rate': lines['rate'],
+        'amount': lines['amount'],
+        'remark': raw_column(extra_items_data, ('Remark',)),
+    })
@@ -0,0 +1,88 @@
+"""
+Canonical bill model for Bill Generator
+Computes a bill's line amounts, tender premium, deductions, totals and amount in
+words once from the title data, work order and extra items. Every document
+renderer reads its figures from the same model instead of recomputing (and
+disagreeing on) them.
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.amount_words import amount_in_words
+from utils.bill_computation import (
+    compute_bill_totals, compute_extra_item_lines, compute_work_order_lines, template_totals
+)
+
+# Title keys that may carry the tender premium, tried in order
+PREMIUM_KEYS = ('TENDER PREMIUM %', 'Tender Premium Percentage', 'Tender Premium', 'tender_premium_percent')
+
+
+def premium_percent(title_data: Optional[Dict[str, Any]]) -> float:
+    """
+    Tender premium in percent from the title data.
+
+    Accepts values like 10, 10.0, "10" or "10%". Defaults to 0 when missing or invalid.
+    """
+    if not isinstance(title_data, dict):
+        return 0.0
+    for key in PREMIUM_KEYS:
+        raw = title_data.get(key)
+        if raw is None or raw == '':
+            continue
+        try:
+            if isinstance(raw, str):
+                return float(raw.strip().rstrip('%').strip())
+            return float(raw)
+        except (TypeError, ValueError):
+            return 0.0
+    return 0.0
+
+
+class BillModel:
+    """
+    Line arrays, premium, deductions and totals of one bill.
+
+    Work order amounts use Quantity Since (falling back to Quantity), as on the
+    first page; the certificates, note sheet and deviation statement share them.
+    """
+
+    def __init__(self, title_data: Optional[Dict[str, Any]], work_order_data: pd.DataFrame,
+                 extra_items_data: Optional[pd.DataFrame] = None):
+        self.title_data = title_data or {}
+        self.premium_percent = premium_percent(self.title_data)
+        self.premium_fraction = self.premium_percent / 100
+        self.work_lines = compute_work_order_lines(work_order_data, zero_rate_masking=True)
+        self.extra_lines = compute_extra_item_lines(extra_items_data)
+        self.work_order_total = float(self.work_lines['amount'].sum())
+        self.extra_total = float(self.extra_lines['amount'].sum())
+        self.totals = compute_bill_totals(self.work_order_total, self.extra_total, self.premium_fraction)
+
+    def work_order_lines(self, zero_rate_masking: bool = False) -> Dict[str, np.ndarray]:
+        """Work order line arrays; without masking, zero-rate rows display their quantity and amount"""
+        if zero_rate_masking:
+            return self.work_lines
+        lines = dict(self.work_lines)
+        lines['quantity_since_display'] = lines['quantity_since']
+        lines['amount_upto_display'] = lines['amount']
+        return lines
+
+    def template_totals(self) -> Dict[str, Any]:
+        """The ``totals`` structure expected by the note sheet and certificate templates"""
+        return template_totals(self.totals, self.premium_fraction)
+
+    @property
+    def payable_amount(self) -> float:
+        """Work order amount plus tender premium, before deductions"""
+        return self.totals['grand_total']
+
+    @property
+    def net_payable(self) -> float:
+        return self.totals['net_payable']
+
+    @property
+    def payable_words(self) -> str:
+        """Net payable in words, with paise"""
+        return amount_in_words(self.net_payable)
@@ -0,0 +1,231 @@
+"""
+Persistent headless browser pool for Bill Generator
+Keeps one Chromium instance alive per process with a bounded set of reusable pages,
+so PDF rendering no longer pays a browser cold start per document
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PAGES = int(os.environ.get('BILLGEN_BROWSER_PAGES', '4'))
+DEFAULT_VIEWPORT = {"width": 1200, "height": 1600}
+DEFAULT_PDF_OPTIONS = {
+    'format': 'A4',
+    'print_background': True,
+    'margin': {'top': '1cm', 'right': '1cm', 'bottom': '1cm', 'left': '1cm'}
+}
+RENDER_TIMEOUT = 120  # seconds, per document
+
+
+class BrowserPool:
+    """
+    Long-lived Chromium browser with a bounded pool of reusable pages.
+
+    The browser runs on a private event loop in a background thread, so the pool
+    can be used from synchronous code (Streamlit, batch workers) and from other
+    event loops alike. Crashed pages are discarded and a disconnected browser is
+    relaunched on the next render.
+    """
+
+    def __init__(self, max_pages: int = DEFAULT_MAX_PAGES, viewport: Optional[Dict[str, int]] = None):
+        self.max_pages = max(1, max_pages)
+        self.viewport = viewport or DEFAULT_VIEWPORT
+        self.stats = {
+            'browser_launches': 0,
+            'browser_restarts': 0,
+            'pages_created': 0,
+            'renders': 0,
+            'failed_renders': 0
+        }
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+        self._thread.start()
+
+        self._playwright = None
+        self._browser = None
+        self._idle_pages: list = []
+        self._page_count = 0
+        # Created on the pool loop
+        self._page_slots: Optional[asyncio.Semaphore] = None
+        self._launch_lock: Optional[asyncio.Lock] = None
+        self._closed = False
+        self._pid = os.getpid()
+
+    # ---- Browser lifecycle (pool loop only) ----
+
+    async def _ensure_browser(self):
+        """Launch the browser, or relaunch it if it has crashed or disconnected"""
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+            self._page_slots = asyncio.Semaphore(self.max_pages)
+
+        async with self._launch_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+
+            if self._browser is not None:
+                logger.warning("Headless browser disconnected; restarting")
+                self.stats['browser_restarts'] += 1
+                self._idle_pages.clear()
+                self._page_count = 0
+
+            if self._playwright is None:
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+
+            self._browser = await self._playwright.chromium.launch()
+            self.stats['browser_launches'] += 1
+            return self._browser
+
+    async def _acquire_page(self):
+        """Take an idle page or open a new one (callers hold a page slot)"""
+        browser = await self._ensure_browser()
+        while self._idle_pages:
+            page = self._idle_pages.pop()
+            if not page.is_closed():
+                return page
+            self._page_count -= 1
+
+        page = await browser.new_page()
+        await page.set_viewport_size(self.viewport)
+        self._page_count += 1
+        self.stats['pages_created'] += 1
+        return page
+
+    async def _release_page(self, page, healthy: bool):
+        """Return a page to the pool, or discard it after an error"""
+        if healthy and not page.is_closed() and self._browser is not None and self._browser.is_connected():
+            self._idle_pages.append(page)
+            return
+        self._page_count -= 1
+        try:
+            if not page.is_closed():
+                await page.close()
+        except Exception:
+            pass
+
+    async def _render(self, html_content: str, pdf_options: Dict[str, Any], content_timeout: int) -> bytes:
+        await self._ensure_browser()
+        async with self._page_slots:
+            page = await self._acquire_page()
+            healthy = False
+            try:
+                await page.set_content(html_content, timeout=content_timeout)
+                pdf_bytes = await page.pdf(**pdf_options)
+                healthy = True
+                self.stats['renders'] += 1
+                return pdf_bytes
+            except Exception:
+                self.stats['failed_renders'] += 1
+                raise
+            finally:
+                await self._release_page(page, healthy)
+
+    async def _shutdown(self):
+        for page in self._idle_pages:
+            try:
+                await page.close()
+            except Exception:
+                pass
+        self._idle_pages.clear()
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+    # ---- Public API (any thread) ----
+
+    def submit(self, html_content: str, pdf_options: Optional[Dict[str, Any]] = None,
+               content_timeout: int = 60000) -> concurrent.futures.Future:
+        """Schedule a render on the pool and return a future resolving to PDF bytes"""
+        if self._closed:
+            raise RuntimeError("Browser pool has been shut down")
+        options = dict(DEFAULT_PDF_OPTIONS if pdf_options is None else pdf_options)
+        return asyncio.run_coroutine_threadsafe(
+            self._render(html_content, options, content_timeout), self._loop
+        )
+
+    def render_pdf(self, html_content: str, pdf_options: Optional[Dict[str, Any]] = None,
+                   content_timeout: int = 60000, timeout: float = RENDER_TIMEOUT) -> bytes:
+        """Render one HTML document to PDF bytes, blocking until done"""
+        return self.submit(html_content, pdf_options, content_timeout).result(timeout)
+
+    async def render_pdf_async(self, html_content: str, pdf_options: Optional[Dict[str, Any]] = None,
+                               content_timeout: int = 60000) -> bytes:
+        """Await a render from any event loop"""
+        return await asyncio.wrap_future(self.submit(html_content, pdf_options, content_timeout))
+
+    def render_documents(self, documents: Dict[str, str], pdf_options: Optional[Dict[str, Any]] = None,
+                         timeout: float = RENDER_TIMEOUT) -> Dict[str, Optional[bytes]]:
+        """
+        Render all documents of a bill concurrently (bounded by max_pages).
+
+        Returns:
+            Dict of document name to PDF bytes, or None for documents that failed
+        """
+        futures = {name: self.submit(html, pdf_options) for name, html in documents.items()}
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result(timeout)
+            except Exception as e:
+                logger.error(f"Browser pool render failed for {name}: {str(e)}")
+                results[name] = None
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return launch/render counters and current page usage"""
+        return dict(self.stats, open_pages=self._page_count, idle_pages=len(self._idle_pages),
+                    max_pages=self.max_pages)
+
+    def shutdown(self, timeout: float = 10):
+        """Close the browser and stop the pool loop"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout)
+        except Exception as e:
+            logger.warning(f"Browser pool shutdown error: {str(e)}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Return the process-wide browser pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        # A pool inherited through fork has no running loop thread in the child
+        if _pool is None or _pool._closed or _pool._pid != os.getpid():
+            _pool = BrowserPool()
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def shutdown_browser_pool():
+    """Shut down the process-wide browser pool if it was started"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
@@ -0,0 +1,141 @@
+"""
+Deviation engine for Bill Generator
+Aligns Work Order and Bill Quantity rows on normalized item numbers with a single
+hash lookup and computes excess/saving quantities and amounts as array operations.
+The resulting frame is shared by the HTML and PDF renderers of the Deviation Statement.
+"""
+
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+from utils.bill_computation import (
+    ITEM_NO_COLUMNS, QUANTITY_SINCE_COLUMNS, SERIAL_NO_COLUMNS,
+    find_column, format_amounts, numeric_column, raw_column, serial_numbers
+)
+
+# Columns of the deviation frame, in Deviation Statement order
+DEVIATION_COLUMNS = [
+    'item_no', 'description', 'unit', 'qty_wo', 'rate', 'amt_wo', 'qty_bill', 'amt_bill',
+    'excess_qty', 'excess_amt', 'saving_qty', 'saving_amt', 'remark'
+]
+NUMERIC_DEVIATION_COLUMNS = DEVIATION_COLUMNS[3:12]
+
+_MISSING_KEYS = ('', 'nan', 'none', '<na>')
+
+
+def normalize_item_numbers(values: pd.Series) -> pd.Series:
+    """
+    Normalize item numbers into join keys.
+
+    Text is stripped and integral numbers lose their decimal part, so 1, 1.0 and ' 1 '
+    all align. Hierarchical numbers such as '1.10' are kept verbatim. Blank cells map
+    to None and never match.
+    """
+    values = values.astype(object)
+    keys = values.astype(str).str.strip()
+
+    numbers = pd.to_numeric(values, errors='coerce').astype('float64')
+    is_integral = numbers.notna() & np.isfinite(numbers) & (numbers == np.floor(numbers))
+    is_numeric_cell = values.map(lambda v: isinstance(v, (int, float, np.number)) and not isinstance(v, bool))
+    integral_cells = is_integral & is_numeric_cell
+    keys[integral_cells] = numbers[integral_cells].astype('int64').astype(str)
+
+    missing = values.isna() | keys.str.lower().isin(_MISSING_KEYS)
+    return keys.where(~missing, None)
+
+
+def _item_keys(df: pd.DataFrame, names: Iterable[str]) -> pd.Series:
+    column = find_column(df, names)
+    if column is None:
+        return pd.Series([None] * len(df), index=df.index, dtype=object)
+    return normalize_item_numbers(df[column])
+
+
+def compute_deviation_frame(work_order_data: pd.DataFrame, bill_quantity_data: pd.DataFrame,
+                            work_order_keys: Iterable[str] = SERIAL_NO_COLUMNS,
+                            bill_quantity_keys: Iterable[str] = SERIAL_NO_COLUMNS) -> pd.DataFrame:
+    """
+    Build the deviation frame for a bill.
+
+    Each work order row is matched to the first Bill Quantity row with the same
+    normalized item number; unmatched rows have an executed quantity of 0.
+
+    Args:
+        work_order_data: Work Order DataFrame
+        bill_quantity_data: Bill Quantity DataFrame
+        work_order_keys: Work Order item number columns, tried in order
+        bill_quantity_keys: Bill Quantity item number columns, tried in order
+
+    Returns:
+        DataFrame with DEVIATION_COLUMNS plus a boolean 'matched' column
+    """
+    if not isinstance(work_order_data, pd.DataFrame) or work_order_data.empty:
+        return pd.DataFrame(columns=DEVIATION_COLUMNS + ['matched'])
+
+    qty_wo = numeric_column(work_order_data, QUANTITY_SINCE_COLUMNS)
+    rate = numeric_column(work_order_data, ('Rate',))
+
+    qty_bill = np.zeros(len(work_order_data), dtype='float64')
+    matched = np.zeros(len(work_order_data), dtype=bool)
+    if isinstance(bill_quantity_data, pd.DataFrame) and not bill_quantity_data.empty:
+        bq_keys = _item_keys(bill_quantity_data, bill_quantity_keys)
+        bq_qty = pd.Series(numeric_column(bill_quantity_data, ('Quantity',)), index=bq_keys.to_numpy())
+        # First occurrence wins, as with the previous row-by-row filter
+        bq_qty = bq_qty[bq_keys.notna().to_numpy() & ~bq_keys.duplicated().to_numpy()]
+
+        wo_keys = _item_keys(work_order_data, work_order_keys)
+        lookup = wo_keys.map(bq_qty)
+        matched = lookup.notna().to_numpy()
+        qty_bill = lookup.fillna(0.0).to_numpy(dtype='float64')
+
+    excess_qty = np.maximum(0.0, qty_bill - qty_wo)
+    saving_qty = np.maximum(0.0, qty_wo - qty_bill)
+
+    return pd.DataFrame({
+        'item_no': serial_numbers(work_order_data, ITEM_NO_COLUMNS),
+        'description': raw_column(work_order_data, ('Description',)),
+        'unit': raw_column(work_order_data, ('Unit',)),
+        'qty_wo': qty_wo,
+        'rate': rate,
+        'amt_wo': qty_wo * rate,
+        'qty_bill': qty_bill,
+        'amt_bill': qty_bill * rate,
+        'excess_qty': excess_qty,
+        'excess_amt': excess_qty * rate,
+        'saving_qty': saving_qty,
+        'saving_amt': saving_qty * rate,
+        'remark': raw_column(work_order_data, ('Remark',)),
+        'matched': matched,
+    })
+
+
+def deviation_totals(frame: pd.DataFrame) -> Dict[str, float]:
+    """Column totals of the amount columns of a deviation frame"""
+    return {
+        column: float(frame[column].sum()) if not frame.empty else 0.0
+        for column in ('amt_wo', 'amt_bill', 'excess_amt', 'saving_amt')
+    }
+
+
+def format_deviation_rows(frame: pd.DataFrame, show_zero: bool = False) -> List[Dict[str, Any]]:
+    """
+    Format the numeric columns of a deviation frame for display.
+
+    Args:
+        frame: Frame returned by compute_deviation_frame
+        show_zero: Show zero and negative values as '0.00' instead of leaving the cell blank
+    """
+    if frame.empty:
+        return []
+    formatted = {}
+    for column in NUMERIC_DEVIATION_COLUMNS:
+        values = frame[column].to_numpy(dtype='float64')
+        if show_zero:
+            formatted[column] = np.where(values >= 0, np.char.mod('%.2f', values), '0.00').tolist()
+        else:
+            formatted[column] = format_amounts(values)
+    for column in ('item_no', 'description', 'unit', 'remark'):
+        formatted[column] = frame[column].tolist()
+    return [dict(zip(DEVIATION_COLUMNS, row)) for row in zip(*(formatted[c] for c in DEVIATION_COLUMNS))]
@@ -3,10 +3,15 @@ import gc
 from datetime import datetime
 from typing import Dict, Any
 import io
-from functools import lru_cache
 import pandas as pd
-from jinja2 import Environment, FileSystemLoader
 import os
+from utils.bill_computation import (
+    ITEM_NO_COLUMNS, build_extra_item_rows, build_work_item_rows, serial_numbers
+)
+from utils.bill_model import BillModel
+from utils.deviation_engine import compute_deviation_frame, format_deviation_rows
+from utils.template_registry import get_template_environment
+from utils.tracing import traced
 
 class DocumentGenerator:
     """Generates various billing documents from processed Excel data using Jinja2 templates"""
@@ -20,55 +25,16 @@ class DocumentGenerator:
         
         # Set up Jinja2 environment for templates
         template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates')
-        self.jinja_env = Environment(loader=FileSystemLoader(template_dir))
+        self.jinja_env = get_template_environment(template_dir)
+        
+        # Bill figures are computed once and shared by every document
+        self._bill_model = None
         
         # Prepare data for templates
         self.template_data = self._prepare_template_data()
-    
-    def _number_to_words(self, num):
-        """Convert number to words (simplified version)"""
-        if num == 0:
-            return "Zero"
-        
-        ones = ['', 'One', 'Two', 'Three', 'Four', 'Five', 'Six', 'Seven', 'Eight', 'Nine']
-        teens = ['Ten', 'Eleven', 'Twelve', 'Thirteen', 'Fourteen', 'Fifteen', 'Sixteen', 'Seventeen', 'Eighteen', 'Nineteen']
-        tens = ['', '', 'Twenty', 'Thirty', 'Forty', 'Fifty', 'Sixty', 'Seventy', 'Eighty', 'Ninety']
         
-        def convert_hundreds(n):
-            result = ''
-            if n >= 100:
-                result += ones[n // 100] + ' Hundred '
-                n %= 100
-            if n >= 20:
-                result += tens[n // 10] + ' '
-                n %= 10
-            elif n >= 10:
-                result += teens[n - 10] + ' '
-                n = 0
-            if n > 0:
-                result += ones[n] + ' '
-            return result.strip()
-        
-        if num < 1000:
-            return convert_hundreds(num)
-        elif num < 100000:
-            thousands = num // 1000
-            remainder = num % 1000
-            result = convert_hundreds(thousands) + ' Thousand '
-            if remainder > 0:
-                result += convert_hundreds(remainder)
-            return result.strip()
-        else:
-            lakhs = num // 100000
-            remainder = num % 100000
-            result = convert_hundreds(lakhs) + ' Lakh '
-            if remainder > 0:
-                if remainder >= 1000:
-                    result += convert_hundreds(remainder // 1000) + ' Thousand '
-                    remainder %= 1000
-                if remainder > 0:
-                    result += convert_hundreds(remainder)
-            return result.strip()
+        # Deviation frame is computed on first use and shared by the HTML and PDF paths
+        self._deviation_frame = None
     
     def _safe_float(self, value):
         """Safely convert value to float, return 0 if conversion fails"""
@@ -114,90 +80,54 @@ class DocumentGenerator:
         else:
             return False
     
+    def get_bill_model(self) -> BillModel:
+        """Return the bill's line amounts, premium, deductions and totals, computed once per generator"""
+        if self._bill_model is None:
+            self._bill_model = BillModel(self.title_data, self.work_order_data, self.extra_items_data)
+        return self._bill_model
+    
+    def get_deviation_frame(self) -> pd.DataFrame:
+        """Return the work order vs bill quantity deviation frame, computed once per generator"""
+        if self._deviation_frame is None:
+            self._deviation_frame = compute_deviation_frame(
+                self.work_order_data, self.bill_quantity_data,
+                work_order_keys=ITEM_NO_COLUMNS, bill_quantity_keys=ITEM_NO_COLUMNS
+            )
+        return self._deviation_frame
+    
+    @traced('template_data.prepare')
     def _prepare_template_data(self) -> Dict[str, Any]:
         """Prepare data structure for Jinja2 templates"""
-        # Calculate totals and prepare structured data
-        work_items = []
-        total_amount = 0
-        
-        # Process work order data
-        for index, row in self.work_order_data.iterrows():
-            quantity_since = self._safe_float(row.get('Quantity Since', row.get('Quantity', 0)))
-            rate = self._safe_float(row.get('Rate', 0))
-            amount = quantity_since * rate
-            total_amount += amount
-            
-            work_items.append({
-                'unit': row.get('Unit', ''),
-                'quantity_since': quantity_since,
-                'quantity_upto': self._safe_float(row.get('Quantity Upto', quantity_since)),
-                'item_no': self._safe_serial_no(row.get('Item No.', row.get('Item', ''))),
-                'description': row.get('Description', ''),
-                'rate': rate,
-                'amount_upto': amount,
-                'amount_since': amount,
-                'remark': row.get('Remark', '')
-            })
+        # Line arrays are coerced once, in the bill model
+        model = self.get_bill_model()
+        lines = model.work_order_lines()
+        total_amount = model.work_order_total
+        work_items = build_work_item_rows(
+            self.work_order_data, lines, serial_numbers(self.work_order_data, ITEM_NO_COLUMNS),
+            amount_since=lines['amount']
+        )
         
         # Process extra items
         extra_items = []
         extra_total = 0
         
         if isinstance(self.extra_items_data, pd.DataFrame) and not self.extra_items_data.empty:
-            for index, row in self.extra_items_data.iterrows():
-                quantity = self._safe_float(row.get('Quantity', 0))
-                rate = self._safe_float(row.get('Rate', 0))
-                amount = quantity * rate
-                extra_total += amount
-                
-                extra_items.append({
-                    'unit': row.get('Unit', ''),
-                    'quantity': quantity,
-                    'item_no': self._safe_serial_no(row.get('Item No.', row.get('Item', ''))),
-                    'description': row.get('Description', ''),
-                    'rate': rate,
-                    'amount': amount,
-                    'remark': row.get('Remark', '')
-                })
-        
-        # Calculate premiums
-        tender_premium_percent = self._safe_float(self.title_data.get('TENDER PREMIUM %', 0))
-        premium_amount = total_amount * (tender_premium_percent / 100)
-        grand_total = total_amount + premium_amount
+            extra_total = model.extra_total
+            extra_items = build_extra_item_rows(
+                self.extra_items_data, model.extra_lines, serial_numbers(self.extra_items_data, ITEM_NO_COLUMNS)
+            )
         
-        extra_premium = extra_total * (tender_premium_percent / 100)
-        extra_grand_total = extra_total + extra_premium
+        # Premiums, deductions and final amounts come from the bill model
+        tender_premium_percent = model.premium_percent
+        bill_totals = model.totals
         
-        # Calculate deductions and final amounts
-        sd_amount = grand_total * 0.10  # Security Deposit 10%
-        it_amount = grand_total * 0.02  # Income Tax 2%
-        gst_amount = grand_total * 0.02  # GST 2%
-        lc_amount = grand_total * 0.01  # Labour Cess 1%
-        total_deductions = sd_amount + it_amount + gst_amount + lc_amount
-        net_payable = grand_total - total_deductions
+        premium_amount = bill_totals['premium_amount']
+        grand_total = bill_totals['grand_total']
+        extra_premium = bill_totals['extra_premium']
+        extra_grand_total = bill_totals['extra_grand_total']
         
         # Calculate totals data structure
-        totals = {
-            'grand_total': grand_total,
-            'work_order_amount': total_amount,
-            'tender_premium_percent': tender_premium_percent / 100,
-            'tender_premium_amount': premium_amount,
-            'final_total': grand_total,
-            'extra_items_sum': extra_grand_total,
-            'sd_amount': sd_amount,
-            'it_amount': it_amount,
-            'gst_amount': gst_amount,
-            'lc_amount': lc_amount,
-            'total_deductions': total_deductions,
-            'net_payable': net_payable,
-            'excess_amount': 0,  # Will be calculated from deviation data
-            'excess_premium': 0,
-            'excess_total': 0,
-            'saving_amount': 0,
-            'saving_premium': 0,
-            'saving_total': 0,
-            'net_difference': 0
-        }
+        totals = model.template_totals()
         
         return {
             'title_data': self.title_data,
@@ -213,7 +143,7 @@ class DocumentGenerator:
             'extra_premium': extra_premium,
             'extra_grand_total': extra_grand_total,
             'final_total': grand_total + extra_grand_total,
-            'payable_words': self._number_to_words(int(net_payable)),
+            'payable_words': model.payable_words,
             'notes': ['Work completed as per schedule', 'All measurements verified', 'Quality as per specifications']
         }
     
@@ -419,7 +349,7 @@ class DocumentGenerator:
         """Generate First Page Summary document"""
         current_date = datetime.now().strftime('%d/%m/%Y')
         
-        html_content = f"""
+        html_parts = [f"""
         <!DOCTYPE html>
         <html>
         <head>
@@ -508,7 +438,7 @@ class DocumentGenerator:
                     </tr>
                 </thead>
                 <tbody>
-        """
+        """]
         
         # Add work order items
         for index, row in self.work_order_data.iterrows():
@@ -526,7 +456,7 @@ class DocumentGenerator:
             amt_upto_display = f"{amount_upto:.2f}" if amount_upto > 0 else ""
             amt_since_display = f"{amount_since:.2f}" if amount_since > 0 else ""
             
-            html_content += f"""
+            html_parts.append(f"""
                     <tr>
                         <td>{row.get('Unit', '')}</td>
                         <td class="amount">{qty_since_display}</td>
@@ -538,7 +468,7 @@ class DocumentGenerator:
                         <td class="amount">{amt_since_display}</td>
                         <td>{row.get('Remark', '')}</td>
                     </tr>
-            """
+            """)
         
         # Calculate totals
         total_amount = 0
@@ -547,7 +477,7 @@ class DocumentGenerator:
             rate = self._safe_float(row.get('Rate', 0))
             total_amount += quantity_since * rate
         
-        html_content += f"""
+        html_parts.append(f"""
                     <tr style="font-weight: bold;">
                         <td colspan="6">TOTAL</td>
                         <td class="amount">{total_amount:.2f}</td>
@@ -559,15 +489,15 @@ class DocumentGenerator:
             </div>
         </body>
         </html>
-        """
+        """)
         
-        return html_content
+        return ''.join(html_parts)
     
     def _generate_deviation_statement(self) -> str:
         """Generate Deviation Statement document"""
         current_date = datetime.now().strftime('%d/%m/%Y')
         
-        html_content = f"""
+        html_parts = [f"""
         <!DOCTYPE html>
         <html>
         <head>
@@ -656,77 +586,44 @@ class DocumentGenerator:
                     </tr>
                 </thead>
                 <tbody>
-        """
+        """]
         
-        # Compare work order with bill quantity data
-        for index, wo_row in self.work_order_data.iterrows():
-            # Find corresponding bill quantity row
-            bq_row = None
-            if isinstance(self.bill_quantity_data, pd.DataFrame) and not self.bill_quantity_data.empty:
-                wo_item = wo_row.get('Item No.', wo_row.get('Item', ''))
-                bq_item_col = 'Item No.' if 'Item No.' in self.bill_quantity_data.columns else 'Item'
-                matching_rows = self.bill_quantity_data[
-                    self.bill_quantity_data[bq_item_col] == wo_item
-                ]
-                if isinstance(matching_rows, pd.DataFrame) and not matching_rows.empty:
-                    bq_row = matching_rows.iloc[0]
-            
-            wo_qty = self._safe_float(wo_row.get('Quantity Since', wo_row.get('Quantity', 0)))
-            wo_rate = self._safe_float(wo_row.get('Rate', 0))
-            wo_amount = wo_qty * wo_rate
-            
-            bq_qty = self._safe_float(bq_row.get('Quantity', 0)) if bq_row is not None else 0
-            bq_amount = bq_qty * wo_rate
-            
-            excess_qty = max(0, bq_qty - wo_qty)
-            excess_amt = excess_qty * wo_rate
-            saving_qty = max(0, wo_qty - bq_qty)
-            saving_amt = saving_qty * wo_rate
-            
-            # Format deviation values conditionally
-            wo_qty_display = f"{wo_qty:.2f}" if wo_qty > 0 else ""
-            wo_rate_display = f"{wo_rate:.2f}" if wo_rate > 0 else ""
-            wo_amount_display = f"{wo_amount:.2f}" if wo_amount > 0 else ""
-            bq_qty_display = f"{bq_qty:.2f}" if bq_qty > 0 else ""
-            bq_amount_display = f"{bq_amount:.2f}" if bq_amount > 0 else ""
-            excess_qty_display = f"{excess_qty:.2f}" if excess_qty > 0 else ""
-            excess_amt_display = f"{excess_amt:.2f}" if excess_amt > 0 else ""
-            saving_qty_display = f"{saving_qty:.2f}" if saving_qty > 0 else ""
-            saving_amt_display = f"{saving_amt:.2f}" if saving_amt > 0 else ""
-            
-            html_content += f"""
+        # Align work order and bill quantity rows in a single lookup
+        deviation_rows = format_deviation_rows(self.get_deviation_frame(), show_zero=False)
+        for row in deviation_rows:
+            html_parts.append(f"""
                     <tr>
-                        <td>{self._safe_serial_no(wo_row.get('Item No.', wo_row.get('Item', '')))}</td>
-                        <td>{wo_row.get('Description', '')}</td>
-                        <td>{wo_row.get('Unit', '')}</td>
-                        <td class="amount">{wo_qty_display}</td>
-                        <td class="amount">{wo_rate_display}</td>
-                        <td class="amount">{wo_amount_display}</td>
-                        <td class="amount">{bq_qty_display}</td>
-                        <td class="amount">{bq_amount_display}</td>
-                        <td class="amount">{excess_qty_display}</td>
-                        <td class="amount">{excess_amt_display}</td>
-                        <td class="amount">{saving_qty_display}</td>
-                        <td class="amount">{saving_amt_display}</td>
+                        <td>{row['item_no']}</td>
+                        <td>{row['description']}</td>
+                        <td>{row['unit']}</td>
+                        <td class="amount">{row['qty_wo']}</td>
+                        <td class="amount">{row['rate']}</td>
+                        <td class="amount">{row['amt_wo']}</td>
+                        <td class="amount">{row['qty_bill']}</td>
+                        <td class="amount">{row['amt_bill']}</td>
+                        <td class="amount">{row['excess_qty']}</td>
+                        <td class="amount">{row['excess_amt']}</td>
+                        <td class="amount">{row['saving_qty']}</td>
+                        <td class="amount">{row['saving_amt']}</td>
                         <td></td>
                     </tr>
-            """
+            """)
         
-        html_content += """
+        html_parts.append("""
                 </tbody>
             </table>
             </div>
         </body>
         </html>
-        """
+        """)
         
-        return html_content
+        return ''.join(html_parts)
     
     def _generate_final_bill_scrutiny(self) -> str:
         """Generate Final Bill Scrutiny Sheet"""
         current_date = datetime.now().strftime('%d/%m/%Y')
         
-        html_content = f"""
+        html_parts = [f"""
         <!DOCTYPE html>
         <html>
         <head>
@@ -779,7 +676,7 @@ class DocumentGenerator:
                     </tr>
                 </thead>
                 <tbody>
-        """
+        """]
         
         total_amount = 0
         # Check if bill_quantity_data is a valid DataFrame before iterating
@@ -790,7 +687,7 @@ class DocumentGenerator:
                 amount = quantity * rate
                 total_amount += amount
                 
-                html_content += f"""
+                html_parts.append(f"""
                         <tr>
                             <td>{self._safe_serial_no(row.get('Item No.', row.get('Item', '')))}</td>
                             <td>{row.get('Description', '')}</td>
@@ -799,16 +696,16 @@ class DocumentGenerator:
                             <td class="amount">{self._format_number(rate)}</td>
                             <td class="amount">{self._format_number(amount)}</td>
                         </tr>
-                """
+                """)
         else:
             # Handle case when bill_quantity_data is empty or not a DataFrame
-            html_content += """
+            html_parts.append("""
                     <tr>
                         <td colspan="6">No bill quantity data available</td>
                     </tr>
-            """
+            """)
         
-        html_content += f"""
+        html_parts.append(f"""
                     <tr style="font-weight: bold;">
                         <td colspan="5">TOTAL</td>
                         <td class="amount">{total_amount:.0f}</td>
@@ -818,15 +715,15 @@ class DocumentGenerator:
             </div>
         </body>
         </html>
-        """
+        """)
         
-        return html_content
+        return ''.join(html_parts)
     
     def _generate_extra_items_statement(self) -> str:
         """Generate Extra Items Statement"""
         current_date = datetime.now().strftime('%d/%m/%Y')
         
-        html_content = f"""
+        html_parts = [f"""
         <!DOCTYPE html>
         <html>
         <head>
@@ -873,10 +770,10 @@ class DocumentGenerator:
                 <div class="subtitle">Extra Items Statement</div>
                 <div class="subtitle">Date: {current_date}</div>
             </div>
-        """
+        """]
         
         if isinstance(self.extra_items_data, pd.DataFrame) and not self.extra_items_data.empty:
-            html_content += """
+            html_parts.append("""
             <h3>Extra Items</h3>
             <table class="extra-items">
                 <colgroup>
@@ -898,7 +795,7 @@ class DocumentGenerator:
                     </tr>
                 </thead>
                 <tbody>
-            """
+            """)
             
             total_amount = 0
             for index, row in self.extra_items_data.iterrows():
@@ -907,7 +804,7 @@ class DocumentGenerator:
                 amount = quantity * rate
                 total_amount += amount
                 
-                html_content += f"""
+                html_parts.append(f"""
                         <tr>
                             <td>{self._safe_serial_no(row.get('Item No.', row.get('Item No', row.get('Item', ''))))}</td>
                             <td>{row.get('Description', '')}</td>
@@ -916,26 +813,26 @@ class DocumentGenerator:
                             <td class="amount">{self._format_number(rate)}</td>
                             <td class="amount">{self._format_number(amount)}</td>
                         </tr>
-                """
+                """)
             
-            html_content += f"""
+            html_parts.append(f"""
                         <tr style="font-weight: bold;">
                             <td colspan="5">TOTAL</td>
                             <td class="amount">{total_amount:.0f}</td>
                         </tr>
                     </tbody>
                 </table>
-            """
+            """)
         else:
-            html_content += "<p>No extra items found in the provided data.</p>"
+            html_parts.append("<p>No extra items found in the provided data.</p>")
         
-        html_content += """
+        html_parts.append("""
             </div>
         </body>
         </html>
-        """
+        """)
         
-        return html_content
+        return ''.join(html_parts)
     
     def _generate_certificate_ii(self) -> str:
         """Generate Professional Certificate II - Government Standard"""
@@ -8,49 +8,70 @@ import os
 import gc
 
 from .dataframe_safety_utils import DataFrameSafetyUtils
-# Add import for FirstPageGenerator
-from .first_page_generator import FirstPageGenerator
+from .cache_utils import SizeBoundedLRUCache, stream_digest, estimate_size
+from .workbook_reader import SinglePassWorkbook
+from .tracing import traced
 
 class ExcelProcessor:
     """Handles Excel file processing and data extraction"""
     
-    # Class-level cache for processed files
-    _file_cache = {}
-    _cache_max_size = 75  # Limit cache size to prevent memory issues
+    # Class-level cache of parsed results keyed on the workbook content digest.
+    # Bounded by total size so a few large workbooks cannot exhaust memory.
+    _cache_max_bytes = 256 * 1024 * 1024
+    _result_cache = SizeBoundedLRUCache(_cache_max_bytes)
     
-    def __init__(self, uploaded_file):
+    # Workbook readers: 'pandas' reads each sheet with pd.read_excel,
+    # 'openpyxl' streams all sheets in a single read-only pass
+    READERS = ('pandas', 'openpyxl')
+    default_reader = os.environ.get('BILLGEN_EXCEL_READER', 'pandas')
+    REQUIRED_SHEETS = ('Title', 'Work Order', 'Bill Quantity', 'Extra Items')
+    
+    def __init__(self, uploaded_file, reader: str = None):
         self.uploaded_file = uploaded_file
         self.workbook = None
         self._file_hash = None
+        self.reader = reader or self.default_reader
+        if self.reader not in self.READERS:
+            raise ValueError(f"Unknown Excel reader '{self.reader}'. Choose one of: {', '.join(self.READERS)}")
     
     def _get_file_hash(self):
-        """Generate hash for file caching"""
+        """Generate a content digest of the workbook bytes for caching"""
         if self._file_hash is None:
-            if hasattr(self.uploaded_file, 'read'):
-                # For file-like objects, we can't reliably hash without consuming
-                # So we'll use a combination of size and name if available
-                if hasattr(self.uploaded_file, 'name'):
-                    self._file_hash = f"{getattr(self.uploaded_file, 'name', 'unknown')}_{hash(str(self.uploaded_file))}"
-                else:
-                    self._file_hash = str(id(self.uploaded_file))
-            else:
-                # For file paths, we can hash the file content
-                try:
-                    hash_md5 = hashlib.md5()
-                    with open(self.uploaded_file, "rb") as f:
-                        for chunk in iter(lambda: f.read(4096), b""):
-                            hash_md5.update(chunk)
-                    self._file_hash = hash_md5.hexdigest()
-                except:
-                    self._file_hash = str(self.uploaded_file)
+            try:
+                # Works for paths, Streamlit uploads and other file-like objects alike,
+                # so the same workbook uploaded twice maps to the same key
+                self._file_hash = stream_digest(self.uploaded_file)
+            except Exception:
+                self._file_hash = None
         return self._file_hash
     
+    @classmethod
+    def get_cache_stats(cls) -> Dict[str, Any]:
+        """Return hit/miss counters and memory usage of the parsed result cache"""
+        return cls._result_cache.stats()
+    
+    @classmethod
+    def clear_cache(cls):
+        """Drop all cached parsed workbooks"""
+        cls._result_cache.clear()
+    
+    @staticmethod
+    def _copy_parsed_result(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a parsed result so callers cannot mutate the cached entry"""
+        return {
+            key: value.copy(deep=True) if isinstance(value, pd.DataFrame) else
+                 (dict(value) if isinstance(value, dict) else value)
+            for key, value in data.items()
+        }
+    
     def process_excel_file(self, uploaded_file) -> Dict[str, Any]:
         """Process Excel file - compatibility method for enhanced_app.py"""
         # Update the uploaded file and process it
         self.uploaded_file = uploaded_file
+        self._file_hash = None
         return self.process_excel()
     
+    @traced('excel.read')
     def _safe_read_excel(self):
         """
         Safely read Excel file with comprehensive error handling for common access issues
@@ -61,12 +82,6 @@ class ExcelProcessor:
         max_retries = 3
         retry_delay = 1  # seconds
         
-        # Check cache first
-        file_hash = self._get_file_hash()
-        if file_hash in self._file_cache:
-            print("Using cached Excel data")
-            return self._file_cache[file_hash]
-        
         for attempt in range(max_retries):
             try:
                 # Read Excel file - handle both file paths and file-like objects
@@ -75,7 +90,7 @@ class ExcelProcessor:
                     # Reset file pointer to beginning
                     if hasattr(self.uploaded_file, 'seek'):
                         self.uploaded_file.seek(0)
-                    excel_data = pd.ExcelFile(self.uploaded_file)
+                    excel_data = self._open_workbook()
                 else:
                     # It's a file path - check if file exists and is accessible
                     if not os.path.exists(self.uploaded_file):
@@ -85,11 +100,7 @@ class ExcelProcessor:
                     if not os.access(self.uploaded_file, os.R_OK):
                         raise PermissionError(f"No read permission for file: {self.uploaded_file}")
                     
-                    excel_data = pd.ExcelFile(self.uploaded_file)
-                
-                # Cache the result if we have space
-                if len(self._file_cache) < self._cache_max_size:
-                    self._file_cache[file_hash] = excel_data
+                    excel_data = self._open_workbook()
                 
                 return excel_data
                 
@@ -125,6 +136,7 @@ class ExcelProcessor:
         
         raise Exception("Failed to read Excel file after multiple attempts. Please check file permissions and ensure it's not open in another program.")
     
+    @traced('excel.process')
     def process_excel(self, allow_missing_bill_quantity: bool = False) -> Dict[str, Any]:
         """
         Process uploaded Excel file and extract data from all required sheets
@@ -133,6 +145,18 @@ class ExcelProcessor:
             Dict containing extracted data from all sheets
         """
         try:
+            # Parsed results are cached on the workbook content, so re-uploads
+            # and Streamlit reruns skip openpyxl entirely
+            file_hash = self._get_file_hash()
+            cached = self._result_cache.get(file_hash) if file_hash else None
+            if cached is not None:
+                print("Using cached Excel data")
+                cached_data, sheet_names = cached
+                if 'Bill Quantity' not in sheet_names and not allow_missing_bill_quantity:
+                    raise Exception("Required 'Bill Quantity' sheet not found in Excel file")
+                data = self._copy_parsed_result(cached_data)
+                return self._validate_extracted_data(data, allow_missing_bill_quantity)
+            
             # Enhanced file access with better error handling
             excel_data = self._safe_read_excel()
             
@@ -182,24 +206,13 @@ class ExcelProcessor:
                 print("INFO: Extra Items sheet not found - this is optional")
                 data['extra_items_data'] = pd.DataFrame()
             
-            # Validate that we have essential data
-            if allow_missing_bill_quantity:
-                # Only require work order data when partial processing
-                if DataFrameSafetyUtils.is_valid_dataframe(data.get('work_order_data')):
-                    print("SUCCESS: Work Order data extracted successfully (partial mode)")
-                    gc.collect()
-                    return data
-                else:
-                    raise Exception("No valid Work Order data found. Please check your Excel file format.")
-            elif (DataFrameSafetyUtils.is_valid_dataframe(data.get('work_order_data')) and 
-                  DataFrameSafetyUtils.is_valid_dataframe(data.get('bill_quantity_data'))):
-                print("SUCCESS: All required data extracted successfully")
-                
-                # Force garbage collection after processing
-                gc.collect()
-                return data
-            else:
-                raise Exception("No valid data found in required sheets. Please check your Excel file format.")
+            # Cache a private copy of the parsed sheets before handing them out
+            if file_hash:
+                cached_data = self._copy_parsed_result(data)
+                self._result_cache.put(file_hash, (cached_data, list(excel_data.sheet_names)),
+                                       estimate_size(cached_data))
+            
+            return self._validate_extracted_data(data, allow_missing_bill_quantity)
             
         except Exception as e:
             print(f"ERROR in process_excel: {str(e)}")
@@ -211,9 +224,48 @@ class ExcelProcessor:
                 self.workbook = None
             gc.collect()
     
+    def _open_workbook(self):
+        """Open the workbook with the selected reader"""
+        if self.reader == 'openpyxl':
+            return SinglePassWorkbook.load(self.uploaded_file, sheet_names=self.REQUIRED_SHEETS)
+        return pd.ExcelFile(self.uploaded_file)
+    
+    def _read_sheet(self, excel_data, sheet_name: str) -> pd.DataFrame:
+        """Read a data sheet with its first row as header"""
+        if isinstance(excel_data, SinglePassWorkbook):
+            return excel_data.to_dataframe(sheet_name)
+        return pd.read_excel(
+            excel_data, 
+            sheet_name=sheet_name, 
+            header=0,
+            dtype_backend='numpy_nullable'  # Use more memory-efficient data types
+        )
+    
+    def _validate_extracted_data(self, data: Dict[str, Any], allow_missing_bill_quantity: bool) -> Dict[str, Any]:
+        """Validate that the essential sheets produced data"""
+        if allow_missing_bill_quantity:
+            # Only require work order data when partial processing
+            if DataFrameSafetyUtils.is_valid_dataframe(data.get('work_order_data')):
+                print("SUCCESS: Work Order data extracted successfully (partial mode)")
+                return data
+            else:
+                raise Exception("No valid Work Order data found. Please check your Excel file format.")
+        elif (DataFrameSafetyUtils.is_valid_dataframe(data.get('work_order_data')) and 
+              DataFrameSafetyUtils.is_valid_dataframe(data.get('bill_quantity_data'))):
+            print("SUCCESS: All required data extracted successfully")
+            return data
+        else:
+            raise Exception("No valid data found in required sheets. Please check your Excel file format.")
+    
+    @traced('excel.process_title_sheet')
     def _process_title_sheet(self, excel_data) -> Dict[str, str]:
         """Extract metadata from Title sheet"""
         try:
+            if isinstance(excel_data, SinglePassWorkbook):
+                title_data = excel_data.title_dict('Title')
+                print(f"Title data extracted: {title_data}")
+                return title_data
+            
             title_df = pd.read_excel(excel_data, sheet_name='Title', header=None)
             print(f"Title sheet shape: {title_df.shape}")
             print(f"Title sheet columns: {list(title_df.columns)}")
@@ -239,16 +291,12 @@ class ExcelProcessor:
             print(f"Error in _process_title_sheet: {str(e)}")
             raise Exception(f"Error processing Title sheet: {str(e)}")
     
+    @traced('excel.process_work_order_sheet')
     def _process_work_order_sheet(self, excel_data) -> pd.DataFrame:
         """Extract work order data with memory optimization"""
         try:
-            # Read with chunking for large files and optimize data types
-            work_order_df = pd.read_excel(
-                excel_data, 
-                sheet_name='Work Order', 
-                header=0,
-                dtype_backend='numpy_nullable'  # Use more memory-efficient data types
-            )
+            # Read with optimized data types
+            work_order_df = self._read_sheet(excel_data, 'Work Order')
             
             print(f"Work Order sheet shape: {work_order_df.shape}")
             print(f"Work Order columns: {list(work_order_df.columns)}")
@@ -296,16 +344,12 @@ class ExcelProcessor:
             print(f"Error in _process_work_order_sheet: {str(e)}")
             raise Exception(f"Error processing Work Order sheet: {str(e)}")
     
+    @traced('excel.process_bill_quantity_sheet')
     def _process_bill_quantity_sheet(self, excel_data) -> pd.DataFrame:
         """Extract bill quantity data with memory optimization"""
         try:
             # Read with optimized data types
-            bill_quantity_df = pd.read_excel(
-                excel_data, 
-                sheet_name='Bill Quantity', 
-                header=0,
-                dtype_backend='numpy_nullable'  # Use more memory-efficient data types
-            )
+            bill_quantity_df = self._read_sheet(excel_data, 'Bill Quantity')
             
             print(f"Bill Quantity sheet shape: {bill_quantity_df.shape}")
             print(f"Bill Quantity columns: {list(bill_quantity_df.columns)}")
@@ -348,16 +392,12 @@ class ExcelProcessor:
             print(f"Error in _process_bill_quantity_sheet: {str(e)}")
             raise Exception(f"Error processing Bill Quantity sheet: {str(e)}")
     
+    @traced('excel.process_extra_items_sheet')
     def _process_extra_items_sheet(self, excel_data) -> pd.DataFrame:
         """Extract extra items data with memory optimization"""
         try:
             # Read with optimized data types
-            extra_items_df = pd.read_excel(
-                excel_data, 
-                sheet_name='Extra Items', 
-                header=0,
-                dtype_backend='numpy_nullable'  # Use more memory-efficient data types
-            )
+            extra_items_df = self._read_sheet(excel_data, 'Extra Items')
             
             print(f"Extra Items sheet shape: {extra_items_df.shape}")
             print(f"Extra Items columns: {list(extra_items_df.columns)}")
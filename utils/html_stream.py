@@ -0,0 +1,51 @@
+"""
+Streaming HTML output for Bill Generator
+Coalesces the many small pieces Jinja's ``Template.generate()`` yields into
+fixed-size chunks, and writes or encodes chunks for files, ZIP entries and HTTP
+responses, so a large document never has to be held as one string.
+"""
+
+import io
+from typing import IO, Any, Iterable, Iterator
+
+# Characters per chunk handed to a consumer
+STREAM_CHUNK_CHARS = 64 * 1024
+
+
+def buffered_chunks(pieces: Iterable[str], chunk_chars: int = STREAM_CHUNK_CHARS) -> Iterator[str]:
+    """Join small string pieces into chunks of about ``chunk_chars`` characters"""
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_chars:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_template(template: Any, data: dict, chunk_chars: int = STREAM_CHUNK_CHARS) -> Iterator[str]:
+    """Render a Jinja template incrementally as chunks of HTML"""
+    return buffered_chunks(template.generate(**data), chunk_chars)
+
+
+def encoded_chunks(chunks: Iterable[str], encoding: str = 'utf-8') -> Iterator[bytes]:
+    """Encode string chunks, e.g. for an HTTP response body or a binary ZIP entry"""
+    for chunk in chunks:
+        yield chunk.encode(encoding)
+
+
+def write_chunks(chunks: Iterable[str], output: IO, encoding: str = 'utf-8') -> int:
+    """
+    Write string chunks to a text or binary stream.
+
+    Returns:
+        Number of characters written
+    """
+    binary = not isinstance(output, io.TextIOBase)
+    written = 0
+    for chunk in chunks:
+        output.write(chunk.encode(encoding) if binary else chunk)
+        written += len(chunk)
+    return written
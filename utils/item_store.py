@@ -0,0 +1,151 @@
+"""
+Compact item store for Bill Generator
+Holds the rows of an item table column by column (NumPy arrays for numbers, shared
+lists for text, amount columns formatted on access) instead of one dict per row.
+Rows are ``__slots__`` views into the columns, so Jinja templates, the streaming
+renderer and the native PDF tables can all iterate one shared store.
+"""
+
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+
+def _scalar(value: Any) -> Any:
+    """NumPy scalars as the equivalent Python value, as ``tolist()`` would give"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class AmountColumn:
+    """
+    Numeric column displayed with two decimals.
+
+    Zero, negative, NaN and masked cells display blank; text is formatted on access,
+    so no string is kept per cell (same output as ``bill_computation.format_amounts``).
+    """
+
+    __slots__ = ('values', 'blank')
+
+    def __init__(self, values: Any, blank: Optional[Any] = None):
+        self.values = np.asarray(values, dtype='float64')
+        self.blank = ~(self.values > 0)
+        if blank is not None:
+            self.blank |= np.asarray(blank, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, index: int) -> str:
+        if self.blank[index]:
+            return ''
+        return '%.2f' % self.values[index]
+
+    def tolist(self) -> List[str]:
+        return [self[index] for index in range(len(self))]
+
+
+def _as_list(column: Sequence) -> List[Any]:
+    if isinstance(column, (AmountColumn, np.ndarray)):
+        return column.tolist()
+    return list(column)
+
+
+def _concat_columns(parts: List[Sequence]) -> Sequence:
+    if all(isinstance(part, AmountColumn) for part in parts):
+        return AmountColumn(np.concatenate([part.values for part in parts]),
+                            np.concatenate([part.blank for part in parts]))
+    if all(isinstance(part, np.ndarray) for part in parts):
+        return np.concatenate(parts)
+    return list(chain.from_iterable(_as_list(part) for part in parts))
+
+
+class ItemRow:
+    """Read-only view of one row; supports ``row.name``, ``row['name']`` and ``row.get()``"""
+
+    __slots__ = ('_columns', '_index')
+
+    def __init__(self, columns: Dict[str, Sequence], index: int):
+        self._columns = columns
+        self._index = index
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            column = self._columns[name]
+        except KeyError:
+            raise AttributeError(name) from None
+        return _scalar(column[self._index])
+
+    def __getitem__(self, name: str) -> Any:
+        return _scalar(self._columns[name][self._index])
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    def get(self, name: str, default: Any = None) -> Any:
+        column = self._columns.get(name)
+        return default if column is None else _scalar(column[self._index])
+
+    def keys(self) -> List[str]:
+        return list(self._columns)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: _scalar(column[self._index]) for name, column in self._columns.items()}
+
+    def __repr__(self) -> str:
+        return f"ItemRow({self.to_dict()!r})"
+
+
+class ItemStore:
+    """
+    Column-oriented item table.
+
+    Iterating yields ItemRow views, so code written for a list of row dicts (and
+    templates using ``item.name`` or ``item['name']``) works unchanged.
+    """
+
+    __slots__ = ('_columns', '_length')
+
+    def __init__(self, columns: Dict[str, Sequence]):
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Item columns differ in length: {sorted(lengths)}")
+        self._columns = dict(columns)
+        self._length = lengths.pop() if lengths else 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[ItemRow]:
+        columns = self._columns
+        return (ItemRow(columns, index) for index in range(self._length))
+
+    def __getitem__(self, index: int) -> ItemRow:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("item index out of range")
+        return ItemRow(self._columns, index)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def column(self, name: str) -> Sequence:
+        """The column as stored (list, NumPy array or AmountColumn)"""
+        return self._columns[name]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [row.to_dict() for row in self]
+
+    @classmethod
+    def concat(cls, stores: Iterable['ItemStore']) -> 'ItemStore':
+        """Rows of several stores in order; a column missing from a store is blank there"""
+        stores = [store for store in stores if len(store)]
+        if len(stores) == 1:
+            return stores[0]
+        names = list(dict.fromkeys(name for store in stores for name in store.columns))
+        return cls({
+            name: _concat_columns([store._columns.get(name, [''] * len(store)) for store in stores])
+            for name in names
+        })
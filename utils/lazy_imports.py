@@ -0,0 +1,112 @@
+"""
+Lazy imports for Bill Generator
+Module proxies that import on first attribute access, cached probes for optional
+dependencies, and the heavy modules each entry module must leave unloaded until
+first use (import-time budgets are tracked by benchmark_pipeline.py)
+"""
+
+import importlib
+import json
+import subprocess
+import sys
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, Iterable, List, Optional
+
+# Modules each entry module must not load at import time; they load on first use
+DEFERRED_IMPORTS = {
+    'billgen_cli': ('pandas', 'numpy', 'enhanced_document_generator_fixed', 'batch_processor', 'docx',
+                    'reportlab', 'weasyprint', 'playwright', 'streamlit'),
+    'enhanced_document_generator_fixed': ('asyncio', 'bs4', 'docx', 'PyPDF2', 'pypdf', 'reportlab',
+                                          'weasyprint', 'playwright', 'streamlit', 'xlsxwriter'),
+    'app': ('batch_processor', 'enhanced_document_generator_fixed', 'optimized_pdf_converter',
+            'utils.excel_processor', 'utils.zip_packager', 'bs4', 'docx', 'PyPDF2', 'pypdf',
+            'reportlab', 'weasyprint', 'playwright'),
+}
+# Prefix of the report line printed by the measuring interpreter
+_REPORT_MARKER = 'import-report:'
+
+
+class LazyModule(ModuleType):
+    """Stands in for a module and imports it on first attribute access"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_lock'] = threading.Lock()
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with self.__dict__['_lazy_lock']:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.__dict__['_lazy_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return the module if it is already imported, otherwise a proxy that imports it on first use"""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+@lru_cache(maxsize=None)
+def optional_import(name: str) -> Optional[ModuleType]:
+    """Import an optional dependency once; None if it is missing or fails to load"""
+    try:
+        return importlib.import_module(name)
+    except Exception:
+        # Packages with missing native libraries raise OSError, not just ImportError
+        return None
+
+
+def measure_import(module: str, watch: Iterable[str] = (), cwd: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Import a module (or a comma-separated list of modules) in a fresh interpreter.
+
+    Returns:
+        Dictionary with the import time in seconds and which of ``watch`` got loaded
+    """
+    watch = list(watch)
+    script = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"loaded = [m for m in {watch!r} if m in sys.modules]\n"
+        f"print({_REPORT_MARKER!r} + json.dumps([elapsed, loaded]))\n"
+    )
+    cwd = cwd or str(Path(__file__).resolve().parent.parent)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', script], cwd=cwd, capture_output=True, text=True,
+                            timeout=120)
+    if result.returncode != 0:
+        raise Exception(f"Importing {module} failed: {result.stderr.strip().splitlines()[-1:]}")
+    # The module may print while importing; the report is the marked line
+    report = [line for line in result.stdout.splitlines() if line.startswith(_REPORT_MARKER)][-1]
+    import_seconds, loaded = json.loads(report[len(_REPORT_MARKER):])
+    return {
+        'module': module,
+        'import_seconds': import_seconds,
+        'process_seconds': time.perf_counter() - start,
+        'loaded': loaded,
+    }
+
+
+def deferred_imports_loaded(module: str, cwd: Optional[str] = None) -> List[str]:
+    """Deferred imports of an entry module that a cold import of it loads anyway (empty when lazy)"""
+    return measure_import(module, DEFERRED_IMPORTS.get(module, ()), cwd)['loaded']
@@ -0,0 +1,108 @@
+"""
+Parallel document conversion for Bill Generator
+Fans per-document work (HTML to PDF) out to a thread pool, or a shared long-lived
+process pool, and returns results in the original document order, which
+PDFMerger relies on
+"""
+
+import atexit
+import concurrent.futures
+import logging
+import os
+import pickle
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_TYPES = ('auto', 'thread', 'process', 'serial')
+
+# 'auto' uses threads: they are safe inside batch workers, API job threads and Streamlit,
+# where forking a process pool per bill would nest pools and oversubscribe the cores
+DEFAULT_EXECUTOR = os.environ.get('BILLGEN_PDF_EXECUTOR', 'auto')
+DEFAULT_MAX_WORKERS = int(os.environ.get('BILLGEN_PDF_WORKERS', '0')) or None
+
+_process_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def resolve_executor_type(executor_type: Optional[str] = None, item_count: int = 0) -> str:
+    """Resolve 'auto' (or None) to a concrete executor type for ``item_count`` documents"""
+    executor_type = (executor_type or DEFAULT_EXECUTOR).lower()
+    if executor_type not in EXECUTOR_TYPES:
+        raise ValueError(f"Unknown executor type '{executor_type}'. Expected one of {EXECUTOR_TYPES}")
+    if item_count <= 1:
+        return 'serial'
+    if executor_type == 'auto':
+        return 'thread'
+    return executor_type
+
+
+def get_process_pool(max_workers: Optional[int] = None) -> concurrent.futures.ProcessPoolExecutor:
+    """
+    Return the process-wide conversion pool, started on first use and reused afterwards.
+
+    The pool is sized when it starts (``max_workers``, BILLGEN_PDF_WORKERS or the core
+    count, capped by the core count); later calls share it whatever they ask for.
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            cores = os.cpu_count() or 1
+            workers = min(max_workers or DEFAULT_MAX_WORKERS or cores, cores)
+            _process_pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        return _process_pool
+
+
+def shutdown_process_pool():
+    """Stop the shared process pool; the next process conversion starts a new one"""
+    global _process_pool
+    with _process_pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+atexit.register(shutdown_process_pool)
+
+
+def convert_documents(func: Callable[[str, Any], Any], documents: Dict[str, Any],
+                      executor_type: Optional[str] = None,
+                      max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Apply ``func(name, payload)`` to every document concurrently.
+
+    Args:
+        func: Conversion function; must be a module-level function for the process executor
+        documents: Ordered dict of document name to payload (e.g. HTML)
+        executor_type: 'auto' (threads), 'thread', 'process' or 'serial'
+        max_workers: Thread pool size (defaults to one worker per document); the shared
+            process pool is sized once, see get_process_pool()
+
+    Returns:
+        Dict of document name to result, in the same order as ``documents``
+    """
+    items = list(documents.items())
+    kind = resolve_executor_type(executor_type, len(items))
+
+    if kind == 'serial':
+        return {name: func(name, payload) for name, payload in items}
+
+    if kind == 'process':
+        try:
+            pool = get_process_pool(max_workers)
+            futures = [(name, pool.submit(func, name, payload)) for name, payload in items]
+            # Collect in submission order so callers (and PDFMerger) see the original sequence
+            return {name: future.result() for name, future in futures}
+        except (BrokenProcessPool, pickle.PicklingError, OSError) as e:
+            if isinstance(e, BrokenProcessPool):
+                # Start afresh on the next call
+                shutdown_process_pool()
+            logger.warning(f"Parallel process conversion unavailable ({str(e)}); converting serially")
+            return {name: func(name, payload) for name, payload in items}
+
+    workers = max_workers or DEFAULT_MAX_WORKERS or len(items)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf-convert") as pool:
+        futures = [(name, pool.submit(func, name, payload)) for name, payload in items]
+        return {name: future.result() for name, future in futures}
@@ -0,0 +1,212 @@
+"""
+PDF engine registry for Bill Generator
+Probes each optional HTML-to-PDF engine once per process, the first time it is
+needed, remembers which engine worked for each document type, and keeps
+per-engine success rates and latencies
+"""
+
+import importlib
+import importlib.metadata
+import importlib.util
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Engine name -> module whose import proves the engine is installed
+ENGINE_MODULES = {
+    'weasyprint': 'weasyprint',
+    'xhtml2pdf': 'xhtml2pdf',
+    'playwright': 'playwright.async_api',
+    'reportlab': 'reportlab.pdfgen.canvas',
+    # Tabular documents built from bill rows rather than converted from HTML
+    'reportlab-native': 'reportlab.platypus',
+    'pdfkit': 'pdfkit',
+}
+
+
+class PDFEngineRegistry:
+    """Process-wide engine availability, per-document routing and statistics"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # Engine -> importable; filled in one engine at a time so that heavy engines
+        # (WeasyPrint, Playwright) are only imported when a conversion reaches them
+        self._available: Dict[str, bool] = {}
+        # Document type -> engine that last produced a good PDF for it
+        self._known_good: Dict[str, str] = {}
+        # (document type, engine) pairs that failed and never succeeded
+        self._known_bad: set = set()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        # Per-thread list collecting recorded attempts, see captured_attempts()
+        self._capture = threading.local()
+
+    def _probe(self, engine: str) -> bool:
+        module = ENGINE_MODULES.get(engine)
+        if module is None:
+            return False
+        try:
+            importlib.import_module(module)
+            logger.info(f"✅ {engine} available")
+            return True
+        except Exception:
+            # Engines with missing native libraries raise OSError, not just ImportError
+            logger.warning(f"❌ {engine} not available")
+            return False
+
+    @property
+    def available_engines(self) -> Dict[str, bool]:
+        """Availability of every known engine (probes any not yet probed)"""
+        for engine in ENGINE_MODULES:
+            self.is_available(engine)
+        return self._available
+
+    def is_available(self, engine: str) -> bool:
+        """Whether an engine imports, probed on first use"""
+        if engine not in self._available:
+            with self._lock:
+                if engine not in self._available:
+                    self._available[engine] = self._probe(engine)
+        return self._available[engine]
+
+    def engine_version(self) -> str:
+        """
+        Installed engines and their versions, e.g. for keying cached PDFs.
+
+        Read from package metadata so that no engine has to be imported.
+        """
+        parts = []
+        for engine, module in sorted(ENGINE_MODULES.items()):
+            package = module.split('.')[0]
+            if importlib.util.find_spec(package) is None:
+                continue
+            try:
+                version = importlib.metadata.version(package)
+            except importlib.metadata.PackageNotFoundError:
+                version = '?'
+            parts.append(f"{engine}-{version}")
+        return '+'.join(parts)
+
+    def _routing_order(self, doc_type: str, candidates: Iterable[str]) -> List[str]:
+        candidates = list(candidates)
+        with self._lock:
+            known_good = self._known_good.get(doc_type)
+            good = [engine for engine in candidates if engine == known_good]
+            untried = [engine for engine in candidates
+                       if engine != known_good and (doc_type, engine) not in self._known_bad]
+            failed = [engine for engine in candidates if (doc_type, engine) in self._known_bad]
+        return good + untried + failed
+
+    def engines_for(self, doc_type: str, candidates: Iterable[str]) -> List[str]:
+        """
+        Order the installed candidate engines for a document type.
+
+        The engine that last succeeded for this document type comes first; engines
+        that have only ever failed for it move to the end as a last resort.
+        """
+        return [engine for engine in self._routing_order(doc_type, candidates) if self.is_available(engine)]
+
+    def record(self, engine: str, doc_type: str, success: bool, elapsed: float):
+        """Record the outcome and latency of one conversion attempt"""
+        with self._lock:
+            stats = self._stats.setdefault(engine, {'attempts': 0, 'successes': 0, 'total_time': 0.0})
+            stats['attempts'] += 1
+            stats['total_time'] += elapsed
+            if success:
+                stats['successes'] += 1
+                self._known_good[doc_type] = engine
+                self._known_bad.discard((doc_type, engine))
+            else:
+                if self._known_good.get(doc_type) == engine:
+                    del self._known_good[doc_type]
+                self._known_bad.add((doc_type, engine))
+        captured = getattr(self._capture, 'attempts', None)
+        if captured is not None:
+            captured.append((engine, doc_type, success, elapsed))
+
+    @contextmanager
+    def captured_attempts(self) -> Iterator[List[Tuple[str, str, bool, float]]]:
+        """
+        Collect the attempts this thread records, for a worker process to report back.
+
+        A process pool worker records into its own copy of the registry; the parent
+        replays the collected attempts with record_worker_attempts().
+        """
+        previous = getattr(self._capture, 'attempts', None)
+        self._capture.attempts = []
+        try:
+            yield self._capture.attempts
+        finally:
+            self._capture.attempts = previous
+
+    def record_worker_attempts(self, report: Tuple[int, List[Tuple[str, str, bool, float]]]):
+        """Record attempts reported as (pid, attempts); attempts made in this process are already recorded"""
+        pid, attempts = report
+        if pid == os.getpid():
+            return
+        for attempt in attempts:
+            self.record(*attempt)
+
+    def convert(self, doc_type: str, candidates: Dict[str, Any], *args) -> Optional[Any]:
+        """
+        Run ``candidates[engine](*args)`` in routing order until one returns a truthy result.
+
+        Returns:
+            The first truthy result, or None if every engine failed
+        """
+        for engine in self._routing_order(doc_type, candidates):
+            # Availability is checked lazily so engines after the first success are never imported
+            if not self.is_available(engine):
+                continue
+            start = time.perf_counter()
+            with span(f'pdf.engine.{engine}', document=doc_type) as attempt:
+                try:
+                    result = candidates[engine](*args)
+                except Exception as e:
+                    logger.warning(f"{engine} failed for {doc_type}: {str(e)}")
+                    result = None
+                if attempt is not None:
+                    attempt['attributes']['success'] = bool(result)
+            self.record(engine, doc_type, bool(result), time.perf_counter() - start)
+            if result:
+                return result
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-engine attempts, success rate and average latency, plus current routing"""
+        with self._lock:
+            engines = {
+                engine: {
+                    'attempts': stats['attempts'],
+                    'successes': stats['successes'],
+                    'success_rate': stats['successes'] / stats['attempts'],
+                    'average_time': stats['total_time'] / stats['attempts'],
+                }
+                for engine, stats in self._stats.items()
+            }
+            return {
+                'available': dict(self.available_engines),
+                'engines': engines,
+                'routing': dict(self._known_good),
+            }
+
+    def reset(self):
+        """Forget routing and statistics (availability is kept)"""
+        with self._lock:
+            self._known_good.clear()
+            self._known_bad.clear()
+            self._stats.clear()
+
+
+_registry = PDFEngineRegistry()
+
+
+def get_engine_registry() -> PDFEngineRegistry:
+    """Return the process-wide PDF engine registry"""
+    return _registry
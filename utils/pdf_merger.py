@@ -1,5 +1,6 @@
 import io
-from typing import Dict
+import logging
+from typing import BinaryIO, Dict, Iterable, Tuple, Union
 
 try:
     from pypdf import PdfReader, PdfWriter  # type: ignore
@@ -11,49 +12,57 @@ except Exception:
     except Exception:
         PDF_LIB_AVAILABLE = False
 
+from utils.tracing import traced
+
+logger = logging.getLogger(__name__)
+
 class PDFMerger:
     """Handles PDF merging operations"""
     
-    def merge_pdfs(self, pdf_files: Dict[str, bytes]) -> bytes:
+    @traced('pdf.merge')
+    def merge_stream(self, documents: Iterable[Tuple[str, Union[bytes, BinaryIO]]], sink: BinaryIO,
+                     deduplicate: bool = False) -> int:
         """
-        Merge multiple PDF files into a single PDF
+        Merge PDFs into a file-like sink
+        
+        Documents are read one at a time and their pages copied into a single writer,
+        so each input buffer can be dropped once it has been read. The merged document
+        itself is still assembled in memory (the PDF cross-reference table is only known
+        at the end) and written to ``sink`` in one pass; what is saved is the extra
+        in-memory copy of the output, not the page objects.
         
         Args:
-            pdf_files: Dictionary of PDF files as bytes
+            documents: Iterable of (name, PDF bytes or binary buffer) pairs, merged in order
+            sink: Writable binary file object receiving the merged PDF
+            deduplicate: Share identical objects (fonts, images) between documents when
+                the installed PDF library supports it
             
         Returns:
-            Merged PDF as bytes
+            Number of pages written
         """
-        # Preserve insertion order coming from generator
-        ordered_items = list(pdf_files.items())
-
         if not PDF_LIB_AVAILABLE:
             # Fallback: concatenate bytes with simple separator; not a valid merged PDF but avoids hard failure
-            output = io.BytesIO()
-            for name, content in ordered_items:
-                output.write(content)
-                output.write(b"\n%---NEXT_FILE---%\n")
-            return output.getvalue()
+            count = 0
+            for name, content in documents:
+                sink.write(content if isinstance(content, (bytes, bytearray, memoryview)) else content.read())
+                sink.write(b"\n%---NEXT_FILE---%\n")
+                count += 1
+            return count
 
         writer = PdfWriter()
-        for name, content in ordered_items:
+        for name, content in documents:
             try:
-                reader = PdfReader(io.BytesIO(content))
-                for page in reader.pages:
+                stream = io.BytesIO(content) if isinstance(content, (bytes, bytearray, memoryview)) else content
+                # add_page clones the page objects into the writer, so the source buffer
+                # is no longer referenced once its pages have been appended
+                for page in PdfReader(stream).pages:
                     writer.add_page(page)
-            except Exception:
-                # Skip invalid PDFs quietly
+            except Exception as e:
+                # Skip invalid PDFs
+                logger.warning(f"Skipping {name} while merging: {str(e)}")
                 continue
 
-        # If no valid pages were added, create a minimal single-page PDF
-        if getattr(writer, "getNumPages", None):
-            num_pages = writer.getNumPages()
-        else:
-            try:
-                num_pages = len(writer.pages)  # pypdf >=3
-            except Exception:
-                num_pages = 0
-        
+        num_pages = len(writer.pages)
         if num_pages == 0:
             try:
                 # Create a blank page (A4 default size if supported)
@@ -61,9 +70,25 @@ class PDFMerger:
             except Exception:
                 pass
 
+        if deduplicate and hasattr(writer, 'compress_identical_objects'):
+            # Available in pypdf >= 4.3; older libraries keep every document's copies
+            writer.compress_identical_objects()
+
+        writer.write(sink)
+        return num_pages
+    
+    def merge_pdfs(self, pdf_files: Dict[str, bytes], deduplicate: bool = False) -> bytes:
+        """
+        Merge multiple PDF files into a single PDF
+        
+        Args:
+            pdf_files: Dictionary of PDF files as bytes
+            deduplicate: Share identical objects between documents when supported
+            
+        Returns:
+            Merged PDF as bytes
+        """
+        # Preserve insertion order coming from generator
         output_stream = io.BytesIO()
-        try:
-            writer.write(output_stream)
-            return output_stream.getvalue()
-        finally:
-            output_stream.seek(0)
+        self.merge_stream(pdf_files.items(), output_stream, deduplicate=deduplicate)
+        return output_stream.getvalue()
@@ -0,0 +1,188 @@
+"""
+Rendered document cache for Bill Generator
+Memoizes generated HTML and PDF documents on digests of the bill inputs each
+document depends on plus template and PDF engine versions, in a size-bounded LRU with an
+optional on-disk tier
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from utils.cache_utils import SizeBoundedLRUCache
+from utils.template_registry import current_template_version
+
+logger = logging.getLogger(__name__)
+
+# Bump when document generation code changes output for the same inputs
+RENDER_CACHE_VERSION = 1
+
+RENDER_CACHE_ENABLED = os.environ.get('BILLGEN_RENDER_CACHE', '1').lower() in ('1', 'true', 'yes')
+RENDER_CACHE_MAX_BYTES = int(os.environ.get('BILLGEN_RENDER_CACHE_MB', '128')) * 1024 * 1024
+# Directory for the persistent disk tier; unset keeps the cache in memory only
+RENDER_CACHE_DIR = os.environ.get('BILLGEN_RENDER_CACHE_DIR', '')
+
+
+def _default(value: Any) -> Any:
+    """JSON fallback for values such as dates, numpy scalars and pandas NA"""
+    if value is pd.NA or value is pd.NaT:
+        return None
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def json_digest(value: Any) -> str:
+    """Digest of a JSON-like value (dict keys are sorted)"""
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=_default).encode('utf-8')).hexdigest()
+
+
+def frame_fingerprint(df: Optional[pd.DataFrame]) -> str:
+    """Digest of a DataFrame's columns, dtypes and cell values"""
+    hasher = hashlib.sha256()
+    if df is None or not isinstance(df, pd.DataFrame) or df.empty:
+        hasher.update(b'empty')
+        return hasher.hexdigest()
+    hasher.update(json.dumps([str(c) for c in df.columns]).encode('utf-8'))
+    hasher.update(json.dumps([str(t) for t in df.dtypes]).encode('utf-8'))
+    hasher.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return hasher.hexdigest()
+
+
+def content_digest(text: str) -> str:
+    """Digest of one rendered HTML document"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """
+    Two-tier cache of rendered documents.
+
+    The memory tier is a SizeBoundedLRUCache; the optional disk tier stores one
+    pickle per key and promotes entries back into memory on a hit.
+    """
+
+    def __init__(self, max_bytes: int = RENDER_CACHE_MAX_BYTES, disk_dir: Optional[str] = None):
+        self.memory = SizeBoundedLRUCache(max_bytes)
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.pkl"
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None or self.disk_dir is None:
+            return value
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable render cache entry {path.name}: {str(e)}")
+            path.unlink(missing_ok=True)
+            return None
+        with self._lock:
+            self.disk_hits += 1
+        self.memory.put(key, value)
+        return value
+
+    def put(self, key: str, value: Any):
+        self.memory.put(key, value)
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        try:
+            # Write then rename so concurrent readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write render cache entry: {str(e)}")
+
+    def clear(self):
+        """Drop the memory tier and every disk entry"""
+        self.memory.clear()
+        with self._lock:
+            self.disk_hits = 0
+        if self.disk_dir is not None:
+            for path in self.disk_dir.glob('*.pkl'):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Memory tier counters plus disk hits; hit_rate counts hits from either tier"""
+        stats = self.memory.stats()
+        lookups = stats['hits'] + stats['misses']
+        # Memory misses that were served from disk are hits overall
+        hits = stats['hits'] + self.disk_hits
+        stats.update({
+            'disk_hits': self.disk_hits,
+            'disk_dir': str(self.disk_dir) if self.disk_dir else None,
+            'hit_rate': (hits / lookups) if lookups else 0.0,
+        })
+        return stats
+
+
+_cache: Optional[RenderCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_render_cache() -> RenderCache:
+    """Return the process-wide render cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RenderCache(RENDER_CACHE_MAX_BYTES, RENDER_CACHE_DIR or None)
+        return _cache
+
+
+def document_cache_key(doc_name: str, input_digests: Dict[str, str],
+                       template_version: Optional[str] = None) -> str:
+    """
+    Cache key for one HTML document from the digests of the inputs it depends on.
+
+    The render date is part of the key because programmatic fallbacks print it.
+    """
+    template_version = template_version or current_template_version()
+    today = date.today().isoformat()
+    return (f"html:v{RENDER_CACHE_VERSION}:{template_version}:{today}:{doc_name}:"
+            f"{json_digest(input_digests)}")
+
+
+def pdf_cache_key(doc_name: str, html_content: str, engine_version: str) -> str:
+    """Cache key for one PDF document"""
+    return f"pdf:v{RENDER_CACHE_VERSION}:{engine_version}:{doc_name}:{content_digest(html_content)}"
+
+
+def native_pdf_cache_key(doc_name: str, input_digests: Dict[str, str], engine_version: str) -> str:
+    """
+    Cache key for a PDF built natively from the bill data.
+
+    The native renderer never reads the document's HTML, so the key is built from the
+    digests of the inputs the document depends on instead.
+    """
+    return f"pdf-native:v{RENDER_CACHE_VERSION}:{engine_version}:{doc_name}:{json_digest(input_digests)}"
+
+
+def merged_cache_key(pdf_files: Dict[str, bytes]) -> str:
+    """Cache key for the merged PDF of an ordered set of documents"""
+    hasher = hashlib.sha256()
+    for name, pdf_bytes in pdf_files.items():
+        hasher.update(name.encode('utf-8'))
+        hasher.update(hashlib.sha256(pdf_bytes).digest())
+    return f"merged:v{RENDER_CACHE_VERSION}:{hasher.hexdigest()}"
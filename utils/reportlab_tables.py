@@ -0,0 +1,279 @@
+"""
+Native ReportLab tables for Bill Generator
+Builds the tabular documents (First Page, Deviation Statement, Extra Items) as
+Platypus tables straight from the prepared bill rows, so their PDFs need no HTML
+to be generated and parsed back. Column widths are fixed and cell text is wrapped
+up front, so long tables are laid out page by page with the header rows repeated
+on each page; the 13-column Deviation Statement is printed landscape.
+"""
+
+from typing import Any, BinaryIO, Callable, Dict, List, Tuple, Union
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.lib.utils import simpleSplit
+from reportlab.platypus import KeepTogether, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+# Column widths in mm; First Page matches first_page.html, the others fill the printable width
+FIRST_PAGE_COLUMNS = (10.06, 13.76, 13.76, 9.55, 63.83, 13.16, 19.53, 15.15, 11.96)
+DEVIATION_COLUMNS = (12, 60, 14, 18, 18, 22, 18, 22, 16, 20, 16, 20, 21)
+EXTRA_ITEMS_COLUMNS = (15, 25, 70, 18, 14, 18, 22)
+PAGE_MARGIN = 10 * mm
+
+CELL_FONT = 'Helvetica'
+CELL_FONT_SIZE = 7
+CELL_LEADING = 8.5
+CELL_PADDING = 1.7
+# Points kept free at the foot of each page, against rounding in the page fit
+PAGE_FIT_TOLERANCE = 2
+# SimpleDocTemplate frames pad their content on every side
+FRAME_PADDING = 6
+
+_styles = getSampleStyleSheet()
+TITLE_STYLE = _styles['Heading2']
+TEXT_STYLE = ParagraphStyle('BillText', parent=_styles['Normal'], fontSize=8, leading=10)
+HEADER_STYLE = ParagraphStyle('BillTableHeader', parent=_styles['Normal'], fontName='Helvetica-Bold',
+                              fontSize=CELL_FONT_SIZE, leading=8, alignment=1)
+
+
+def _paragraph(text: Any, style: ParagraphStyle = TEXT_STYLE) -> Paragraph:
+    return Paragraph(escape(str(text)), style)
+
+
+def _wrapped(text: Any, width: float) -> str:
+    """
+    Break cell text into lines for a column ``width`` mm wide.
+
+    Plain multi-line strings are measured once, whereas Paragraph cells are wrapped
+    again every time a long table is split across pages.
+    """
+    text = str(text)
+    if not text:
+        return text
+    return '\n'.join(simpleSplit(text, CELL_FONT, CELL_FONT_SIZE, width * mm - 2 * CELL_PADDING))
+
+
+def _cell_style(numeric_columns: Tuple[int, ...], first_row: int = 0) -> List[tuple]:
+    style = [
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.black),
+        ('FONTNAME', (0, 0), (-1, -1), CELL_FONT),
+        ('FONTSIZE', (0, 0), (-1, -1), CELL_FONT_SIZE),
+        ('LEADING', (0, 0), (-1, -1), CELL_LEADING),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('LEFTPADDING', (0, 0), (-1, -1), CELL_PADDING),
+        ('RIGHTPADDING', (0, 0), (-1, -1), CELL_PADDING),
+        ('TOPPADDING', (0, 0), (-1, -1), CELL_PADDING),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), CELL_PADDING),
+    ]
+    return style + [('ALIGN', (column, first_row), (column, -1), 'RIGHT') for column in numeric_columns]
+
+
+def _row_height(row: List[Any]) -> float:
+    """Height of a row of plain string cells, as Platypus lays it out"""
+    lines = max(str(cell).count('\n') + 1 for cell in row)
+    return lines * CELL_LEADING + 2 * CELL_PADDING
+
+
+def _flowables_height(flowables: list, frame: Tuple[float, float]) -> float:
+    return sum(flowable.wrap(*frame)[1] + flowable.getSpaceBefore() + flowable.getSpaceAfter()
+               for flowable in flowables)
+
+
+def _item_tables(header_rows: List[List[str]], body_rows: List[List[Any]], widths: Tuple[float, ...],
+                 numeric_columns: Tuple[int, ...], frame: Tuple[float, float], available: float,
+                 empty_text: str = '') -> list:
+    """
+    Bordered item table, laid out as one table per page that each start with the header rows.
+
+    Row heights are known from the pre-wrapped text, so rows are assigned to pages up front
+    (``available`` is the height left on the first page) instead of letting Platypus split
+    one long table page by page, which copies all remaining rows at every split.
+    """
+    header = [[_paragraph(text, HEADER_STYLE) for text in row] for row in header_rows]
+    col_widths = [width * mm for width in widths]
+    header_style = _cell_style(()) + [('VALIGN', (0, 0), (-1, -1), 'MIDDLE')]
+    style = _cell_style(numeric_columns, first_row=len(header_rows))
+    style.append(('VALIGN', (0, 0), (-1, len(header_rows) - 1), 'MIDDLE'))
+
+    def page_table(rows: List[List[Any]], extra_style: List[tuple] = ()) -> Table:
+        # Still splittable by row, should a page be measured short
+        table = Table(header + rows, colWidths=col_widths, repeatRows=len(header_rows), splitByRow=1)
+        table.setStyle(TableStyle(style + list(extra_style)))
+        return table
+
+    if not body_rows:
+        row = len(header_rows)
+        return [page_table([[empty_text] + [''] * (len(widths) - 1)], [('SPAN', (0, row), (-1, row))])]
+
+    header_height = Table(header, colWidths=col_widths, style=TableStyle(header_style)).wrap(*frame)[1]
+    tables, page = [], []
+    used = header_height
+    available -= PAGE_FIT_TOLERANCE
+    for row in body_rows:
+        height = _row_height(row)
+        if page and used + height > available:
+            tables += [page_table(page), PageBreak()]
+            page, used, available = [], header_height, frame[1] - PAGE_FIT_TOLERANCE
+        page.append(row)
+        used += height
+    tables.append(page_table(page))
+    return tables
+
+
+def _summary_table(rows: List[Tuple[str, List[str]]], widths: Tuple[float, ...], label_column: int,
+                   numeric_columns: Tuple[int, ...]) -> KeepTogether:
+    """Total rows below an item table: a bold label in ``label_column``, values after it"""
+    data = []
+    for label, values in rows:
+        row = [''] * len(widths)
+        row[label_column] = _wrapped(label, widths[label_column])
+        row[label_column + 1:label_column + 1 + len(values)] = values
+        data.append(row)
+    style = _cell_style(numeric_columns)
+    style += [('SPAN', (0, row), (label_column - 1, row)) for row in range(len(data))]
+    style.append(('FONTNAME', (label_column, 0), (label_column, -1), 'Helvetica-Bold'))
+    table = Table(data, colWidths=[width * mm for width in widths])
+    table.setStyle(TableStyle(style))
+    # Totals move to the next page as a block rather than being split from each other
+    return KeepTogether([table])
+
+
+def first_page_story(data: Dict[str, Any], frame: Tuple[float, float]) -> list:
+    """CONTRACTOR BILL: title lines and the work order / extra item table with totals"""
+    data = data['data']
+    widths = FIRST_PAGE_COLUMNS
+    story = [Paragraph('CONTRACTOR BILL', TITLE_STYLE)]
+    for row in data.get('header', []):
+        text = ' '.join(str(item).strip() for item in row if str(item).strip())
+        if text:
+            story.append(_paragraph(text))
+    story.append(Spacer(1, 4 * mm))
+
+    header_rows = [
+        ['Unit', 'Quantity executed (or supplied) since last certificate',
+         'Quantity executed (or supplied) upto date as per MB', 'S. No.',
+         'Item of Work supplies (Grouped under "sub-head" and "sub work" of estimate)', 'Rate',
+         'Upto date Amount', 'Amount Since previous bill (Total for each sub-head)', 'Remarks'],
+        [str(number) for number in range(1, 10)],
+    ]
+    body = [
+        [
+            _wrapped(item.get('unit', ''), widths[0]), item.get('quantity_since_last', ''),
+            item.get('quantity_upto_date', item.get('quantity', '') if str(item.get('unit', '')).strip() else ''),
+            _wrapped(item.get('serial_no', ''), widths[3]), _wrapped(item.get('description', ''), widths[4]),
+            item.get('rate', ''), item.get('amount', ''), item.get('amount_previous', ''),
+            _wrapped(item.get('remark', ''), widths[8]),
+        ]
+        for item in data.get('items', [])
+    ]
+    numeric_columns = (1, 2, 5, 6, 7)
+    story += _item_tables(header_rows, body, widths, numeric_columns, frame,
+                          frame[1] - _flowables_height(story, frame))
+
+    totals = data.get('totals', {})
+    premium = totals.get('premium', {})
+    percent = f"{premium['percent'] * 100:.2f}%" if premium.get('percent') is not None else ''
+    story.append(_summary_table([
+        ('Grand Total', ['', totals.get('grand_total', '')]),
+        (f'Premium @ {percent}', [percent, premium.get('amount', '')]),
+        ('Payable Amount', ['', totals.get('payable', '')]),
+    ], widths, label_column=4, numeric_columns=numeric_columns))
+    return story
+
+
+def deviation_statement_story(data: Dict[str, Any], frame: Tuple[float, float]) -> list:
+    """Deviation Statement: 13 columns comparing work order and executed quantities"""
+    header_data = data.get('header_data') or []
+    agreement_no = header_data[12][4] if len(header_data) > 12 and len(header_data[12]) > 4 else ''
+    name_of_work = header_data[8][1] if len(header_data) > 8 and len(header_data[8]) > 1 else ''
+    widths = DEVIATION_COLUMNS
+    story = [Paragraph('Deviation Statement', TITLE_STYLE),
+             _paragraph(f"Agreement No: {agreement_no}"),
+             _paragraph(f"Name of Work: {name_of_work}"),
+             Spacer(1, 4 * mm)]
+
+    header_rows = [['ITEM No.', 'Description', 'Unit', 'Qty as per Work Order', 'Rate',
+                    'Amt as per Work Order Rs.', 'Qty Executed', 'Amt as per Executed Rs.', 'Excess Qty',
+                    'Excess Amt Rs.', 'Saving Qty', 'Saving Amt Rs.', 'REMARKS/ REASON']]
+    body = []
+    for item in data['data'].get('items', []):
+        # Quantities need a unit and amounts a rate as well, as in the HTML statement
+        has_unit = bool(str(item.get('unit', '')).strip())
+        has_amount = has_unit and bool(str(item.get('rate', '')).strip())
+        body.append([
+            _wrapped(item.get('serial_no', ''), widths[0]), _wrapped(item.get('description', ''), widths[1]),
+            _wrapped(item.get('unit', ''), widths[2]),
+            item.get('qty_wo', '') if has_unit else '', item.get('rate', '') if has_unit else '',
+            item.get('amt_wo', '') if has_amount else '', item.get('qty_bill', '') if has_unit else '',
+            item.get('amt_bill', '') if has_amount else '', item.get('excess_qty', '') if has_unit else '',
+            item.get('excess_amt', '') if has_amount else '', item.get('saving_qty', '') if has_unit else '',
+            item.get('saving_amt', '') if has_amount else '', _wrapped(item.get('remark', ''), widths[12]),
+        ])
+    numeric_columns = tuple(range(3, 12))
+    story += _item_tables(header_rows, body, widths, numeric_columns, frame,
+                          frame[1] - _flowables_height(story, frame), 'No deviation items available')
+
+    summary = data['data'].get('summary')
+    if summary:
+        percent = summary.get('premium', {}).get('percent', 0) * 100
+        net_difference = summary.get('net_difference', '')
+        try:
+            excess = float(net_difference) > 0
+        except (TypeError, ValueError):
+            excess = False
+        story.append(_summary_table([
+            ('Grand Total Rs.', ['', summary.get('work_order_total', ''), '', summary.get('executed_total', ''),
+                                 '', summary.get('overall_excess', ''), '', summary.get('overall_saving', '')]),
+            (f'Add Tender Premium ({percent:.2f}%)',
+             ['', summary.get('tender_premium_f', ''), '', summary.get('tender_premium_h', ''),
+              '', summary.get('tender_premium_j', ''), '', summary.get('tender_premium_l', '')]),
+            ('Grand Total including Tender Premium Rs.',
+             ['', summary.get('grand_total_f', ''), '', summary.get('grand_total_h', ''),
+              '', summary.get('grand_total_j', ''), '', summary.get('grand_total_l', '')]),
+            (f"Overall {'Excess' if excess else 'Saving'} With Respect to the Work Order Amount Rs.",
+             ['', '', '', net_difference]),
+        ], widths, label_column=3, numeric_columns=numeric_columns[1:]))
+    return story
+
+
+def extra_items_story(data: Dict[str, Any], frame: Tuple[float, float]) -> list:
+    """Extra Items: items executed beyond the work order"""
+    widths = EXTRA_ITEMS_COLUMNS
+    header_rows = [['Serial No.', 'Remark', 'Description', 'Quantity', 'Unit', 'Rate', 'Amount']]
+    body = [
+        [_wrapped(item.get('serial_no', ''), widths[0]), _wrapped(item.get('remark', ''), widths[1]),
+         _wrapped(item.get('description', ''), widths[2]), item.get('quantity', ''),
+         _wrapped(item.get('unit', ''), widths[4]), item.get('rate', ''), item.get('amount', '')]
+        for item in data['data'].get('items', [])
+    ]
+    story = [Paragraph('Extra Items', TITLE_STYLE), Spacer(1, 4 * mm)]
+    return story + _item_tables(header_rows, body, widths, (3, 5, 6), frame,
+                                frame[1] - _flowables_height(story, frame), 'No extra items available')
+
+
+# Document name -> (story builder, landscape page)
+NATIVE_DOCUMENTS: Dict[str, Tuple[Callable[[Dict[str, Any], Tuple[float, float]], list], bool]] = {
+    'First Page Summary': (first_page_story, False),
+    'Deviation Statement': (deviation_statement_story, True),
+    'Extra Items Statement': (extra_items_story, False),
+}
+
+
+def build_document(doc_name: str, data: Dict[str, Any], output: Union[str, BinaryIO]):
+    """
+    Write one tabular document as a PDF.
+
+    Args:
+        doc_name: One of NATIVE_DOCUMENTS
+        data: The template data prepared for the document by TemplateRenderer
+        output: File path or writable binary buffer
+    """
+    build_story, is_landscape = NATIVE_DOCUMENTS[doc_name]
+    doc = SimpleDocTemplate(output, pagesize=landscape(A4) if is_landscape else A4, title=doc_name,
+                            leftMargin=PAGE_MARGIN, rightMargin=PAGE_MARGIN,
+                            topMargin=PAGE_MARGIN, bottomMargin=PAGE_MARGIN)
+    frame = (doc.width - 2 * FRAME_PADDING, doc.height - 2 * FRAME_PADDING)
+    doc.build(build_story(data, frame))
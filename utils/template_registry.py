@@ -0,0 +1,132 @@
+"""
+Compiled template registry for Bill Generator
+One Jinja environment per template directory per process, shared by every
+renderer, with optional on-disk bytecode caching so cold workers skip compilation
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from utils.cache_utils import stream_digest
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_CACHE_SIZE = 400
+# Directory for compiled template bytecode shared between processes; unset disables it
+BYTECODE_CACHE_DIR = os.environ.get('BILLGEN_TEMPLATE_CACHE_DIR', '')
+# Recompile a template when its file mtime changes (one stat per lookup)
+AUTO_RELOAD = os.environ.get('BILLGEN_TEMPLATE_AUTO_RELOAD', '1').lower() in ('1', 'true', 'yes')
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_TEMPLATE_DIRS = (
+    _PROJECT_ROOT / 'templates',
+    _PROJECT_ROOT / 'templates_14102025',
+)
+
+_environments: Dict[Tuple[str, str], Environment] = {}
+_lock = threading.Lock()
+# (template file sizes and mtimes, version) of the default template directories
+_template_version: Optional[Tuple[tuple, str]] = None
+
+
+def get_template_environment(template_dir: str, bytecode_cache_dir: Optional[str] = None) -> Environment:
+    """
+    Return the process-wide Jinja environment for a template directory.
+
+    Compiled templates are kept in memory and reused by every caller. With
+    ``auto_reload`` a template is recompiled when its file mtime changes; the
+    optional bytecode cache is keyed by the template source checksum, so edited
+    templates never load stale bytecode.
+    """
+    template_dir = os.path.realpath(template_dir)
+    cache_dir = bytecode_cache_dir if bytecode_cache_dir is not None else BYTECODE_CACHE_DIR
+    key = (template_dir, cache_dir)
+
+    with _lock:
+        env = _environments.get(key)
+        if env is None:
+            bytecode_cache = None
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(cache_dir)
+            env = Environment(
+                loader=FileSystemLoader(template_dir),
+                cache_size=TEMPLATE_CACHE_SIZE,
+                auto_reload=AUTO_RELOAD,
+                bytecode_cache=bytecode_cache
+            )
+            _environments[key] = env
+        return env
+
+
+def precompile_templates(env: Environment, extensions=('html',)) -> int:
+    """Compile every template of an environment up front; returns the number compiled"""
+    compiled = 0
+    for template_name in env.list_templates(extensions=list(extensions)):
+        try:
+            env.get_template(template_name)
+            compiled += 1
+        except Exception as e:
+            logger.warning(f"Could not precompile template {template_name}: {str(e)}")
+    return compiled
+
+
+def compute_template_version(template_dirs: Optional[Iterable[Path]] = None) -> str:
+    """
+    Digest of every template file (relative path and contents).
+
+    Any template edit changes the version, so resumed batches regenerate
+    documents rendered with older templates.
+    """
+    hasher = hashlib.sha256()
+    for template_dir in (template_dirs or DEFAULT_TEMPLATE_DIRS):
+        template_dir = Path(template_dir)
+        if not template_dir.is_dir():
+            continue
+        for path in sorted(p for p in template_dir.rglob('*') if p.is_file()):
+            hasher.update(str(path.relative_to(template_dir)).encode('utf-8'))
+            hasher.update(stream_digest(str(path)).encode('ascii'))
+    return hasher.hexdigest()[:16]
+
+
+def _template_files_signature() -> tuple:
+    files = []
+    for template_dir in DEFAULT_TEMPLATE_DIRS:
+        template_dir = Path(template_dir)
+        if template_dir.is_dir():
+            for path in sorted(p for p in template_dir.rglob('*') if p.is_file()):
+                stat = path.stat()
+                files.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(files)
+
+
+def current_template_version() -> str:
+    """
+    compute_template_version() of the default template directories, hashed once per process.
+
+    With auto_reload the template files are only stat'ed on later calls and rehashed when
+    one changed, so cache keys follow template edits as the compiled templates do.
+    """
+    global _template_version
+    cached = _template_version
+    if cached is not None and not AUTO_RELOAD:
+        return cached[1]
+    signature = _template_files_signature()
+    if cached is None or cached[0] != signature:
+        cached = (signature, compute_template_version(DEFAULT_TEMPLATE_DIRS))
+        _template_version = cached
+    return cached[1]
+
+
+def clear_template_registry():
+    """Drop all shared environments, their compiled templates and the template version"""
+    global _template_version
+    with _lock:
+        _environments.clear()
+        _template_version = None
@@ -1,8 +1,18 @@
+import numpy as np
 import pandas as pd
 from datetime import datetime
-from typing import Dict, Any, List
-from jinja2 import Environment, FileSystemLoader
+from typing import Dict, Any, Iterator, Optional
 import os
+from utils.bill_computation import (
+    ITEM_NO_COLUMNS, SERIAL_NO_COLUMNS, numeric_column, raw_column
+)
+from utils.amount_words import amount_in_words
+from utils.bill_model import BillModel, premium_percent
+from utils.deviation_engine import NUMERIC_DEVIATION_COLUMNS, compute_deviation_frame, deviation_totals
+from utils.html_stream import stream_template
+from utils.item_store import AmountColumn, ItemStore
+from utils.template_registry import get_template_environment
+from utils.tracing import traced
 
 class TemplateRenderer:
     """Render HTML templates with data structure matching templates_14102025 format"""
@@ -22,15 +32,20 @@ class TemplateRenderer:
                     # Fallback to main templates directory
                     template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates')
         
-        self.jinja_env = Environment(
-            loader=FileSystemLoader(template_dir),
-            cache_size=400,
-            auto_reload=False
-        )
+        # Shared, process-wide environment so templates are compiled once
+        self.jinja_env = get_template_environment(template_dir)
+    
+    def _bill_model(self, title_data: Dict[str, Any], work_order_data: pd.DataFrame, extra_items_data = None,
+                    model: Optional[BillModel] = None) -> BillModel:
+        """The caller's bill model, or one built from the given inputs"""
+        if model is not None:
+            return model
+        return BillModel(title_data, work_order_data, extra_items_data)
     
     def _prepare_first_page_data(self, title_data: Dict[str, Any], work_order_data: pd.DataFrame, 
-                                extra_items_data = None) -> Dict[str, Any]:
+                                extra_items_data = None, model: Optional[BillModel] = None) -> Dict[str, Any]:
         """Prepare data structure for first_page.html template"""
+        model = self._bill_model(title_data, work_order_data, extra_items_data, model)
         
         # Prepare header data - convert title_data to rows format
         header_rows = []
@@ -55,105 +70,36 @@ class TemplateRenderer:
                 header_rows.append(current_row)
         
         # Prepare items data
-        items = []
+        item_tables = []
         
-        # Process work order items
+        # Process work order items - line arrays come from the bill model, zero-rate rows masked as arrays
         if isinstance(work_order_data, pd.DataFrame):
-            for _, row in work_order_data.iterrows():
-                # Extract values with safe defaults
-                unit = str(row.get('Unit', ''))
-                quantity_since = self._safe_float(row.get('Quantity Since', row.get('Quantity', 0)))
-                quantity_upto = self._safe_float(row.get('Quantity Upto', quantity_since))
-                serial_no = str(row.get('Item No.', row.get('Item', row.get('S. No.', ''))))
-                description = str(row.get('Description', ''))
-                rate = self._safe_float(row.get('Rate', 0))
-                amount = self._safe_float(row.get('Amount', quantity_upto * rate))
-                remark = str(row.get('Remark', ''))
-                
-                # Apply VBA-like behavior for zero rates
-                if rate == 0:
-                    # Only populate Serial No. and Description for zero rates
-                    item_data = {
-                        'unit': '',
-                        'quantity_since_last': '',
-                        'quantity_upto_date': '',
-                        'serial_no': serial_no,
-                        'description': description,
-                        'rate': '',
-                        'amount': '',
-                        'amount_previous': '',
-                        'remark': ''
-                    }
-                else:
-                    # For non-zero rates, populate all columns
-                    item_data = {
-                        'unit': unit,
-                        'quantity_since_last': f"{quantity_since:.2f}" if quantity_since > 0 else "",
-                        'quantity_upto_date': f"{quantity_upto:.2f}" if quantity_upto > 0 else "",
-                        'serial_no': serial_no,
-                        'description': description,
-                        'rate': f"{rate:.2f}" if rate > 0 else "",
-                        'amount': f"{amount:.2f}" if amount > 0 else "",
-                        'amount_previous': "",  # As per VBA behavior
-                        'remark': remark
-                    }
-                
-                items.append(item_data)
+            lines = model.work_lines
+            amount = numeric_column(work_order_data, ('Amount',), default=lines['quantity_upto'] * lines['rate'])
+            item_tables.append(self._first_page_rows(
+                work_order_data, SERIAL_NO_COLUMNS, lines['rate'],
+                quantity_since_last=lines['quantity_since'],
+                quantity_upto_date=lines['quantity_upto'],
+                amount=amount
+            ))
         
         # Process extra items
         if isinstance(extra_items_data, pd.DataFrame) and not extra_items_data.empty:
-            for _, row in extra_items_data.iterrows():
-                unit = str(row.get('Unit', ''))
-                quantity = self._safe_float(row.get('Quantity', 0))
-                serial_no = str(row.get('Item No.', row.get('Item', '')))
-                description = str(row.get('Description', ''))
-                rate = self._safe_float(row.get('Rate', 0))
-                amount = self._safe_float(row.get('Amount', quantity * rate))
-                remark = str(row.get('Remark', ''))
-                
-                # Apply VBA-like behavior for zero rates
-                if rate == 0:
-                    # Only populate Serial No. and Description for zero rates
-                    item_data = {
-                        'unit': '',
-                        'quantity_since_last': '',
-                        'quantity_upto_date': '',
-                        'serial_no': serial_no,
-                        'description': description,
-                        'rate': '',
-                        'amount': '',
-                        'amount_previous': '',
-                        'remark': ''
-                    }
-                else:
-                    # For non-zero rates, populate all columns
-                    item_data = {
-                        'unit': unit,
-                        'quantity_since_last': "",
-                        'quantity_upto_date': f"{quantity:.2f}" if quantity > 0 else "",
-                        'serial_no': serial_no,
-                        'description': description,
-                        'rate': f"{rate:.2f}" if rate > 0 else "",
-                        'amount': f"{amount:.2f}" if amount > 0 else "",
-                        'amount_previous': "",
-                        'remark': remark
-                    }
-                
-                items.append(item_data)
-        
-        # Calculate totals
-        total_amount = 0
-        if isinstance(work_order_data, pd.DataFrame):
-            for _, row in work_order_data.iterrows():
-                quantity = self._safe_float(row.get('Quantity Since', row.get('Quantity', 0)))
-                rate = self._safe_float(row.get('Rate', 0))
-                if rate != 0:  # Only count non-zero rate items
-                    total_amount += quantity * rate
+            quantity = model.extra_lines['quantity']
+            rate = model.extra_lines['rate']
+            amount = numeric_column(extra_items_data, ('Amount',), default=quantity * rate)
+            item_tables.append(self._first_page_rows(
+                extra_items_data, ITEM_NO_COLUMNS, rate,
+                quantity_since_last=np.zeros(len(extra_items_data)),
+                quantity_upto_date=quantity,
+                amount=amount
+            ))
+        items = ItemStore.concat(item_tables)
         
-        # Calculate premium using title data if available (fallback to 10%)
-        premium_percent = self._get_premium_fraction(title_data)
-        premium_amount = total_amount * premium_percent
-        payable_amount = total_amount + premium_amount
+        # Zero-rate items add nothing to the work order amount
+        total_amount = model.work_order_total
+        premium_amount = model.totals['premium_amount']
+        payable_amount = model.payable_amount
         
         return {
             'data': {
@@ -162,7 +108,7 @@ class TemplateRenderer:
                 'totals': {
                     'grand_total': f"{total_amount:.2f}",
                     'premium': {
-                        'percent': premium_percent,
+                        'percent': model.premium_fraction,
                         'amount': f"{premium_amount:.2f}"
                     },
                     'payable': f"{payable_amount:.2f}"
@@ -170,6 +116,24 @@ class TemplateRenderer:
             }
         }
     
+    def _first_page_rows(self, df: pd.DataFrame, serial_columns, rate: np.ndarray, quantity_since_last: np.ndarray,
+                         quantity_upto_date: np.ndarray, amount: np.ndarray) -> ItemStore:
+        """Build first page item rows; zero-rate rows only show Serial No. and Description (VBA behavior)"""
+        zero_rate = rate == 0
+        return ItemStore({
+            'unit': ['' if is_zero else str(unit)
+                     for is_zero, unit in zip(zero_rate.tolist(), raw_column(df, ('Unit',)))],
+            'quantity_since_last': AmountColumn(quantity_since_last, blank=zero_rate),
+            'quantity_upto_date': AmountColumn(quantity_upto_date, blank=zero_rate),
+            'serial_no': [str(value) for value in raw_column(df, serial_columns)],
+            'description': [str(value) for value in raw_column(df, ('Description',))],
+            'rate': AmountColumn(rate, blank=zero_rate),
+            'amount': AmountColumn(amount, blank=zero_rate),
+            'amount_previous': [''] * len(df),  # As per VBA behavior
+            'remark': ['' if is_zero else str(remark)
+                       for is_zero, remark in zip(zero_rate.tolist(), raw_column(df, ('Remark',)))],
+        })
+    
     def _safe_float(self, value) -> float:
         """Safely convert value to float"""
         try:
@@ -179,12 +143,13 @@ class TemplateRenderer:
         except (ValueError, TypeError):
             return 0.0
     
+    @traced('render.first_page')
     def render_first_page(self, title_data: Dict[str, Any], work_order_data: pd.DataFrame,
-                         extra_items_data = None) -> str:
+                         extra_items_data = None, model: Optional[BillModel] = None) -> str:
         """Render first_page.html template"""
         try:
             # Prepare data in the format expected by the template
-            template_data = self._prepare_first_page_data(title_data, work_order_data, extra_items_data)
+            template_data = self._prepare_first_page_data(title_data, work_order_data, extra_items_data, model)
             
             # Render template
             template = self.jinja_env.get_template('first_page.html')
@@ -202,10 +167,17 @@ class TemplateRenderer:
             print(f"Failed to render template {template_name}: {e}")
             raise
     
+    def stream_template(self, template_name: str, data: Dict[str, Any]) -> Iterator[str]:
+        """Render any template with provided data as chunks of HTML, without building the whole string"""
+        template = self.jinja_env.get_template(template_name)
+        return stream_template(template, data)
+    
+    @traced('render.note_sheet')
     def render_note_sheet(self, title_data: Dict[str, Any], work_order_data: pd.DataFrame,
-                         extra_items_data = None) -> str:
+                         extra_items_data = None, model: Optional[BillModel] = None) -> str:
         """Render note_sheet.html template with proper data structure"""
         try:
+            model = self._bill_model(title_data, work_order_data, extra_items_data, model)
             # Prepare data in the format expected by the note_sheet template
             template_data = {
                 'data': {
@@ -217,8 +189,8 @@ class TemplateRenderer:
                     'actual_completion': title_data.get('actual_completion', ''),
                     'work_order_amount': title_data.get('work_order_amount', '0.00'),
                     'totals': {
-                        'payable': title_data.get('net_payable', '0.00'),
-                        'extra_items_sum': title_data.get('extra_items_sum', 0.0)
+                        'payable': title_data.get('net_payable', f"{model.payable_amount:.2f}"),
+                        'extra_items_sum': title_data.get('extra_items_sum', model.totals['extra_grand_total'])
                     }
                 },
                 'notes': title_data.get('notes', ['Work completed as per schedule'])
@@ -231,126 +203,13 @@ class TemplateRenderer:
             print(f"Failed to render note_sheet.html template: {e}")
             raise
 
+    @traced('render.deviation_statement')
     def render_deviation_statement(self, title_data: Dict[str, Any], work_order_data: pd.DataFrame,
-                                  extra_items_data = None) -> str:
+                                  extra_items_data = None, model: Optional[BillModel] = None,
+                                  bill_quantity_data = None) -> str:
         """Render deviation_statement.html template with proper data structure"""
         try:
-            # Prepare header data in the format expected by the deviation statement template
-            header_data = []
-            if title_data:
-                # Convert title_data to a 2D array format expected by the template
-                # This is a simplified approach - in a real implementation, you might need
-                # to structure this more precisely based on your actual data
-                header_data = [[], [], [], [], [], [], [], [], [], [], [], [], []]  # 13 rows
-                
-                # Populate specific positions based on template expectations
-                if 'agreement_no' in title_data:
-                    if len(header_data) > 12:
-                        if len(header_data[12]) <= 4:
-                            # Extend the row if needed
-                            while len(header_data[12]) <= 4:
-                                header_data[12].append('')
-                        header_data[12][4] = title_data['agreement_no']
-                
-                if 'name_of_work' in title_data:
-                    if len(header_data) > 8:
-                        if len(header_data[8]) <= 1:
-                            # Extend the row if needed
-                            while len(header_data[8]) <= 1:
-                                header_data[8].append('')
-                        header_data[8][1] = title_data['name_of_work']
-            
-            # Prepare items data
-            items = []
-            
-            # Process work order items for deviation calculation
-            if isinstance(work_order_data, pd.DataFrame):
-                for _, row in work_order_data.iterrows():
-                    # Extract values with safe defaults
-                    unit = str(row.get('Unit', ''))
-                    qty_wo = self._safe_float(row.get('Quantity', 0))
-                    qty_bill = self._safe_float(row.get('Quantity Billed', qty_wo))  # Default to same as WO
-                    serial_no = str(row.get('Item No.', row.get('Item', row.get('S. No.', ''))))
-                    description = str(row.get('Description', ''))
-                    rate = self._safe_float(row.get('Rate', 0))
-                    
-                    # Calculate amounts
-                    amt_wo = qty_wo * rate
-                    amt_bill = qty_bill * rate
-                    
-                    # Calculate deviations
-                    excess_qty = max(0, qty_bill - qty_wo)
-                    saving_qty = max(0, qty_wo - qty_bill)
-                    excess_amt = excess_qty * rate
-                    saving_amt = saving_qty * rate
-                    
-                    item_data = {
-                        'serial_no': serial_no,
-                        'description': description,
-                        'unit': unit,
-                        'qty_wo': f"{qty_wo:.2f}" if qty_wo > 0 else "",
-                        'rate': f"{rate:.2f}" if rate > 0 else "",
-                        'amt_wo': f"{amt_wo:.2f}" if amt_wo > 0 else "",
-                        'qty_bill': f"{qty_bill:.2f}" if qty_bill > 0 else "",
-                        'amt_bill': f"{amt_bill:.2f}" if amt_bill > 0 else "",
-                        'excess_qty': f"{excess_qty:.2f}" if excess_qty > 0 else "",
-                        'excess_amt': f"{excess_amt:.2f}" if excess_amt > 0 else "",
-                        'saving_qty': f"{saving_qty:.2f}" if saving_qty > 0 else "",
-                        'saving_amt': f"{saving_amt:.2f}" if saving_amt > 0 else "",
-                        'remark': str(row.get('Remark', ''))
-                    }
-                    
-                    items.append(item_data)
-            
-            # Calculate summary data
-            work_order_total = sum(self._safe_float(item.get('amt_wo', 0)) for item in items)
-            executed_total = sum(self._safe_float(item.get('amt_bill', 0)) for item in items)
-            overall_excess = max(0, executed_total - work_order_total)
-            overall_saving = max(0, work_order_total - executed_total)
-            
-            # Calculate tender premium using title data if available
-            premium_percent = self._get_premium_fraction(title_data)
-            tender_premium_f = work_order_total * premium_percent
-            tender_premium_h = executed_total * premium_percent
-            tender_premium_j = overall_excess * premium_percent if overall_excess > 0 else 0
-            tender_premium_l = overall_saving * premium_percent if overall_saving > 0 else 0
-            
-            # Calculate grand totals including premium
-            grand_total_f = work_order_total + tender_premium_f
-            grand_total_h = executed_total + tender_premium_h
-            grand_total_j = overall_excess + tender_premium_j
-            grand_total_l = overall_saving + tender_premium_l
-            
-            # Net difference
-            net_difference = executed_total - work_order_total
-            
-            summary_data = {
-                'work_order_total': f"{work_order_total:.2f}",
-                'executed_total': f"{executed_total:.2f}",
-                'overall_excess': f"{overall_excess:.2f}",
-                'overall_saving': f"{overall_saving:.2f}",
-                'premium': {
-                    'percent': premium_percent
-                },
-                'tender_premium_f': f"{tender_premium_f:.2f}",
-                'tender_premium_h': f"{tender_premium_h:.2f}",
-                'tender_premium_j': f"{tender_premium_j:.2f}",
-                'tender_premium_l': f"{tender_premium_l:.2f}",
-                'grand_total_f': f"{grand_total_f:.2f}",
-                'grand_total_h': f"{grand_total_h:.2f}",
-                'grand_total_j': f"{grand_total_j:.2f}",
-                'grand_total_l': f"{grand_total_l:.2f}",
-                'net_difference': f"{net_difference:.2f}"
-            }
-            
-            # Prepare data in the format expected by the deviation statement template
-            template_data = {
-                'header_data': header_data,
-                'data': {
-                    'items': items,
-                    'summary': summary_data
-                }
-            }
+            template_data = self._prepare_deviation_data(title_data, work_order_data, model, bill_quantity_data)
             
             # Render template
             template = self.jinja_env.get_template('deviation_statement.html')
@@ -358,44 +217,113 @@ class TemplateRenderer:
         except Exception as e:
             print(f"Failed to render deviation_statement.html template: {e}")
             raise
+    
+    def _prepare_deviation_data(self, title_data: Dict[str, Any], work_order_data: pd.DataFrame,
+                                model: Optional[BillModel] = None, bill_quantity_data=None,
+                                frame: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+        """
+        Prepare data structure for deviation_statement.html template
+        
+        ``frame`` is the bill's deviation frame (see utils.deviation_engine); it is computed
+        from the work order and bill quantity data when not given.
+        """
+        # Prepare header data in the format expected by the deviation statement template
+        header_data = []
+        if title_data:
+            # Convert title_data to a 2D array format expected by the template
+            # This is a simplified approach - in a real implementation, you might need
+            # to structure this more precisely based on your actual data
+            header_data = [[], [], [], [], [], [], [], [], [], [], [], [], []]  # 13 rows
+            
+            # Populate specific positions based on template expectations
+            if 'agreement_no' in title_data:
+                if len(header_data) > 12:
+                    if len(header_data[12]) <= 4:
+                        # Extend the row if needed
+                        while len(header_data[12]) <= 4:
+                            header_data[12].append('')
+                    header_data[12][4] = title_data['agreement_no']
+            
+            if 'name_of_work' in title_data:
+                if len(header_data) > 8:
+                    if len(header_data[8]) <= 1:
+                        # Extend the row if needed
+                        while len(header_data[8]) <= 1:
+                            header_data[8].append('')
+                    header_data[8][1] = title_data['name_of_work']
+        
+        # Items and totals come from the shared deviation frame, so the template, the native
+        # PDF and the programmatic statements all report the same deviations
+        if frame is None:
+            frame = compute_deviation_frame(work_order_data, bill_quantity_data)
+        items = ItemStore({})
+        if not frame.empty:
+            items = ItemStore({
+                'serial_no': [str(value) for value in frame['item_no'].tolist()],
+                'description': [str(value) for value in frame['description'].tolist()],
+                'unit': [str(value) for value in frame['unit'].tolist()],
+                **{column: AmountColumn(frame[column].to_numpy(dtype='float64'))
+                   for column in NUMERIC_DEVIATION_COLUMNS},
+                'remark': [str(value) for value in frame['remark'].tolist()],
+            })
+        
+        totals = deviation_totals(frame)
+        work_order_total = totals['amt_wo']
+        executed_total = totals['amt_bill']
+        
+        overall_excess = max(0, executed_total - work_order_total)
+        overall_saving = max(0, work_order_total - executed_total)
+        
+        # Tender premium of the bill
+        premium = model.premium_fraction if model is not None else self._get_premium_fraction(title_data)
+        tender_premium_f = work_order_total * premium
+        tender_premium_h = executed_total * premium
+        tender_premium_j = overall_excess * premium if overall_excess > 0 else 0
+        tender_premium_l = overall_saving * premium if overall_saving > 0 else 0
+        
+        # Calculate grand totals including premium
+        grand_total_f = work_order_total + tender_premium_f
+        grand_total_h = executed_total + tender_premium_h
+        grand_total_j = overall_excess + tender_premium_j
+        grand_total_l = overall_saving + tender_premium_l
+        
+        # Net difference
+        net_difference = executed_total - work_order_total
+        
+        summary_data = {
+            'work_order_total': f"{work_order_total:.2f}",
+            'executed_total': f"{executed_total:.2f}",
+            'overall_excess': f"{overall_excess:.2f}",
+            'overall_saving': f"{overall_saving:.2f}",
+            'premium': {
+                'percent': premium
+            },
+            'tender_premium_f': f"{tender_premium_f:.2f}",
+            'tender_premium_h': f"{tender_premium_h:.2f}",
+            'tender_premium_j': f"{tender_premium_j:.2f}",
+            'tender_premium_l': f"{tender_premium_l:.2f}",
+            'grand_total_f': f"{grand_total_f:.2f}",
+            'grand_total_h': f"{grand_total_h:.2f}",
+            'grand_total_j': f"{grand_total_j:.2f}",
+            'grand_total_l': f"{grand_total_l:.2f}",
+            'net_difference': f"{net_difference:.2f}"
+        }
+        
+        # Prepare data in the format expected by the deviation statement template
+        return {
+            'header_data': header_data,
+            'data': {
+                'items': items,
+                'summary': summary_data
+            }
+        }
 
+    @traced('render.extra_items')
     def render_extra_items(self, title_data: Dict[str, Any], work_order_data: pd.DataFrame,
                           extra_items_data = None) -> str:
         """Render extra_items.html template with proper data structure"""
         try:
-            # Prepare items data
-            items = []
-            
-            # Process extra items data
-            if isinstance(extra_items_data, pd.DataFrame) and not extra_items_data.empty:
-                for _, row in extra_items_data.iterrows():
-                    # Extract values with safe defaults
-                    serial_no = str(row.get('Item No.', row.get('Item', row.get('S. No.', ''))))
-                    remark = str(row.get('Remark', ''))
-                    description = str(row.get('Description', ''))
-                    quantity = self._safe_float(row.get('Quantity', 0))
-                    unit = str(row.get('Unit', ''))
-                    rate = self._safe_float(row.get('Rate', 0))
-                    amount = quantity * rate
-                    
-                    item_data = {
-                        'serial_no': serial_no,
-                        'remark': remark,
-                        'description': description,
-                        'quantity': f"{quantity:.2f}" if quantity > 0 else "",
-                        'unit': unit,
-                        'rate': f"{rate:.2f}" if rate > 0 else "",
-                        'amount': f"{amount:.2f}" if amount > 0 else ""
-                    }
-                    
-                    items.append(item_data)
-            
-            # Prepare data in the format expected by the extra items template
-            template_data = {
-                'data': {
-                    'items': items
-                }
-            }
+            template_data = self._prepare_extra_items_data(extra_items_data)
             
             # Render template
             template = self.jinja_env.get_template('extra_items.html')
@@ -403,7 +331,33 @@ class TemplateRenderer:
         except Exception as e:
             print(f"Failed to render extra_items.html template: {e}")
             raise
+    
+    def _prepare_extra_items_data(self, extra_items_data = None) -> Dict[str, Any]:
+        """Prepare data structure for extra_items.html template"""
+        items = ItemStore({})
+        
+        # Process extra items data
+        if isinstance(extra_items_data, pd.DataFrame) and not extra_items_data.empty:
+            quantity = numeric_column(extra_items_data, ('Quantity',))
+            rate = numeric_column(extra_items_data, ('Rate',))
+            items = ItemStore({
+                'serial_no': [str(value) for value in raw_column(extra_items_data, SERIAL_NO_COLUMNS)],
+                'remark': [str(value) for value in raw_column(extra_items_data, ('Remark',))],
+                'description': [str(value) for value in raw_column(extra_items_data, ('Description',))],
+                'quantity': AmountColumn(quantity),
+                'unit': [str(value) for value in raw_column(extra_items_data, ('Unit',))],
+                'rate': AmountColumn(rate),
+                'amount': AmountColumn(quantity * rate),
+            })
+        
+        # Prepare data in the format expected by the extra items template
+        return {
+            'data': {
+                'items': items
+            }
+        }
 
+    @traced('render.certificate_ii')
     def render_certificate_ii(self, title_data: Dict[str, Any], work_order_data: pd.DataFrame,
                              extra_items_data = None) -> str:
         """Render certificate_ii.html template with proper data structure"""
@@ -429,83 +383,31 @@ class TemplateRenderer:
             print(f"Failed to render certificate_ii.html template: {e}")
             raise
 
-    def _number_to_words(self, num):
-        """Convert number to words (simplified version)"""
-        if num == 0:
-            return "Zero"
-        
-        ones = ['', 'One', 'Two', 'Three', 'Four', 'Five', 'Six', 'Seven', 'Eight', 'Nine']
-        teens = ['Ten', 'Eleven', 'Twelve', 'Thirteen', 'Fourteen', 'Fifteen', 'Sixteen', 'Seventeen', 'Eighteen', 'Nineteen']
-        tens = ['', '', 'Twenty', 'Thirty', 'Forty', 'Fifty', 'Sixty', 'Seventy', 'Eighty', 'Ninety']
-        
-        def convert_hundreds(n):
-            result = ''
-            if n >= 100:
-                result += ones[n // 100] + ' Hundred '
-                n %= 100
-            if n >= 20:
-                result += tens[n // 10] + ' '
-                n %= 10
-            elif n >= 10:
-                result += teens[n - 10] + ' '
-                n = 0
-            if n > 0:
-                result += ones[n] + ' '
-            return result.strip()
-        
-        if num < 1000:
-            return convert_hundreds(num)
-        elif num < 100000:
-            thousands = num // 1000
-            remainder = num % 1000
-            result = convert_hundreds(thousands) + ' Thousand '
-            if remainder > 0:
-                result += convert_hundreds(remainder)
-            return result.strip()
-        else:
-            lakhs = num // 100000
-            remainder = num % 100000
-            result = convert_hundreds(lakhs) + ' Lakh '
-            if remainder > 0:
-                if remainder >= 1000:
-                    result += convert_hundreds(remainder // 1000) + ' Thousand '
-                    remainder %= 1000
-                if remainder > 0:
-                    result += convert_hundreds(remainder)
-            return result.strip()
-
+    @traced('render.certificate_iii')
     def render_certificate_iii(self, title_data: Dict[str, Any], work_order_data: pd.DataFrame,
-                              extra_items_data = None) -> str:
+                              extra_items_data = None, model: Optional[BillModel] = None) -> str:
         """Render certificate_iii.html template with proper data structure"""
         try:
-            # Calculate totals from work order data
-            total_amount = 0
-            if isinstance(work_order_data, pd.DataFrame):
-                for _, row in work_order_data.iterrows():
-                    quantity = self._safe_float(row.get('Quantity', 0))
-                    rate = self._safe_float(row.get('Rate', 0))
-                    total_amount += quantity * rate
+            # Work order amount, premium and deductions from the bill model
+            model = self._bill_model(title_data, work_order_data, extra_items_data, model)
+            totals = model.totals
+            total_amount = model.work_order_total
+            payable_amount = model.payable_amount
             
-            # Calculate premium using title data if available
-            premium_percent = self._get_premium_fraction(title_data)
-            premium_amount = total_amount * premium_percent
-            payable_amount = total_amount + premium_amount
-            
-            # Calculate deductions
-            sd_amount = payable_amount * 0.10  # Security Deposit 10%
-            it_amount = payable_amount * 0.02  # Income Tax 2%
-            gst_amount = payable_amount * 0.02  # GST 2%
-            lc_amount = payable_amount * 0.01  # Labour Cess 1%
-            total_deductions = sd_amount + it_amount + gst_amount + lc_amount
+            # Deductions on the payable amount
+            sd_amount = totals['sd_amount']  # Security Deposit 10%
+            it_amount = totals['it_amount']  # Income Tax 2%
+            gst_amount = totals['gst_amount']  # GST 2%
+            lc_amount = totals['lc_amount']  # Labour Cess 1%
             
             # Calculate amounts for template
             total_123 = total_amount  # Items 1 + 2 + 3 (simplified)
             balance_4_minus_5 = total_123  # Balance (Item 4 - 5)
-            total_recovery = sd_amount + it_amount + gst_amount + lc_amount
-            by_cheque = payable_amount - total_recovery
+            total_recovery = totals['total_deductions']
+            by_cheque = model.net_payable
             
-            # Convert amount to words (simplified)
-            amount_words = self._number_to_words(int(payable_amount))
+            # Payable amount in words (Indian numbering)
+            amount_words = amount_in_words(payable_amount)
             
             # Prepare data in the format expected by the certificate_iii template
             # Pass both numeric values (for calculations) and string values (for display)
@@ -541,35 +443,5 @@ class TemplateRenderer:
             raise
 
     def _get_premium_fraction(self, title_data: Dict[str, Any]) -> float:
-        """Return tender premium as fraction (e.g., 0.10 for 10%).
-        Accepts values like 10, 10.0, "10", or "10%" in title_data['TENDER PREMIUM %'].
-        Defaults to 0.10 when missing or invalid.
-        """
-        try:
-            raw = None
-            if isinstance(title_data, dict):
-                # Try common keys
-                for k in (
-                    'TENDER PREMIUM %',
-                    'Tender Premium Percentage',
-                    'Tender Premium',
-                    'tender_premium_percent',
-                ):
-                    if k in title_data and title_data[k] not in (None, ''):
-                        raw = title_data[k]
-                        break
-            if raw is None:
-                return 0.10
-            if isinstance(raw, str):
-                s = raw.strip()
-                if s.endswith('%'):
-                    s = s[:-1].strip()
-                val = float(s)
-            elif isinstance(raw, (int, float)):
-                val = float(raw)
-            else:
-                return 0.10
-            # If given as whole percent (e.g., 10), convert to fraction
-            return val / 100.0 if val > 1 else val
-        except Exception:
-            return 0.10
+        """Return tender premium as fraction (e.g., 0.10 for 10%); see ``bill_model.premium_percent``"""
+        return premium_percent(title_data) / 100
@@ -0,0 +1,222 @@
+"""
+Pipeline tracing for Bill Generator
+Nested spans recording wall time, CPU time and RSS for each stage of the bill flow,
+plus the tracemalloc peak of the outermost span, exported as JSON lines or Chrome
+trace format
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Tracing is off unless enabled; disabled spans cost one attribute check
+TRACE_ENABLED = os.environ.get('BILLGEN_TRACE', '0').lower() in ('1', 'true', 'yes')
+# tracemalloc slows allocation-heavy code noticeably, so it is opt-in on top of tracing
+TRACE_MEMORY = os.environ.get('BILLGEN_TRACE_MEMORY', '0').lower() in ('1', 'true', 'yes')
+# Spans are written here at process exit: '.json' gives Chrome trace format, anything else
+# JSON lines. '{pid}' in the path keeps process-pool workers from overwriting each other.
+TRACE_FILE = os.environ.get('BILLGEN_TRACE_FILE', '')
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size, falling back to the peak where only that is available"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except Exception:
+        pass
+    if resource is not None:
+        # ru_maxrss is KB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == 'Darwin' else peak * 1024
+    return None
+
+
+class Tracer:
+    """
+    Collects finished spans for one process.
+
+    tracemalloc keeps a single process-wide peak, so only the span that starts while no
+    other span is measuring memory (in any thread) resets it and records
+    ``tracemalloc_peak_bytes``; nested and concurrent spans are included in that peak.
+    """
+
+    def __init__(self, enabled: bool = TRACE_ENABLED, trace_memory: bool = TRACE_MEMORY):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+        # The span currently owning the tracemalloc peak, if any
+        self._memory_span: Optional[Dict[str, Any]] = None
+
+    def _stack(self) -> list:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def enable(self, trace_memory: Optional[bool] = None):
+        self.enabled = True
+        if trace_memory is not None:
+            self.trace_memory = trace_memory
+
+    def disable(self):
+        self.enabled = False
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Time a block; nested spans record their parent"""
+        if not self.enabled:
+            yield None
+            return
+
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        stack = self._stack()
+        record = {
+            'name': name,
+            'parent': stack[-1]['name'] if stack else None,
+            'depth': len(stack),
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'attributes': attributes,
+        }
+        if self.trace_memory:
+            with self._lock:
+                if self._memory_span is None:
+                    self._memory_span = record
+                    record['_start_traced'] = tracemalloc.get_traced_memory()[0]
+                    tracemalloc.reset_peak()
+        stack.append(record)
+
+        start_cpu = time.thread_time()
+        start = time.perf_counter()
+        error = None
+        try:
+            yield record
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            end = time.perf_counter()
+            stack.pop()
+            record['start_ms'] = (start - self._origin) * 1000
+            record['wall_ms'] = (end - start) * 1000
+            record['cpu_ms'] = (time.thread_time() - start_cpu) * 1000
+            record['rss_bytes'] = _rss_bytes()
+            if error:
+                record['error'] = error
+            with self._lock:
+                if self._memory_span is record:
+                    self._memory_span = None
+                    start_traced = record.pop('_start_traced')
+                    if tracemalloc.is_tracing():
+                        record['tracemalloc_peak_bytes'] = tracemalloc.get_traced_memory()[1] - start_traced
+                self.spans.append(record)
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Total and maximum wall time per span name"""
+        totals: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            for span in self.spans:
+                entry = totals.setdefault(span['name'], {'count': 0, 'wall_ms': 0.0, 'cpu_ms': 0.0, 'max_ms': 0.0})
+                entry['count'] += 1
+                entry['wall_ms'] += span['wall_ms']
+                entry['cpu_ms'] += span['cpu_ms']
+                entry['max_ms'] = max(entry['max_ms'], span['wall_ms'])
+        return totals
+
+    def export_jsonl(self, path: str) -> int:
+        """Append one JSON object per span; returns the number written"""
+        with self._lock:
+            spans = list(self.spans)
+        with open(path, 'a', encoding='utf-8') as f:
+            for span in spans:
+                f.write(json.dumps(span, default=str) + "\n")
+        return len(spans)
+
+    def export_chrome_trace(self, path: str) -> int:
+        """Write spans as Chrome trace events (open in chrome://tracing or Perfetto)"""
+        with self._lock:
+            spans = list(self.spans)
+        events = []
+        for span in spans:
+            args = dict(span['attributes'], cpu_ms=round(span['cpu_ms'], 3), rss_bytes=span['rss_bytes'])
+            if 'tracemalloc_peak_bytes' in span:
+                args['tracemalloc_peak_bytes'] = span['tracemalloc_peak_bytes']
+            if 'error' in span:
+                args['error'] = span['error']
+            events.append({
+                'name': span['name'],
+                'ph': 'X',
+                'ts': round(span['start_ms'] * 1000, 3),
+                'dur': round(span['wall_ms'] * 1000, 3),
+                'pid': span['pid'],
+                'tid': span['tid'],
+                'args': {k: (v if isinstance(v, (int, float, str, bool, type(None))) else str(v))
+                         for k, v in args.items()},
+            })
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return len(events)
+
+
+_tracer = Tracer()
+
+
+def export_trace(path: str) -> int:
+    """Export the process-wide spans, choosing the format from the file extension"""
+    path = path.replace('{pid}', str(os.getpid()))
+    if path.endswith('.json'):
+        return _tracer.export_chrome_trace(path)
+    return _tracer.export_jsonl(path)
+
+
+if TRACE_ENABLED and TRACE_FILE:
+    atexit.register(lambda: _tracer.spans and export_trace(TRACE_FILE))
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer"""
+    return _tracer
+
+
+def span(name: str, **attributes):
+    """Context manager for a span on the process-wide tracer"""
+    return _tracer.span(name, **attributes)
+
+
+def traced(name: str) -> Callable:
+    """Decorator wrapping every call of a function in a span"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _tracer.enabled:
+                return func(*args, **kwargs)
+            with _tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,174 @@
+"""
+Single-pass workbook reader for Bill Generator
+Streams every sheet of a workbook in one read-only openpyxl load and builds
+column-typed DataFrames directly, bypassing the per-sheet pd.read_excel round trips
+"""
+
+import datetime as dt
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+# Cell values openpyxl returns for Excel error cells when reading values only
+EXCEL_ERROR_VALUES = frozenset(
+    ('#NULL!', '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#N/A', '#GETTING_DATA')
+)
+
+# Strings pd.read_excel treats as missing by default
+DEFAULT_NA_STRINGS = frozenset(
+    ('', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+     '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null')
+)
+
+
+def _convert_cell(value: Any) -> Any:
+    """Normalize a raw openpyxl cell value the same way pandas does"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, float):
+        if value.is_integer():
+            return int(value)
+        return value
+    if isinstance(value, str):
+        if value in EXCEL_ERROR_VALUES or value in DEFAULT_NA_STRINGS:
+            return None
+    return value
+
+
+def _parse_number(value: Any) -> Any:
+    """Parse a numeric-looking string the way pandas' type inference does"""
+    if not isinstance(value, str):
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def _column_array(values: List[Any]):
+    """Build a typed column array matching pandas' numpy_nullable dtypes"""
+    present = [v for v in values if v is not None]
+    if not present:
+        return pd.array([pd.NA] * len(values), dtype='string')
+
+    if all(isinstance(v, bool) for v in present):
+        return pd.array(values, dtype='boolean')
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+        return pd.array(values, dtype='Int64')
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        return pd.array(values, dtype='Float64')
+    if all(isinstance(v, (dt.datetime, dt.date)) for v in present):
+        return pd.to_datetime(pd.Series(values, dtype=object)).array
+
+    # Text columns whose every value parses as a number (e.g. item numbers "01")
+    # are inferred as numeric, matching pd.read_excel
+    if all(isinstance(v, (str, int, float)) and not isinstance(v, bool) for v in present):
+        try:
+            parsed = [None if v is None else _parse_number(v) for v in values]
+        except ValueError:
+            parsed = None
+        if parsed is not None:
+            return _column_array(parsed)
+    return pd.array([None if v is None else str(v) for v in values], dtype='string')
+
+
+def _unique_headers(header_row: Iterable[Any]) -> List[Any]:
+    """Name header cells like pandas: blanks become 'Unnamed: i', duplicates get '.n'"""
+    headers = []
+    counts: Dict[Any, int] = {}
+    for i, name in enumerate(header_row):
+        if name is None:
+            name = f"Unnamed: {i}"
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[name] = count + 1
+            name = f"{name}.{count}"
+            count = counts.get(name, 0)
+        headers.append(name)
+        counts[name] = count + 1
+    return headers
+
+
+class SinglePassWorkbook:
+    """
+    All sheets of a workbook loaded in one read-only openpyxl pass.
+
+    Exposes ``sheet_names`` like ``pd.ExcelFile`` so it can be used as a drop-in
+    replacement by ExcelProcessor.
+    """
+
+    def __init__(self, sheets: Dict[str, List[List[Any]]]):
+        self.sheets = sheets
+        self.sheet_names = list(sheets.keys())
+
+    @classmethod
+    def load(cls, source: Any, sheet_names: Optional[Iterable[str]] = None) -> "SinglePassWorkbook":
+        """
+        Stream the requested sheets (all sheets by default) from a path or file-like object
+        """
+        from openpyxl import load_workbook
+
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        workbook = load_workbook(source, read_only=True, data_only=True, keep_links=False)
+        try:
+            wanted = set(sheet_names) if sheet_names is not None else None
+            sheets = {}
+            for worksheet in workbook.worksheets:
+                if wanted is not None and worksheet.title not in wanted:
+                    # Keep the name visible for sheet existence checks without reading it
+                    sheets[worksheet.title] = []
+                    continue
+                # Dimensions stored in the file are frequently wrong; recompute while streaming
+                worksheet.reset_dimensions()
+                sheets[worksheet.title] = cls._read_rows(worksheet.iter_rows(values_only=True))
+            return cls(sheets)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _read_rows(rows: Iterable[tuple]) -> List[List[Any]]:
+        """Convert raw rows, trimming trailing empty cells and trailing empty rows"""
+        data: List[List[Any]] = []
+        last_row_with_data = -1
+        for row_number, row in enumerate(rows):
+            converted = [_convert_cell(value) for value in row]
+            while converted and converted[-1] is None:
+                converted.pop()
+            if converted:
+                last_row_with_data = row_number
+            data.append(converted)
+        return data[:last_row_with_data + 1]
+
+    def title_dict(self, sheet_name: str = 'Title') -> Dict[str, str]:
+        """Read key/value pairs from the first two columns of the title sheet"""
+        title_data = {}
+        for row in self.sheets.get(sheet_name, []):
+            if len(row) < 2 or row[0] is None or row[1] is None:
+                continue
+            key = str(row[0]).strip()
+            val = str(row[1]).strip()
+            if key and val and key != 'nan' and val != 'nan':
+                title_data[key] = val
+        return title_data
+
+    def to_dataframe(self, sheet_name: str) -> pd.DataFrame:
+        """Build a DataFrame using the first row as header and typed column arrays"""
+        rows = self.sheets.get(sheet_name, [])
+        if not rows:
+            return pd.DataFrame()
+
+        width = max(len(row) for row in rows)
+        headers = _unique_headers(list(rows[0]) + [None] * (width - len(rows[0])))
+        body = rows[1:]
+
+        if not body:
+            return pd.DataFrame(columns=headers)
+
+        columns = {}
+        for col_index, name in enumerate(headers):
+            values = [row[col_index] if col_index < len(row) else None for row in body]
+            columns[name] = _column_array(values)
+        return pd.DataFrame(columns)
@@ -4,23 +4,14 @@ from typing import Dict
 from datetime import datetime
 from typing import Optional
 
-try:
-    from docx import Document  # type: ignore
-    from docx.shared import Mm  # type: ignore
-    from docx.enum.section import WD_ORIENT  # type: ignore
-    DOCX_AVAILABLE = True
-except Exception:
-    DOCX_AVAILABLE = False
+from utils.lazy_imports import optional_import
+from utils.tracing import traced
 
-try:
-    from bs4 import BeautifulSoup  # type: ignore
-    BS4_AVAILABLE = True
-except Exception:
-    BS4_AVAILABLE = False
 
 class ZipPackager:
     """Handles packaging of documents into ZIP files"""
     
+    @traced('zip.package')
     def create_package(self, documents: Dict[str, str], pdf_files: Dict[str, bytes], merged_pdf: bytes) -> io.BytesIO:
         """
         Create a ZIP package containing all documents in multiple formats
@@ -63,11 +54,16 @@ class ZipPackager:
         Attempts a faithful representation: text, simple headings, lists, and tables.
         Ensures A4 with 10mm margins; landscape for Deviation Statement.
         """
+        # python-docx and BeautifulSoup load on the first DOCX export, not at import
+        docx = optional_import("docx")
+        bs4 = optional_import("bs4")
         # If python-docx is not available, return the HTML bytes as a fallback placeholder
-        if not DOCX_AVAILABLE:
+        if docx is None:
             return html.encode("utf-8")
+        from docx.shared import Mm  # type: ignore
+        from docx.enum.section import WD_ORIENT  # type: ignore
 
-        document = Document()
+        document = docx.Document()
         # Page setup: A4 with 10 mm margins. Landscape for Deviation Statement
         section = document.sections[0]
         is_landscape = ("deviation" in doc_name.lower())
@@ -84,8 +80,8 @@ class ZipPackager:
         section.left_margin = Mm(10)
         section.right_margin = Mm(10)
 
-        if BS4_AVAILABLE:
-            soup = BeautifulSoup(html, "html.parser")
+        if bs4 is not None:
+            soup = bs4.BeautifulSoup(html, "html.parser")
 
             def is_within(node, ancestor_name):
                 return node.find_parent(ancestor_name) is not None
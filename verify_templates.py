@@ -113,7 +113,8 @@ def test_template_compliance():
         deviation_html = renderer.render_deviation_statement(
             sample_data['title_data'], 
             sample_data['work_order_data'], 
-            sample_data['extra_items_data']
+            sample_data['extra_items_data'],
+            bill_quantity_data=sample_data['bill_quantity_data']
         )
         assert len(deviation_html) > 0, "Deviation Statement HTML should not be empty"
         assert "<!DOCTYPE html>" in deviation_html, "Should contain DOCTYPE"